@@ -0,0 +1,106 @@
+import threading
+
+from audio.mic_analyzer import MicAnalyzer
+
+
+class CaptureHub:
+    """
+    Process-wide owner of the mic input stream
+    There is one shared analysis per pitch detector, whatever the number of MicAnalyzer hearing the mic:
+    each analysis result is fanned out to all the subscribed MicAnalyzer, which relay it to their own listeners.
+    """
+    BLOCK_SIZE = 512  # block size of the input stream - the analyses run every pitch_detector.window_step samples
+    instance = None
+    instance_lock = threading.Lock()
+
+    def __init__(self):
+        self.debug = False
+        self.lock = threading.Lock()
+        self.stream = None
+        self.analyzers = {}  # pitch detector name -> shared MicAnalyzer
+        self.active_analyzers = ()  # snapshot of the analyzers read by the stream callback
+
+    @staticmethod
+    def get_instance():
+        """
+        :return: the capture hub of the process
+        """
+        with CaptureHub.instance_lock:
+            if not CaptureHub.instance:
+                CaptureHub.instance = CaptureHub()
+            return CaptureHub.instance
+
+    def subscribe(self, mic_analyzer: MicAnalyzer):
+        """
+        mic_analyzer will get the notes heard by the mic - the stream is opened with the first subscription
+        :param mic_analyzer:
+        :return:
+        """
+        with self.lock:
+            name = mic_analyzer.pitch_detector_name
+            shared_analyzer = self.analyzers.get(name)
+            if not shared_analyzer:
+                shared_analyzer = MicAnalyzer(name)
+                shared_analyzer.start_analysis()
+                self.analyzers[name] = shared_analyzer
+                self.active_analyzers = tuple(self.analyzers.values())
+            if mic_analyzer not in shared_analyzer.listeners:
+                shared_analyzer.add_listener(mic_analyzer)
+            if not self.stream:
+                self.stream = self._open_stream()
+
+    def unsubscribe(self, mic_analyzer: MicAnalyzer):
+        """
+        the stream is closed with the last subscription
+        :param mic_analyzer:
+        :return:
+        """
+        stream = None
+        stopped_analyzer = None
+        with self.lock:
+            shared_analyzer = self.analyzers.get(mic_analyzer.pitch_detector_name)
+            if not shared_analyzer or mic_analyzer not in shared_analyzer.listeners:
+                return
+            shared_analyzer.remove_listener(mic_analyzer)
+            if not shared_analyzer.listeners:
+                stopped_analyzer = self.analyzers.pop(mic_analyzer.pitch_detector_name)
+                self.active_analyzers = tuple(self.analyzers.values())
+            if not self.analyzers:
+                stream = self.stream
+                self.stream = None
+        # outside the lock: a listener of the analysis thread may be unsubscribing at the same time
+        if stream:
+            self._close_stream(stream)
+        if stopped_analyzer:
+            stopped_analyzer.stop_analysis()
+
+    def is_subscribed(self, mic_analyzer: MicAnalyzer) -> bool:
+        shared_analyzer = self.analyzers.get(mic_analyzer.pitch_detector_name)
+        return bool(shared_analyzer) and mic_analyzer in shared_analyzer.listeners
+
+    def callback(self, indata, frames, time, status):
+        """
+        Callback function of the InputStream method: the block is queued for each shared analysis
+        """
+        for shared_analyzer in self.active_analyzers:
+            shared_analyzer.callback(indata, frames, time, status)
+
+    def get_statistics(self) -> dict:
+        with self.lock:
+            return {name: analyzer.get_statistics() | {"subscribers": len(analyzer.listeners)}
+                    for (name, analyzer) in self.analyzers.items()}
+
+    def _open_stream(self):
+        # sounddevice is imported here so that the analysis can run on hosts without PortAudio
+        import sounddevice as sd
+        if self.debug:
+            print("CaptureHub: opening the input stream")
+        stream = sd.InputStream(channels=1, callback=self.callback, blocksize=self.BLOCK_SIZE,
+                                samplerate=MicAnalyzer.SAMPLE_FREQ, dtype='float32')
+        stream.start()
+        return stream
+
+    def _close_stream(self, stream):
+        if self.debug:
+            print("CaptureHub: closing the input stream")
+        stream.close()
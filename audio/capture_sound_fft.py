@@ -20,6 +20,7 @@ import matplotlib.pyplot as plt
 import sounddevice as sd
 import numpy as np
 
+from audio.note_index import NoteIndex
 
 def int_or_str(text):
     """Helper function for argument parsing."""
@@ -46,6 +47,7 @@ class CaptureSoundFFT:
         self.ax = None
         self.lines = None
         self.length = 0
+        self.note_index = None
         self._initialize()
 
     def _initialize(self):
@@ -163,11 +165,14 @@ class CaptureSoundFFT:
             self.ax.plot(freqs, np_abs)
             lowest = np.sort(np_abs)
             peaks = lowest[-CaptureSoundFFT.NB_PEAKS:]
-            for (f, a) in zip(freqs, np_abs):
-                if f > CaptureSoundFFT.MIN_FREQ and a > CaptureSoundFFT.SOUND_LEVEL_MIN and a in peaks:
-                    note = Note.find_closest_note(f)
-                    plt.text(f, a + 5, f"{note[0]}")
-                    plt.text(f, a - 5, f"{round(note[1],2)}")
+            # the notes of all the peaks are found at once
+            is_peak = (freqs > CaptureSoundFFT.MIN_FREQ) & (np_abs > CaptureSoundFFT.SOUND_LEVEL_MIN) \
+                & np.isin(np_abs, peaks)
+            peak_ids, _, peak_pitches = self.note_index.lookup(freqs[is_peak])
+            for (f, a, note, pitch) in zip(freqs[is_peak], np_abs[is_peak], self.note_index.get_names(peak_ids),
+                                           peak_pitches):
+                plt.text(f, a + 5, f"{note}")
+                plt.text(f, a - 5, f"{round(pitch, 2)}")
         a_freq = 55/2.0
         for octave in range(1, 9):
             plt.axvline(x=a_freq * 2**octave, color='red', label=f"A{octave}", linestyle=":", lw=0.5)
@@ -186,6 +191,8 @@ class CaptureSoundFFT:
             if self.args.samplerate is None:
                 device_info = sd.query_devices(self.args.device, 'input')
                 self.args.samplerate = device_info['default_samplerate']
+            # the notes are named as in pyharmonytools
+            self.note_index = NoteIndex.get_instance(Note.CONCERT_PITCH, int(self.args.samplerate), concert_octave=3)
             self.length = int(self.args.window * self.args.samplerate // (1000 * self.args.downsample))
             self.plotdata = np.zeros((self.length, len(self.args.channels)))
             self.fig, self.ax = plt.subplots()
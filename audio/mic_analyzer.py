@@ -10,19 +10,19 @@ See https://www.chciken.com/digital/signal/processing/2020/05/13/guitar-tuner.ht
 Guitar tuner script based on the Harmonic Product Spectrum (HPS)
 Copyright (c) 2021 chciken
 """
-import copy
 import os
+import queue
 import threading
-import time
 import tkinter
-from datetime import datetime
 from math import floor
 from tkinter import Label, Entry, Button
 from tkinter.ttk import Progressbar
 
 import numpy as np
-import scipy.fftpack
-import sounddevice as sd
+
+from audio.note_index import NoteIndex
+from audio.pitch_detectors import create_pitch_detector, DEFAULT_PITCH_DETECTOR, PITCH_DETECTORS
+from audio.ring_buffer import SampleRingBuffer
 
 
 class MicListener:
@@ -33,53 +33,145 @@ class MicListener:
         pass
 
 
-class MicAnalyzer:
+class MicAnalyzer(MicListener):
     # General settings that can be changed by the user
     SAMPLE_FREQ = 48000  # sample frequency in Hz
-    WINDOW_SIZE = 48000  # window size of the DFT in samples
-    WINDOW_STEP = 12000  # step size of window
-    NUM_HPS = 5  # max number of harmonic product spectrums
     POWER_THRESH = 1e-6  # tuning is activated if the signal power exceeds this threshold
     CONCERT_PITCH = 440  # defining a1
-    WHITE_NOISE_THRESH = 0.2  # everything under WHITE_NOISE_THRESH*avg_energy_per_freq is cut off
 
-    WINDOW_T_LEN = WINDOW_SIZE / SAMPLE_FREQ  # length of the window in seconds
     SAMPLE_T_LENGTH = 1 / SAMPLE_FREQ  # length between two samples in seconds
-    DELTA_FREQ = SAMPLE_FREQ / WINDOW_SIZE  # frequency step width of the interpolated DFT
     OCTAVE_BANDS = [50, 100, 200, 400, 800, 1600, 3200, 6400, 12800, 25600]
     ALL_NOTES = ["A", "A#", "B", "C", "C#", "D", "D#", "E", "F", "F#", "G", "G#"]
+    # audio blocks waiting for the analysis
+    QUEUE_SIZE = 16
+    DROP_OLDEST = "drop-oldest"  # when the queue is full, the oldest block is dropped
+    COALESCE = "coalesce"  # + all the pending blocks are analyzed at once as a single window
+    OVERFLOW_POLICIES = [DROP_OLDEST, COALESCE]
 
-    def __init__(self):
+    def __init__(self, pitch_detector: str = DEFAULT_PITCH_DETECTOR, overflow_policy: str = DROP_OLDEST):
+        """
+        :param pitch_detector: name of the pitch detection engine, see audio.pitch_detectors.PITCH_DETECTORS
+        :param overflow_policy: DROP_OLDEST or COALESCE
+        """
+        if overflow_policy not in MicAnalyzer.OVERFLOW_POLICIES:
+            raise ValueError(f"{overflow_policy} is not a known overflow policy - use one of "
+                             f"{MicAnalyzer.OVERFLOW_POLICIES}")
+        if pitch_detector not in PITCH_DETECTORS:
+            raise ValueError(f"{pitch_detector} is not a known pitch detector - use one of {list(PITCH_DETECTORS)}")
+        super().__init__()
         self.debug = False
         self.is_listening = False
-        self.download_thread = None
+        self.analysis_thread = None
         # analyzer data
-        self.mic_timer = 0.005
         self.length = 0
-        self.HANN_WINDOW = np.hanning(self.WINDOW_SIZE)
-        self.window_samples = [0 for _ in range(self.WINDOW_SIZE)]
+        self.pitch_detector_name = pitch_detector
+        self.samples_since_detection = 0
+        self.overflow_policy = overflow_policy
+        # the analysis state is created on first use: an analyzer relaying the notes of the CaptureHub has none
+        self.blocks = None  # queue of the blocks, see callback()
+        # counters
+        self.input_overflows = 0  # blocks reported as faulty by the input stream
+        self.overruns = 0  # blocks dropped because the analysis is late
+        self.coalesced_blocks = 0  # blocks analyzed along with a more recent block
+        self.pitch_detector = None  # see get_pitch_detector()
+        self.window_samples = None
+        self.note_index = NoteIndex.get_instance(self.CONCERT_PITCH, self.SAMPLE_FREQ)
         self.noteBuffer = ["1", "2"]
         # listeners
         self.listeners = []
 
+    def get_pitch_detector(self):
+        """
+        :return: the pitch detector, created on first use along with the window of the analysis
+        """
+        if self.pitch_detector is None:
+            pitch_detector = create_pitch_detector(self.pitch_detector_name, self.SAMPLE_FREQ)
+            self.window_samples = SampleRingBuffer(pitch_detector.window_size)
+            self.pitch_detector = pitch_detector
+        return self.pitch_detector
+
+    def get_blocks(self) -> queue.Queue:
+        """
+        :return: the queue of the blocks waiting for the analysis, created on first use
+        """
+        if self.blocks is None:
+            self.blocks = queue.Queue(maxsize=self.QUEUE_SIZE)
+        return self.blocks
+
     def add_listener(self, listener: MicListener):
         self.listeners.append(listener)
 
+    def remove_listener(self, listener: MicListener):
+        self.listeners.remove(listener)
+
     def do_start_hearing(self):
+        """
+        subscribes to the mic stream shared by all the analyzers of the process
+        :return:
+        """
+        from audio.capture_hub import CaptureHub
         self.is_listening = True
-        self.download_thread = threading.Thread(target=self._listen, name="_listen")
-        self.download_thread.start()
+        CaptureHub.get_instance().subscribe(self)
 
     def do_stop_hearing(self):
+        """
+        no note is sent to the listeners once it returns
+        (unless called by a listener from the analysis thread)
+        :return:
+        """
+        from audio.capture_hub import CaptureHub
         self.is_listening = False
-        self.download_thread.join()
+        CaptureHub.get_instance().unsubscribe(self)
+
+    def set_current_note(self, new_note: str, heard_freq: float = 0.0, closest_pitch: float = 0.0):
+        """
+        relays a note analyzed by the capture hub
+        """
+        self._set_current_note(new_note, heard_freq, closest_pitch)
 
-    def _listen(self):
-        self.start_time = datetime.now()
-        with sd.InputStream(channels=1, callback=self.callback, blocksize=self.WINDOW_STEP,
-                            samplerate=self.SAMPLE_FREQ):
-            while self.is_listening:
-                time.sleep(self.mic_timer)
+    def start_analysis(self):
+        """
+        starts the thread analyzing the blocks queued by callback()
+        :return:
+        """
+        self.get_pitch_detector()
+        self._clear_blocks()
+        # daemon: an analysis left running, eg by a screen not released, does not prevent the process from exiting
+        self.analysis_thread = threading.Thread(target=self._analyze, name="_analyze", daemon=True)
+        self.analysis_thread.start()
+
+    def stop_analysis(self):
+        """
+        pending blocks are dropped & the analysis thread ends
+        :return:
+        """
+        self._clear_blocks()
+        self.get_blocks().put(None)  # end of stream
+        if self.analysis_thread and self.analysis_thread is not threading.current_thread():
+            self.analysis_thread.join()
+
+    def _clear_blocks(self):
+        blocks = self.get_blocks()
+        try:
+            while True:
+                blocks.get_nowait()
+        except queue.Empty:
+            pass
+
+    def get_statistics(self) -> dict:
+        return {"input overflows": self.input_overflows, "overruns": self.overruns,
+                "coalesced blocks": self.coalesced_blocks,
+                "pending blocks": 0 if self.blocks is None else self.blocks.qsize()}
+
+    def reset(self):
+        """
+        forgets the samples & notes heard so far
+        :return:
+        """
+        if self.window_samples:
+            self.window_samples.clear()
+        self.samples_since_detection = 0
+        self.noteBuffer = ["1", "2"]
 
     def find_closest_note(self, pitch):
         """
@@ -90,87 +182,95 @@ class MicAnalyzer:
         closest_note (str): e.g. a, g#, ..
         closest_pitch (float): pitch of the closest note in hertz
       """
-        i = int(np.round(np.log2(pitch / self.CONCERT_PITCH) * 12))
-        closest_note = self.ALL_NOTES[i % 12] + str(4 + (i + 9) // 12)
-        closest_pitch = self.CONCERT_PITCH * 2 ** (i / 12)
-        return closest_note, closest_pitch
+        return self.note_index.find_closest_note(pitch)
 
     def callback(self, indata, frames, time, status):
         """
       Callback function of the InputStream method.
-      That's where the magic happens ;)
+      The block is only queued: the analysis is done by the analysis thread
       """
         if status:
+            self.input_overflows += 1
             if self.debug:
                 print("SS", status)
             return
-        if any(indata):
-            self.window_samples = np.concatenate((self.window_samples, indata[:, 0]))  # append new samples
-            self.window_samples = self.window_samples[len(indata[:, 0]):]  # remove old samples
+        block = indata[:, 0].copy()  # the stream reuses indata
+        blocks = self.get_blocks()
+        try:
+            blocks.put_nowait(block)
+        except queue.Full:
+            try:
+                blocks.get_nowait()
+                self.overruns += 1
+            except queue.Empty:
+                pass
+            blocks.put_nowait(block)
+
+    def _analyze(self):
+        self.get_pitch_detector()
+        blocks = self.get_blocks()
+        end_of_stream = False
+        while not end_of_stream:
+            block = blocks.get()
+            if block is None:
+                break
+            if self.overflow_policy == MicAnalyzer.COALESCE:
+                # catch up: the pending blocks only feed the window, the latest one triggers the detection
+                try:
+                    while not blocks.empty():
+                        next_block = blocks.get_nowait()
+                        if next_block is None:
+                            end_of_stream = True
+                            break
+                        self.window_samples.write(block)
+                        self.samples_since_detection += len(block)
+                        self.coalesced_blocks += 1
+                        block = next_block
+                except queue.Empty:
+                    pass
+            self.analyze_block(block)
+
+    def analyze_block(self, samples: np.ndarray):
+        """
+      That's where the magic happens ;)
+      The silent blocks, eg all zeros when the input is muted, are analyzed at the same cadence as the other ones
+      :param samples: 1D array of the new samples
+      """
+        pitch_detector = self.get_pitch_detector()
+        self.window_samples.write(samples)  # append new samples in place, the oldest ones are dropped
+        # the stream blocks may be smaller than the window step of the pitch detector
+        self.samples_since_detection += len(samples)
+        if self.samples_since_detection < pitch_detector.window_step:
+            return
+        self.samples_since_detection = 0
+        window_samples = self.window_samples.window()
 
-            # skip if signal power is too low
-            signal_power = (np.linalg.norm(self.window_samples, ord=2) ** 2) / len(self.window_samples)
-            if signal_power < self.POWER_THRESH:
+        # skip if signal power is too low
+        signal_power = np.dot(window_samples, window_samples) / len(window_samples)
+        if signal_power < self.POWER_THRESH:
+            if self.debug:
                 os.system('cls' if os.name == 'nt' else 'clear')
-                # print("Closest note: ...")
-                self._set_current_note("-")
-                return
-
-            # avoid spectral leakage by multiplying the signal with a hann window
-            hann_samples = self.window_samples * self.HANN_WINDOW
-            magnitude_spec = abs(scipy.fftpack.fft(hann_samples)[:len(hann_samples) // 2])
-
-            # supress mains hum, set everything below 62Hz to zero
-            for i in range(int(62 / self.DELTA_FREQ)):
-                magnitude_spec[i] = 0
-
-            # calculate average energy per frequency for the octave bands
-            # and suppress everything below it
-            for j in range(len(self.OCTAVE_BANDS) - 1):
-                ind_start = int(self.OCTAVE_BANDS[j] / self.DELTA_FREQ)
-                ind_end = int(self.OCTAVE_BANDS[j + 1] / self.DELTA_FREQ)
-                ind_end = ind_end if len(magnitude_spec) > ind_end else len(magnitude_spec)
-                avg_energy_per_freq = (np.linalg.norm(magnitude_spec[ind_start:ind_end], ord=2) ** 2) / (
-                        ind_end - ind_start)
-                avg_energy_per_freq = avg_energy_per_freq ** 0.5
-                for i in range(ind_start, ind_end):
-                    magnitude_spec[i] = magnitude_spec[i] if magnitude_spec[
-                                                                 i] > self.WHITE_NOISE_THRESH * avg_energy_per_freq else 0
-
-            # interpolate spectrum
-            mag_spec_ipol = np.interp(np.arange(0, len(magnitude_spec), 1 / self.NUM_HPS),
-                                      np.arange(0, len(magnitude_spec)),
-                                      magnitude_spec)
-            mag_spec_ipol = mag_spec_ipol / np.linalg.norm(mag_spec_ipol, ord=2)  # normalize it
-
-            hps_spec = copy.deepcopy(mag_spec_ipol)
-
-            # calculate the HPS
-            for i in range(self.NUM_HPS):
-                tmp_hps_spec = np.multiply(hps_spec[:int(np.ceil(len(mag_spec_ipol) / (i + 1)))],
-                                           mag_spec_ipol[::(i + 1)])
-                if not any(tmp_hps_spec):
-                    break
-                hps_spec = tmp_hps_spec
-
-            max_ind = np.argmax(hps_spec)
-            max_freq = max_ind * (self.SAMPLE_FREQ / self.WINDOW_SIZE) / self.NUM_HPS
-
-            closest_note, closest_pitch = self.find_closest_note(max_freq)
-            max_freq = round(max_freq, 1)
-            closest_pitch = round(closest_pitch, 1)
-
-            self.noteBuffer.insert(0, closest_note)  # note that this is a ringbuffer
-            self.noteBuffer.pop()
-
-            # os.system('cls' if os.name == 'nt' else 'clear')
-            if self.noteBuffer.count(self.noteBuffer[0]) == len(self.noteBuffer):
-                self._set_current_note(closest_note, max_freq, closest_pitch)
-            else:
-                self._set_current_note("-")
+            # print("Closest note: ...")
+            self._set_current_note("-")
+            return
+
+        max_freq = pitch_detector.detect(window_samples)
+        if max_freq <= 0:
+            self._set_current_note("-")
+            return
+
+        closest_note, closest_pitch = self.find_closest_note(max_freq)
+        max_freq = round(max_freq, 1)
+        closest_pitch = round(closest_pitch, 1)
+
+        self.noteBuffer.insert(0, closest_note)  # note that this is a ringbuffer
+        self.noteBuffer.pop()
+
+        # os.system('cls' if os.name == 'nt' else 'clear')
+        if self.noteBuffer.count(self.noteBuffer[0]) == len(self.noteBuffer):
+            self._set_current_note(closest_note, max_freq, closest_pitch)
         else:
             self._set_current_note("-")
-            print('no input')
 
     def _set_current_note(self, new_note: str, heard_freq: float = 0.0, closest_pitch: float = 0.0):
         """
@@ -186,7 +286,7 @@ class MicAnalyzer:
             else:
                 if self.debug:
                     print(f" - Closest note: {new_note} {heard_freq}/{closest_pitch}")
-            for l in self.listeners:
+            for l in tuple(self.listeners):  # listeners may unsubscribe meanwhile
                 l.set_current_note(new_note, heard_freq, closest_pitch)
 
 
@@ -0,0 +1,259 @@
+import heapq
+import itertools
+import threading
+
+import numpy as np
+from pyharmonytools.harmony.note import Note
+
+from audio.wavetable import Wavetable, ADSREnvelope
+
+
+class Voice:
+    """
+    A note being played by the mixing engine
+    """
+
+    def __init__(self):
+        self.note_id = None  # None if the voice is free
+        self.loop = None
+        self.phase = 0  # index in the loop of the next sample
+        self.on_time = 0  # sample of the note on
+        self.off_time = None  # sample of the note off, None if the note is still on
+
+    def is_free(self) -> bool:
+        return self.note_id is None
+
+
+class MixingEngine:
+    """
+    Polyphonic synthesizer rendering the notes block by block in a fixed pool of voices
+    The note on / note off events are sample accurate: a block is split at each event it contains,
+    so that chords & arpeggios never drift whatever the block size.
+    The blocks are either rendered to a buffer (render()) or streamed to the sound card (start()).
+    The notes at or above the Nyquist frequency, eg A9 = 28160Hz at 44100Hz, can't be sampled & are not played.
+    """
+    SAMPLE_RATE = 44100
+    BLOCK_SIZE = 256  # ~6ms at 44100Hz
+    NB_VOICES = 16
+    LEVEL = 0.2  # level of a single voice, the mix is clipped to [-1, 1]
+    NOTE_ON = 1
+    NOTE_OFF = 0  # note offs are processed before the note ons of the same sample
+    instance = None
+    instance_lock = threading.Lock()
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE, block_size: int = BLOCK_SIZE, nb_voices: int = NB_VOICES,
+                 envelope: ADSREnvelope = None):
+        """
+        :param sample_rate: in Hz
+        :param block_size: samples rendered at once
+        :param nb_voices: notes played at the same time, the oldest one is stolen beyond
+        :param envelope: of every note, a short attack & release by default
+        """
+        if block_size <= 0 or nb_voices <= 0:
+            raise ValueError(f"block size ({block_size}) and number of voices ({nb_voices}) must be > 0")
+        self.debug = False
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.envelope = envelope or ADSREnvelope(attack=0.01, decay=0.1, sustain=0.7, release=0.05)
+        self.voices = [Voice() for _ in range(nb_voices)]
+        self.position = 0  # samples rendered so far
+        self.events = []  # heap of (sample, event type, note id, wavetable loop)
+        self.events_lock = threading.Lock()
+        self.note_ids = itertools.count()
+        self.loops = {}  # (note, octave) -> float32 wavetable loop
+        self.stolen_voices = 0
+        self.late_events = 0  # events scheduled before the current block
+        self.block = np.zeros(block_size, dtype=np.float32)
+        self.stream = None
+
+    @staticmethod
+    def get_instance():
+        """
+        :return: the mixing engine of the process
+        """
+        with MixingEngine.instance_lock:
+            if not MixingEngine.instance:
+                MixingEngine.instance = MixingEngine()
+            return MixingEngine.instance
+
+    def get_time(self) -> float:
+        """
+        :return: seconds rendered so far, ie the clock of the scheduled notes
+        """
+        return self.position / self.sample_rate
+
+    def get_loop(self, note: str, octave: int) -> np.ndarray:
+        """
+        :return: the wavetable loop of the note, None if it is above the Nyquist frequency
+        """
+        key = (note, octave)
+        if key not in self.loops:
+            raw_note_name = note
+            if "b" in note:
+                raw_note_name = Note.CHROMATIC_SCALE_SHARP_BASED[Note.CHROMATIC_SCALE_FLAT_BASED.index(note)]
+            freq = Note.notes[raw_note_name][octave]
+            if freq >= self.sample_rate / 2:
+                self.loops[key] = None
+            else:
+                wavetable = Wavetable(freq, self.sample_rate)
+                self.loops[key] = wavetable.loop.astype(np.float32) * (self.LEVEL / wavetable.amplitude)
+        return self.loops[key]
+
+    def schedule_note(self, note: str, octave: int, start: float, duration: float) -> int:
+        """
+        :param note: A Ab A#...
+        :param octave:
+        :param start: in seconds, see get_time()
+        :param duration: in seconds, the release of the envelope follows
+        :return: id of the note, None if the note can't be sampled & is skipped
+        """
+        if duration <= 0:
+            raise ValueError(f"the duration of {note}{octave} ({duration}) must be > 0")
+        loop = self.get_loop(note, octave)
+        if loop is None:
+            return None
+        on_time = round(start * self.sample_rate)
+        off_time = on_time + max(round(duration * self.sample_rate), 1)
+        note_id = next(self.note_ids)
+        with self.events_lock:
+            heapq.heappush(self.events, (on_time, MixingEngine.NOTE_ON, note_id, loop))
+            heapq.heappush(self.events, (off_time, MixingEngine.NOTE_OFF, note_id, None))
+        return note_id
+
+    def schedule_chord(self, notes: [str], start: float, duration: float) -> [int]:
+        """
+        :param notes: eg ["C3", "E3", "G3"]
+        :return: ids of the notes
+        """
+        return [self.schedule_note(n.name, n.octave, start, duration) for n in [Note(note) for note in notes]]
+
+    def schedule_sequence(self, notes: [str], start: float, duration: float, interval: float) -> [int]:
+        """
+        arpeggios, scales...
+        :param notes: eg ["C3", "E3", "G3"]
+        :param duration: of each note
+        :param interval: seconds between the starts of 2 notes
+        :return: ids of the notes
+        """
+        return [self.schedule_note(n.name, n.octave, start + i * interval, duration)
+                for (i, n) in enumerate([Note(note) for note in notes])]
+
+    def cancel_all(self):
+        """
+        the pending notes are forgotten & the notes being played are released
+        """
+        with self.events_lock:
+            self.events = []
+            for voice in self.voices:
+                if not voice.is_free() and voice.off_time is None:
+                    voice.off_time = self.position
+
+    def render_block(self) -> np.ndarray:
+        """
+        :return: the next block_size samples of the mix - must not be kept after the next call
+        """
+        block_end = self.position + self.block_size
+        start = self.position
+        self.block.fill(0)
+        with self.events_lock:
+            while self.events and self.events[0][0] < block_end:
+                event_time, event_type, note_id, loop = heapq.heappop(self.events)
+                if event_time < start:
+                    self.late_events += 1
+                    event_time = start
+                self._mix(start, event_time)
+                start = event_time
+                if event_type == MixingEngine.NOTE_ON:
+                    self._note_on(note_id, loop, event_time)
+                else:
+                    self._note_off(note_id, event_time)
+        self._mix(start, block_end)
+        self.position = block_end
+        np.clip(self.block, -1, 1, out=self.block)
+        return self.block
+
+    def render(self, duration: float) -> np.ndarray:
+        """
+        headless rendering
+        :param duration: in seconds, rounded up to a whole number of blocks
+        :return: float32 samples of the mix
+        """
+        nb_blocks = -(-round(duration * self.sample_rate) // self.block_size)
+        samples = np.zeros(nb_blocks * self.block_size, dtype=np.float32)
+        for i in range(nb_blocks):
+            samples[i * self.block_size:(i + 1) * self.block_size] = self.render_block()
+        return samples
+
+    def _note_on(self, note_id: int, loop: np.ndarray, on_time: int):
+        free_voices = [voice for voice in self.voices if voice.is_free()]
+        if free_voices:
+            voice = free_voices[0]
+        else:
+            voice = min(self.voices, key=lambda v: v.on_time)
+            self.stolen_voices += 1
+        voice.note_id = note_id
+        voice.loop = loop
+        voice.phase = 0
+        voice.on_time = on_time
+        voice.off_time = None
+
+    def _note_off(self, note_id: int, off_time: int):
+        for voice in self.voices:
+            if voice.note_id == note_id and voice.off_time is None:
+                voice.off_time = off_time
+
+    def _mix(self, start: int, end: int):
+        """
+        adds the active voices from sample start to end (excluded) to the block
+        """
+        if end <= start:
+            return
+        offset = start - self.position
+        for voice in self.voices:
+            if voice.is_free():
+                continue
+            times = (np.arange(start, end) - voice.on_time) / self.sample_rate
+            release_time = None if voice.off_time is None else (voice.off_time - voice.on_time) / self.sample_rate
+            levels = self.envelope.get_levels(times, release_time)
+            indexes = np.arange(voice.phase, voice.phase + end - start) % len(voice.loop)
+            self.block[offset:offset + end - start] += voice.loop[indexes] * levels
+            voice.phase = (voice.phase + end - start) % len(voice.loop)
+            if self.envelope.is_over(times[-1], release_time):
+                voice.note_id = None
+
+    def callback(self, outdata, frames, time, status):
+        """
+        Callback function of the OutputStream method
+        """
+        if status and self.debug:
+            print("MixingEngine", status)
+        outdata[:, 0] = self.render_block()
+
+    def start(self):
+        """
+        streams the mix to the sound card
+        :return:
+        """
+        if not self.stream:
+            # sounddevice is imported here so that the mix can be rendered on hosts without PortAudio
+            import sounddevice as sd
+            stream = sd.OutputStream(channels=1, callback=self.callback, blocksize=self.block_size,
+                                     samplerate=self.sample_rate, dtype='float32')
+            try:
+                stream.start()
+            except Exception:
+                stream.close()
+                raise
+            self.stream = stream
+
+    def is_started(self) -> bool:
+        return self.stream is not None
+
+    def stop(self):
+        """
+        the sound card is released, the notes still scheduled will be played by the next start()
+        :return:
+        """
+        if self.stream:
+            self.stream.close()
+            self.stream = None
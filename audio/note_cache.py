@@ -0,0 +1,84 @@
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+from pyharmonytools.harmony.note import Note
+
+
+class NoteCache:
+    """
+    Synthesized notes persisted as .npy files & memory mapped on the next starts instead of being computed again
+    The files of a synthesis setting are stored in <folder>/v<VERSION>/<key>, where key is a hash of the setting
+    (sample rate, duration, waveform...) & of the Note.notes frequency table:
+    any change of these parameters leads to another folder, the least recently used ones are removed.
+    """
+    VERSION = 1  # to be increased when the file format changes
+    FOLDER = os.path.join("cache", "notes")
+    MAX_SETTINGS = 4  # synthesis settings kept on disk
+    PARAMETERS_FILE = "parameters.json"
+
+    def __init__(self, folder: str = FOLDER):
+        self.folder = os.path.join(folder, f"v{self.VERSION}")
+        # the frequency table is fingerprinted once per start
+        self.frequencies = hashlib.sha1(json.dumps(Note.notes, sort_keys=True).encode('utf-8')).hexdigest()
+        self.keys = {}  # JSON of the parameters -> key
+
+    def get_key(self, parameters: dict) -> str:
+        """
+        :param parameters: JSON serializable synthesis setting
+        :return: the name of the folder of the setting
+        """
+        content = json.dumps(parameters, sort_keys=True)
+        if content not in self.keys:
+            self.keys[content] = hashlib.sha1((self.frequencies + content).encode('utf-8')).hexdigest()[:16]
+        return self.keys[content]
+
+    def get_file_name(self, parameters: dict, note: str, octave: int) -> str:
+        return os.path.join(self.folder, self.get_key(parameters), f"{note}{octave}.npy")
+
+    def load(self, parameters: dict, note: str, octave: int) -> np.ndarray:
+        """
+        :return: the read only mapping of the samples of the note, None if not cached
+        """
+        file_name = self.get_file_name(parameters, note, octave)
+        try:
+            return np.load(file_name, mmap_mode='r')
+        except (OSError, ValueError):
+            return None  # missing or truncated file: the note is synthesized again
+
+    def save(self, parameters: dict, note: str, octave: int, signal: np.ndarray):
+        """
+        :param parameters: JSON serializable synthesis setting
+        :param note:
+        :param octave:
+        :param signal: samples of the note
+        :return:
+        """
+        file_name = self.get_file_name(parameters, note, octave)
+        setting_folder = os.path.dirname(file_name)
+        if not os.path.isdir(setting_folder):
+            os.makedirs(setting_folder, exist_ok=True)
+            with open(os.path.join(setting_folder, self.PARAMETERS_FILE), "w", encoding='utf-8') as file:
+                json.dump(parameters, file, indent=4)
+            self.prune(setting_folder)
+        tmp_file = f"{file_name}.{os.getpid()}.tmp"
+        with open(tmp_file, "wb") as file:
+            np.save(file, signal)
+        os.replace(tmp_file, file_name)  # another process never maps a half written file
+        os.utime(setting_folder)
+
+    def prune(self, setting_folder: str):
+        """
+        removes the settings beyond the MAX_SETTINGS most recently used
+        :param setting_folder: the setting in use, always kept
+        :return:
+        """
+        settings = sorted([os.path.join(self.folder, name) for name in os.listdir(self.folder)
+                           if name != os.path.basename(setting_folder)], key=os.path.getmtime, reverse=True)
+        for stale_folder in settings[self.MAX_SETTINGS - 1:]:
+            shutil.rmtree(stale_folder, ignore_errors=True)
+
+    def clear(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
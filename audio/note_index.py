@@ -0,0 +1,88 @@
+import math
+import sys
+import threading
+
+import numpy as np
+
+
+class NoteIndex:
+    """
+    Precomputed frequency -> note table
+    The note ids are MIDI numbers (69 for the concert pitch) so that whole arrays of frequencies are mapped
+    to note ids, cents deviations & closest pitches in a single vectorized call.
+    The note names are built once & interned.
+    """
+    NOTE_NAMES = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
+    CONCERT_NOTE_ID = 69  # A4 in MIDI
+    NO_NOTE = -1  # id of the frequencies out of the table
+    instances = {}
+    instances_lock = threading.Lock()
+
+    def __init__(self, concert_pitch: float = 440, sample_freq: int = 48000, concert_octave: int = 4):
+        """
+        :param concert_pitch: frequency of the concert A in Hz
+        :param sample_freq: the table goes up to the first note over the Nyquist frequency
+        :param concert_octave: octave of the concert A in the note names,
+                               4 for MicAnalyzer, 3 for pyharmonytools.harmony.note.Note
+        """
+        if concert_pitch <= 0 or sample_freq <= 0:
+            raise ValueError(f"concert pitch ({concert_pitch}) and sample frequency ({sample_freq}) must be > 0")
+        self.concert_pitch = concert_pitch
+        self.sample_freq = sample_freq
+        self.concert_octave = concert_octave
+        self.nb_notes = self.CONCERT_NOTE_ID + 1 + int(math.ceil(12 * math.log2(sample_freq / 2 / concert_pitch)))
+        note_ids = np.arange(self.nb_notes)
+        self.pitches = concert_pitch * 2 ** ((note_ids - self.CONCERT_NOTE_ID) / 12)
+        octave_shift = concert_octave - 4
+        self.names = [sys.intern(self.NOTE_NAMES[i % 12] + str(i // 12 - 1 + octave_shift)) for i in note_ids]
+
+    @staticmethod
+    def get_instance(concert_pitch: float = 440, sample_freq: int = 48000, concert_octave: int = 4):
+        """
+        :return: the shared index for this configuration
+        """
+        key = (concert_pitch, sample_freq, concert_octave)
+        with NoteIndex.instances_lock:
+            if key not in NoteIndex.instances:
+                NoteIndex.instances[key] = NoteIndex(concert_pitch, sample_freq, concert_octave)
+            return NoteIndex.instances[key]
+
+    def lookup(self, freqs) -> (np.ndarray, np.ndarray, np.ndarray):
+        """
+        :param freqs: array of frequencies in Hz
+        :return: note ids (NO_NOTE out of the table), cents deviation from the closest pitch, closest pitches in Hz
+                 - the cents & pitches are NaN for NO_NOTE
+        """
+        freqs = np.asarray(freqs, dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            semitones = 12 * np.log2(freqs / self.concert_pitch)
+        note_ids = np.full(freqs.shape, self.NO_NOTE, dtype=np.int64)
+        finite = np.isfinite(semitones)
+        note_ids[finite] = np.rint(semitones[finite]).astype(np.int64) + self.CONCERT_NOTE_ID
+        note_ids[(note_ids < 0) | (note_ids >= self.nb_notes)] = self.NO_NOTE
+        in_table = note_ids != self.NO_NOTE
+        closest_pitches = np.full(freqs.shape, np.nan)
+        closest_pitches[in_table] = self.pitches[note_ids[in_table]]
+        cents = np.full(freqs.shape, np.nan)
+        cents[in_table] = 100 * (semitones[in_table] - (note_ids[in_table] - self.CONCERT_NOTE_ID))
+        return note_ids, cents, closest_pitches
+
+    def get_names(self, note_ids) -> [str]:
+        """
+        :param note_ids: as returned by lookup()
+        :return: interned note names, eg "A4" - "-" for NO_NOTE
+        """
+        return [self.names[i] if i != self.NO_NOTE else "-" for i in note_ids]
+
+    def find_closest_note(self, pitch: float) -> (str, float):
+        """
+        scalar flavour of lookup(), without numpy overhead
+        :param pitch: in Hz
+        :return: closest note name, eg "A4" & its pitch in Hz - ("-", 0.0) out of the table
+        """
+        if pitch <= 0:
+            return "-", 0.0
+        note_id = round(12 * math.log2(pitch / self.concert_pitch)) + self.CONCERT_NOTE_ID
+        if not 0 <= note_id < self.nb_notes:
+            return "-", 0.0
+        return self.names[note_id], float(self.pitches[note_id])
@@ -1,32 +1,167 @@
 # https://towardsdatascience.com/mathematics-of-music-in-python-b7d838c84f72
 # see also https://github.com/MaelDrapier/musicalbeeps#from-a-python-program
 
+import threading
 import time
+from collections import OrderedDict
 
 import numpy as np
 import pygame
 from pyharmonytools.harmony.note import Note
 
+from audio.note_cache import NoteCache
+from audio.wavetable import Wavetable, ADSREnvelope
+
 
 class NotePlayer:
+    """
+    The sounds are synthesized on their first play_note() & kept in a LRU cache shared by all the players
+    Each note is a wavetable loop of a few periods, repeated by the mixer until maxtime
+    - unless an ADSR envelope is set: the loop is then tiled & shaped once for the whole note
+    The notes shaped by the envelope may be persisted in a NoteCache so that the next starts map them instead.
+    """
     debug = False
     samplerate = 44100  # Frequency in Hz
-    waves = {}
+    # factor to adjust frequency / todo: address this magic number to make things clearer
+    MAGIC_NUMBER = 4.3536363636363636363636363636364
+    AMPLITUDE = 4096
+    NOTE_DURATION = 1  # in seconds, see the maxtime of play_note()
+    MAX_SOUNDS = 48  # sounds kept in the cache, ie 4 octaves
+    envelope = None  # ADSREnvelope of the notes, None for the mixer fade in only
+    wavetables = {}  # (note, octave) -> Wavetable
+    sounds = OrderedDict()  # (note, octave) -> pygame sound, the least recently played first
+    sounds_lock = threading.Lock()
+    note_cache = None  # NoteCache of the notes shaped by the envelope, None to synthesize them on each start
     is_pygame_initialized = False
 
     def __init__(self):
+        self.prewarm_thread = None
+
+    @staticmethod
+    def _init_pygame():
         if not NotePlayer.is_pygame_initialized:
             pygame.init()
             NotePlayer.is_pygame_initialized = True
 
-        if not NotePlayer.waves:
+    def _create_sound(self, signal: np.ndarray):
+        NotePlayer._init_pygame()
+        return pygame.mixer.Sound(signal)
+
+    def get_sound(self, note: str, octave: int):
+        """
+        :param note: A Ab A#...
+        :param octave:
+        :return: the sound of the note, synthesized if not in the cache
+        """
+        if "b" in note:
+            note = Note.CHROMATIC_SCALE_SHARP_BASED[Note.CHROMATIC_SCALE_FLAT_BASED.index(note)]
+        key = (note, octave)
+        with NotePlayer.sounds_lock:
+            if key in NotePlayer.sounds:
+                NotePlayer.sounds.move_to_end(key)
+                return NotePlayer.sounds[key]
+        # synthesized out of the lock: a prewarming thread may be synthesizing another note meanwhile
+        sound = self._create_sound(self.get_signal(note, octave))
+        with NotePlayer.sounds_lock:
+            NotePlayer.sounds[key] = sound
+            NotePlayer.sounds.move_to_end(key)
+            while len(NotePlayer.sounds) > NotePlayer.MAX_SOUNDS:
+                NotePlayer.sounds.popitem(last=False)
+        return sound
+
+    @staticmethod
+    def set_envelope(envelope: ADSREnvelope):
+        """
+        :param envelope: None for the mixer fade in only
+        :return:
+        """
+        with NotePlayer.sounds_lock:
+            NotePlayer.envelope = envelope
+            NotePlayer.sounds.clear()
+
+    @staticmethod
+    def set_note_cache(note_cache: NoteCache):
+        """
+        :param note_cache: None to synthesize the notes on each start
+        :return:
+        """
+        with NotePlayer.sounds_lock:
+            NotePlayer.note_cache = note_cache
+            NotePlayer.sounds.clear()
+
+    @staticmethod
+    def get_synthesis_parameters() -> dict:
+        """
+        :return: what the notes shaped by the envelope depend on, apart from the frequency table
+        """
+        envelope = NotePlayer.envelope
+        return {"waveform": "sine", "sample rate": NotePlayer.samplerate, "amplitude": NotePlayer.AMPLITUDE,
+                "magic number": NotePlayer.MAGIC_NUMBER, "max cents error": Wavetable.MAX_CENTS_ERROR,
+                "max periods": Wavetable.MAX_PERIODS, "duration": NotePlayer.NOTE_DURATION,
+                "envelope": [envelope.attack, envelope.decay, envelope.sustain, envelope.release]}
+
+    def get_signal(self, note: str, octave: int) -> np.ndarray:
+        """
+        :param note: A A#...
+        :param octave:
+        :return: the samples of the sound of the note, mapped from the note cache if any
+        """
+        if not NotePlayer.envelope:
+            # a loop is synthesized faster than its file is mapped
+            return self.get_wavetable(note, octave).loop
+        note_cache = NotePlayer.note_cache
+        if note_cache:
+            parameters = NotePlayer.get_synthesis_parameters()
+            signal = note_cache.load(parameters, note, octave)
+            if signal is not None:
+                return signal
+        signal = self.generate_wave_from_note(note, octave)
+        if note_cache:
+            try:
+                note_cache.save(parameters, note, octave, signal)
+            except OSError:
+                pass  # eg a read-only folder: the note is synthesized again by the next start
+        return signal
+
+    def get_wavetable(self, note: str, octave: int) -> Wavetable:
+        """
+        :param note: A Ab A#...
+        :param octave:
+        :return: the loop of the note, computed on its first use
+        """
+        raw_note_name = note
+        if "b" in note:
+            raw_note_name = Note.CHROMATIC_SCALE_SHARP_BASED[Note.CHROMATIC_SCALE_FLAT_BASED.index(note)]
+        key = (raw_note_name, octave)
+        if key not in NotePlayer.wavetables:
+            freq = Note.notes[raw_note_name][octave]
+            NotePlayer.wavetables[key] = Wavetable(freq / NotePlayer.MAGIC_NUMBER, NotePlayer.samplerate,
+                                                   NotePlayer.AMPLITUDE)
+        return NotePlayer.wavetables[key]
+
+    def prewarm(self, lowest_note: Note, highest_note: Note):
+        """
+        synthesizes in the background the sounds from lowest_note to highest_note
+        - at most MAX_SOUNDS of them, starting from the lowest one
+        :param lowest_note:
+        :param highest_note:
+        :return:
+        """
+        notes = []
+        for octave in range(lowest_note.octave, highest_note.octave + 1):
             for note in Note.CHROMATIC_SCALE_SHARP_BASED:
-                NotePlayer.waves[note] = {}
-                for octave in range(0, 10):
-                    NotePlayer.waves[note][octave] = {}
-                    NotePlayer.waves[note][octave]["signal"] = self.generate_wave_from_note(note, octave)
-                    sound_id = pygame.mixer.Sound(self.waves[note][octave]["signal"])
-                    NotePlayer.waves[note][octave]["pygame_sound_id"] = sound_id
+                if lowest_note <= Note(f"{note}{octave}") <= highest_note:
+                    notes.append((note, octave))
+        self.prewarm_thread = threading.Thread(target=self._prewarm, args=(notes[:NotePlayer.MAX_SOUNDS],),
+                                               name="_prewarm", daemon=True)
+        self.prewarm_thread.start()
+
+    def _prewarm(self, notes: [(str, int)]):
+        for (note, octave) in notes:
+            with NotePlayer.sounds_lock:
+                is_cached = (note, octave) in NotePlayer.sounds
+            if not is_cached:
+                self.get_sound(note, octave)
 
     def _get_wave(self, freq: float, duration: float = 0.5) -> []:
         '''
@@ -34,11 +169,8 @@ class NotePlayer:
         as the input and returns a "numpy array" of values at all points
         in time
         '''
-        # factor to adjust frequency / todo: address this magic number to make things clearer
-        MAGIC_NUMBER = 4.3536363636363636363636363636364
-        amplitude = 4096
         t = np.linspace(0, duration, int(NotePlayer.samplerate * duration))
-        wave = amplitude * np.sin(2 * np.pi * freq * t / MAGIC_NUMBER)
+        wave = NotePlayer.AMPLITUDE * np.sin(2 * np.pi * freq * t / NotePlayer.MAGIC_NUMBER)
         return wave.astype(np.int16)
 
     def generate_wave_from_note(self, note: str, octave: int) -> []:
@@ -46,15 +178,9 @@ class NotePlayer:
 
         :param note: A Ab A#...
         :param octave:
-        :return:
+        :return: NOTE_DURATION seconds of the note, shaped by the envelope if any
         """
-        raw_note_name = note
-        if "b" in note:
-            raw_note_name = Note.CHROMATIC_SCALE_SHARP_BASED[Note.CHROMATIC_SCALE_FLAT_BASED.index(note)]
-        freq = Note.notes[raw_note_name][octave]
-        if self.debug:
-            print(f"Generating wav from {note}{octave} - {freq}Hz")
-        return self._get_wave(freq, 5)
+        return self.get_wavetable(note, octave).render(NotePlayer.NOTE_DURATION, NotePlayer.envelope)
 
     def play_note(self, note: str, octave: int):
         """
@@ -63,15 +189,16 @@ class NotePlayer:
         :param octave:
         :return:
         """
-        if NotePlayer.debug:
-            print("play_note:", note, octave)
-        pygame.mixer.Sound.play(NotePlayer.waves[note][octave]["pygame_sound_id"], maxtime=1000, fade_ms=400)
+        if NotePlayer.envelope:
+            pygame.mixer.Sound.play(self.get_sound(note, octave), maxtime=1000)
+        else:
+            pygame.mixer.Sound.play(self.get_sound(note, octave), loops=-1, maxtime=1000, fade_ms=400)
 
     def test_sound(self):
+        NotePlayer._init_pygame()
         for f in range(50, 20000, 100):
             sound = self._get_wave(f, 1)
             sound_id = pygame.mixer.Sound(sound)
-            print(f, "Hz")
             pygame.mixer.Sound.play(sound_id, maxtime=1000, fade_ms=400)
             time.sleep(1)
 
@@ -0,0 +1,211 @@
+"""
+Pitch detection engines used by MicAnalyzer
+
+Each engine gets the last window_size samples of the mic and returns the detected pitch in Hz (0.0 if none).
+The time needed to recognize a note is driven by window_size / sample_freq.
+    - "hps": Harmonic Product Spectrum - Copyright (c) 2021 chciken (MIT License)
+        See https://www.chciken.com/digital/signal/processing/2020/05/13/guitar-tuner.html
+    - "yin": YIN estimator - http://audition.ens.fr/adc/pdf/2002_JASA_YIN.pdf
+    - "autocorrelation": peak of the normalized autocorrelation
+    - "cepstrum": peak of the real cepstrum
+"""
+import numpy as np
+
+from audio.spectral_gate import SpectralGate
+from audio.stft import StreamingSTFT
+
+
+class PitchDetector:
+    WINDOW_SIZE = 2048  # window size in samples
+    WINDOW_STEP = 512  # step size of window, ie the block size of the mic stream
+    MIN_FREQ = 50  # lowest detected pitch in Hz
+    MAX_FREQ = 2000  # highest detected pitch in Hz
+
+    def __init__(self, sample_freq: int = 48000):
+        self.sample_freq = sample_freq
+        self.window_size = self.WINDOW_SIZE
+        self.window_step = self.WINDOW_STEP
+        self.min_lag = int(sample_freq / self.MAX_FREQ)
+        self.max_lag = min(int(sample_freq / self.MIN_FREQ) + 1, self.window_size // 2)
+
+    def get_latency(self) -> float:
+        """
+        :return: time in seconds needed to fill a detection window
+        """
+        return self.window_size / self.sample_freq
+
+    def detect(self, window_samples: np.ndarray) -> float:
+        """
+        :param window_samples: the last window_size samples, oldest first
+        :return: detected pitch in Hz, 0.0 if none
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def _parabolic_peak(values: np.ndarray, index: int) -> float:
+        """
+        refines the position of an extremum with a parabola through its neighbours
+        :param values:
+        :param index:
+        :return: fractional index
+        """
+        if index <= 0 or index >= len(values) - 1:
+            return float(index)
+        left, center, right = values[index - 1], values[index], values[index + 1]
+        denominator = left - 2 * center + right
+        if denominator == 0:
+            return float(index)
+        return index + 0.5 * (left - right) / denominator
+
+
+class HPSPitchDetector(PitchDetector):
+    WINDOW_SIZE = 48000  # window size of the DFT in samples
+    WINDOW_STEP = 12000  # step size of window
+    NUM_HPS = 5  # max number of harmonic product spectrums
+    ZERO_PADDING = 1  # DFT size / WINDOW_SIZE
+    HPS_RESOLUTION = 5  # candidate pitches per DFT bin, the spectrum is linearly interpolated in between
+    WHITE_NOISE_THRESH = 0.2  # everything under WHITE_NOISE_THRESH*avg_energy_per_freq is cut off
+    MAINS_HUM_FREQ = 62  # everything below MAINS_HUM_FREQ is cut off
+    OCTAVE_BANDS = [50, 100, 200, 400, 800, 1600, 3200, 6400, 12800, 25600]
+
+    def __init__(self, sample_freq: int = 48000):
+        super().__init__(sample_freq)
+        # the hann window of the STFT avoids spectral leakage
+        self.stft = StreamingSTFT(self.window_size, self.window_step, sample_freq, zero_padding=self.ZERO_PADDING)
+        self.delta_freq = self.stft.delta_freq  # frequency step width of the DFT
+        self.spectral_gate = SpectralGate(self.delta_freq, self.stft.nb_bins, self.OCTAVE_BANDS,
+                                          mains_hum_freq=self.MAINS_HUM_FREQ,
+                                          white_noise_thresh=self.WHITE_NOISE_THRESH)
+        # every bin is a candidate pitch, MAX_FREQ is not applied: a tone above it would otherwise be reported
+        # as one of its lower harmonics
+        self.nb_hps_bins = self.stft.nb_bins - 1
+        self.fractions = (np.arange(self.HPS_RESOLUTION) / self.HPS_RESOLUTION).astype(np.float32)
+        self.mag_spec_ipol = np.zeros((self.nb_hps_bins, self.HPS_RESOLUTION), dtype=np.float32)
+
+    def detect(self, window_samples: np.ndarray) -> float:
+        magnitude_spec = self.stft.magnitude(window_samples)
+
+        # supress mains hum and white noise per octave band
+        self.spectral_gate.apply(magnitude_spec)
+
+        norm = np.linalg.norm(magnitude_spec, ord=2)
+        if norm == 0:
+            return 0.0
+        magnitude_spec /= norm  # normalize it
+
+        # interpolate spectrum
+        mag_spec_ipol = np.multiply(np.diff(magnitude_spec[:self.nb_hps_bins + 1])[:, np.newaxis], self.fractions,
+                                    out=self.mag_spec_ipol)
+        mag_spec_ipol += magnitude_spec[:self.nb_hps_bins, np.newaxis]
+        mag_spec_ipol = mag_spec_ipol.ravel()
+
+        # calculate the HPS, the candidate pitches being those whose harmonics are in the spectrum
+        hps_spec = mag_spec_ipol
+        for i in range(self.NUM_HPS):
+            tmp_hps_spec = np.multiply(hps_spec[:int(np.ceil(len(mag_spec_ipol) / (i + 1)))],
+                                       mag_spec_ipol[::(i + 1)])
+            if not tmp_hps_spec.any():
+                break
+            hps_spec = tmp_hps_spec
+
+        max_ind = np.argmax(hps_spec)
+        return max_ind * self.delta_freq / self.HPS_RESOLUTION
+
+
+class YINPitchDetector(PitchDetector):
+    THRESHOLD = 0.15  # absolute threshold of the cumulative mean normalized difference
+
+    def detect(self, window_samples: np.ndarray) -> float:
+        x = window_samples.astype(np.float64)
+        integration_size = len(x) - self.max_lag
+        fft_size = 1 << int(np.ceil(np.log2(len(x) + integration_size)))
+        # difference function d(tau) = sum (x[j] - x[j + tau])^2 for j in [0, integration_size[
+        energy = np.concatenate(([0.0], np.cumsum(x * x)))
+        lags = np.arange(self.max_lag)
+        correlation = np.fft.irfft(np.fft.rfft(x, fft_size) * np.conj(np.fft.rfft(x[:integration_size], fft_size)),
+                                   fft_size)[:self.max_lag]
+        difference = energy[integration_size] + energy[lags + integration_size] - energy[lags] - 2 * correlation
+        # cumulative mean normalized difference
+        cumulative = np.cumsum(difference[1:])
+        cmnd = np.ones(self.max_lag)
+        cmnd[1:] = np.divide(difference[1:] * lags[1:], cumulative, out=np.ones(self.max_lag - 1),
+                             where=cumulative > 0)
+        candidates = np.nonzero(cmnd[self.min_lag:] < self.THRESHOLD)[0]
+        if len(candidates) == 0:
+            return 0.0
+        tau = self.min_lag + candidates[0]
+        while tau + 1 < self.max_lag and cmnd[tau + 1] < cmnd[tau]:
+            tau += 1
+        return self.sample_freq / self._parabolic_peak(cmnd, tau)
+
+
+class AutocorrelationPitchDetector(PitchDetector):
+    VOICING_THRESH = 0.3  # normalized autocorrelation peak under which the window is considered as unvoiced
+
+    def detect(self, window_samples: np.ndarray) -> float:
+        x = window_samples.astype(np.float64)
+        x = x - x.mean()
+        fft_size = 1 << int(np.ceil(np.log2(2 * len(x))))
+        spectrum = np.fft.rfft(x, fft_size)
+        autocorrelation = np.fft.irfft(spectrum * np.conj(spectrum), fft_size)[:self.max_lag + 1]
+        if autocorrelation[0] <= 0:
+            return 0.0
+        autocorrelation = autocorrelation / autocorrelation[0]
+        # skip the main lobe around lag 0
+        negative_lags = np.nonzero(autocorrelation[self.min_lag:] < 0)[0]
+        if len(negative_lags) == 0:
+            return 0.0
+        start = self.min_lag + negative_lags[0]
+        if start >= self.max_lag:
+            return 0.0
+        tau = start + int(np.argmax(autocorrelation[start:self.max_lag]))
+        if autocorrelation[tau] < self.VOICING_THRESH:
+            return 0.0
+        return self.sample_freq / self._parabolic_peak(autocorrelation, tau)
+
+
+class CepstrumPitchDetector(PitchDetector):
+    WINDOW_SIZE = 8192
+    WINDOW_STEP = 2048
+    DYNAMIC_RANGE = 1e-2  # spectrum floor relative to its maximum (-40dB) to keep the noise out of the cepstrum
+    SUBHARMONIC_RATIO = 0.7  # a peak at a fraction of the period is kept if it reaches this ratio of the highest peak
+
+    def __init__(self, sample_freq: int = 48000):
+        super().__init__(sample_freq)
+        self.hann_window = np.hanning(self.window_size)
+
+    def detect(self, window_samples: np.ndarray) -> float:
+        magnitude_spec = np.abs(np.fft.rfft(window_samples * self.hann_window))
+        if not magnitude_spec.any():
+            return 0.0
+        cepstrum = np.fft.irfft(np.log(magnitude_spec + self.DYNAMIC_RANGE * magnitude_spec.max()))
+        tau = self.min_lag + int(np.argmax(cepstrum[self.min_lag:self.max_lag]))
+        # prefer the fundamental when the highest peak is found at a multiple of its period
+        fundamental_tau = tau
+        for k in range(2, tau // self.min_lag + 1):
+            center = int(round(tau / k))
+            start = max(center - 2, self.min_lag)
+            candidate = start + int(np.argmax(cepstrum[start:center + 3]))
+            if cepstrum[candidate] >= self.SUBHARMONIC_RATIO * cepstrum[tau]:
+                fundamental_tau = candidate
+        return self.sample_freq / self._parabolic_peak(cepstrum, fundamental_tau)
+
+
+DEFAULT_PITCH_DETECTOR = "hps"
+PITCH_DETECTORS = {
+    "hps": HPSPitchDetector,
+    "yin": YINPitchDetector,
+    "autocorrelation": AutocorrelationPitchDetector,
+    "cepstrum": CepstrumPitchDetector,
+}
+
+
+def create_pitch_detector(name: str = DEFAULT_PITCH_DETECTOR, sample_freq: int = 48000) -> PitchDetector:
+    """
+    :param name: one of PITCH_DETECTORS
+    :param sample_freq:
+    :return: a new pitch detection engine
+    """
+    if name not in PITCH_DETECTORS:
+        raise ValueError(f"{name} is not a known pitch detector - use one of {list(PITCH_DETECTORS)}")
+    return PITCH_DETECTORS[name](sample_freq)
@@ -0,0 +1,48 @@
+import numpy as np
+
+
+class SampleRingBuffer:
+    """
+    Fixed-size sample window fed block by block by the audio callback.
+    The storage is allocated once and every sample is written twice (at i and i + size),
+    so the last `size` samples are always available as one contiguous slice: window() is a zero-copy view.
+    """
+
+    def __init__(self, size: int, dtype=np.float32):
+        self.size = size
+        self._buffer = np.zeros(2 * size, dtype=dtype)
+        self._write_index = 0
+
+    def write(self, samples: np.ndarray):
+        """
+        appends samples in place, the oldest ones are overwritten
+        :param samples: 1D array of samples
+        :return:
+        """
+        nb_samples = len(samples)
+        if nb_samples >= self.size:
+            samples = samples[nb_samples - self.size:]
+            nb_samples = self.size
+        end = self._write_index + nb_samples
+        if end <= self.size:
+            self._copy(self._write_index, samples)
+        else:
+            first_part = self.size - self._write_index
+            self._copy(self._write_index, samples[:first_part])
+            self._copy(0, samples[first_part:])
+        self._write_index = end % self.size
+
+    def _copy(self, start: int, samples: np.ndarray):
+        end = start + len(samples)
+        self._buffer[start:end] = samples
+        self._buffer[start + self.size:end + self.size] = samples
+
+    def window(self) -> np.ndarray:
+        """
+        :return: view on the last `size` samples, oldest first - must not be kept after the next write()
+        """
+        return self._buffer[self._write_index:self._write_index + self.size]
+
+    def clear(self):
+        self._buffer.fill(0)
+        self._write_index = 0
@@ -0,0 +1,58 @@
+import numpy as np
+
+
+class SpectralGate:
+    """
+    Spectral cleaning stage of the HPS pitch detection
+        - mains hum suppression: every bin below mains_hum_freq is set to zero
+        - white noise suppression: in each octave band, every bin under white_noise_thresh * RMS of the band is cut off
+    The band index table is computed once for a given spectrum length
+    so that apply() only performs a few NumPy masked operations.
+    """
+
+    def __init__(self, delta_freq: float, nb_bins: int, octave_bands: [], mains_hum_freq: float = 62,
+                 white_noise_thresh: float = 0.2):
+        """
+        :param delta_freq: frequency step between two bins in Hz
+        :param nb_bins: length of the magnitude spectrum
+        :param octave_bands: band limits in Hz, eg [50, 100, 200, ...]
+        :param mains_hum_freq: everything below this frequency is cut off
+        :param white_noise_thresh: everything under white_noise_thresh * avg_energy_per_freq is cut off
+        """
+        self.delta_freq = delta_freq
+        self.nb_bins = nb_bins
+        self.white_noise_thresh = white_noise_thresh
+        self.hum_end = int(mains_hum_freq / delta_freq)
+        self.bands = []
+        for j in range(len(octave_bands) - 1):
+            ind_start = int(octave_bands[j] / delta_freq)
+            ind_end = min(int(octave_bands[j + 1] / delta_freq), nb_bins)
+            if ind_end > ind_start:
+                self.bands.append((ind_start, ind_end))
+        self.band_lengths = np.array([end - start for (start, end) in self.bands], dtype=np.intp)
+        self.gated_start = self.bands[0][0] if self.bands else 0
+        self.gated_end = self.bands[-1][1] if self.bands else 0
+        # bands are expected to be contiguous so that one threshold per bin can be built with np.repeat()
+        self.is_contiguous = all(self.bands[j][1] == self.bands[j + 1][0] for j in range(len(self.bands) - 1))
+
+    def apply(self, magnitude_spec: np.ndarray) -> np.ndarray:
+        """
+        cleans the spectrum in place
+        :param magnitude_spec: magnitude spectrum of nb_bins values
+        :return: magnitude_spec
+        """
+        magnitude_spec[:self.hum_end] = 0
+        thresholds = np.empty(len(self.bands), dtype=magnitude_spec.dtype)
+        for j, (ind_start, ind_end) in enumerate(self.bands):
+            avg_energy_per_freq = (np.linalg.norm(magnitude_spec[ind_start:ind_end], ord=2) ** 2) / (
+                    ind_end - ind_start)
+            avg_energy_per_freq = avg_energy_per_freq ** 0.5
+            thresholds[j] = self.white_noise_thresh * avg_energy_per_freq
+        if self.is_contiguous:
+            gated_spec = magnitude_spec[self.gated_start:self.gated_end]
+            gated_spec[~(gated_spec > np.repeat(thresholds, self.band_lengths))] = 0
+        else:
+            for j, (ind_start, ind_end) in enumerate(self.bands):
+                band = magnitude_spec[ind_start:ind_end]
+                band[~(band > thresholds[j])] = 0
+        return magnitude_spec
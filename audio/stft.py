@@ -0,0 +1,65 @@
+import threading
+
+import numpy as np
+import scipy.fft
+import scipy.signal
+
+
+class StreamingSTFT:
+    """
+    Short-time Fourier transform of a sample stream
+    A magnitude spectrum of the last window_size samples is computed every hop_size samples with a real-input FFT,
+    the frames being kept by the caller, eg in the SampleRingBuffer of MicAnalyzer:
+        - the analysis windows are computed once per (window, size) and shared
+        - the FFT plans are reused by scipy.fft from one frame to another
+        - zero_padding > 1 pads each frame to zero_padding * window_size samples,
+          which samples the spectrum on a finer frequency grid
+    """
+    windows = {}
+    windows_lock = threading.Lock()
+
+    def __init__(self, window_size: int, hop_size: int, sample_freq: int = 48000, zero_padding: int = 1,
+                 window: str = "hann"):
+        """
+        :param window_size: samples per frame
+        :param hop_size: samples between two frames
+        :param sample_freq:
+        :param zero_padding: FFT size / window_size
+        :param window: any window name of scipy.signal.get_window()
+        """
+        if window_size <= 0 or hop_size <= 0 or zero_padding < 1:
+            raise ValueError(f"window size ({window_size}), hop size ({hop_size}) must be > 0 "
+                             f"and zero padding ({zero_padding}) >= 1")
+        self.window_size = window_size
+        self.hop_size = hop_size
+        self.sample_freq = sample_freq
+        self.fft_size = window_size * zero_padding
+        self.nb_bins = self.fft_size // 2 + 1
+        self.delta_freq = sample_freq / self.fft_size  # frequency step between two bins in Hz
+        self.window = StreamingSTFT.get_window(window, window_size)
+        self.windowed_samples = np.zeros(window_size, dtype=np.float32)
+
+    @staticmethod
+    def get_window(window: str, size: int) -> np.ndarray:
+        """
+        :return: shared symmetric window, eg np.hanning(size) for "hann" - must not be modified
+        """
+        key = (window, size)
+        with StreamingSTFT.windows_lock:
+            if key not in StreamingSTFT.windows:
+                StreamingSTFT.windows[key] = scipy.signal.get_window(window, size, fftbins=False).astype(np.float32)
+            return StreamingSTFT.windows[key]
+
+    def magnitude(self, window_samples: np.ndarray) -> np.ndarray:
+        """
+        :param window_samples: the window_size samples of a frame, oldest first
+        :return: magnitude spectrum of nb_bins values
+        """
+        np.multiply(window_samples, self.window, out=self.windowed_samples)
+        return np.abs(scipy.fft.rfft(self.windowed_samples, n=self.fft_size))
+
+    def get_frequencies(self) -> np.ndarray:
+        """
+        :return: frequency of each bin in Hz
+        """
+        return np.arange(self.nb_bins) * self.delta_freq
@@ -0,0 +1,109 @@
+import numpy as np
+
+
+class ADSREnvelope:
+    """
+    Attack / Decay / Sustain / Release envelope applied when a wavetable is rendered
+    The gains are computed once per note length.
+    """
+
+    def __init__(self, attack: float = 0.01, decay: float = 0.1, sustain: float = 0.7, release: float = 0.2):
+        """
+        :param attack: seconds from silence to the peak
+        :param decay: seconds from the peak to the sustain level
+        :param sustain: level in [0, 1] held until the release
+        :param release: seconds from the sustain level to silence, at the end of the note
+        """
+        if min(attack, decay, release) < 0 or not 0 <= sustain <= 1:
+            raise ValueError(f"durations must be >= 0 and the sustain level in [0, 1] - "
+                             f"got {attack}, {decay}, {sustain}, {release}")
+        self.attack = attack
+        self.decay = decay
+        self.sustain = sustain
+        self.release = release
+        self.gains = {}  # (nb_samples, sample_rate) -> gains
+
+    def get_gains(self, nb_samples: int, sample_rate: int) -> np.ndarray:
+        """
+        :return: gain of each sample of a note - must not be modified
+        """
+        key = (nb_samples, sample_rate)
+        if key not in self.gains:
+            t = np.arange(nb_samples) / sample_rate
+            end = nb_samples / sample_rate
+            attack_decay_sustain = np.interp(t, [0, self.attack, self.attack + self.decay], [0, 1, self.sustain])
+            release = np.interp(t, [max(end - self.release, 0), end], [1, 0])
+            self.gains[key] = (attack_decay_sustain * release).astype(np.float32)
+        return self.gains[key]
+
+    def get_levels(self, times: np.ndarray, release_time: float = None) -> np.ndarray:
+        """
+        streaming flavour of get_gains() for notes whose length is unknown when they start
+        :param times: seconds since the note on
+        :param release_time: seconds between the note on & the note off, None if the note is still on
+        :return: gain at each time
+        """
+        levels = np.interp(times, [0, self.attack, self.attack + self.decay], [0, 1, self.sustain])
+        if release_time is not None:
+            release_level = np.interp(release_time, [0, self.attack, self.attack + self.decay], [0, 1, self.sustain])
+            released = times >= release_time
+            if self.release > 0:
+                levels[released] = release_level * np.clip(1 - (times[released] - release_time) / self.release, 0, 1)
+            else:
+                levels[released] = 0
+        return levels
+
+    def is_over(self, time: float, release_time: float = None) -> bool:
+        """
+        :return: True once the release of the note is over
+        """
+        return release_time is not None and time >= release_time + self.release
+
+
+class Wavetable:
+    """
+    Single loop of a sine wave, rendered once per pitch & tiled on demand
+    The loop holds the smallest number of periods whose length in samples is close enough to an integer:
+    its pitch error stays under MAX_CENTS_ERROR, so it can be repeated seamlessly.
+    """
+    MAX_CENTS_ERROR = 0.5
+    MAX_PERIODS = 256
+
+    def __init__(self, freq: float, sample_rate: int = 44100, amplitude: int = 4096):
+        """
+        :param freq: in Hz
+        :param sample_rate: in Hz
+        :param amplitude: of the int16 samples
+        """
+        if not 0 < freq < sample_rate / 2:
+            raise ValueError(f"{freq}Hz cannot be sampled at {sample_rate}Hz")
+        self.sample_rate = sample_rate
+        self.amplitude = amplitude
+        period = sample_rate / freq
+        nb_periods = np.arange(1, self.MAX_PERIODS + 1)
+        lengths = np.maximum(np.rint(nb_periods * period), 1)
+        cents_errors = np.abs(1200 * np.log2(lengths / (nb_periods * period)))
+        accurate = np.nonzero(cents_errors <= self.MAX_CENTS_ERROR)[0]
+        best = accurate[0] if len(accurate) else int(np.argmin(cents_errors))
+        self.nb_periods = int(nb_periods[best])
+        length = int(lengths[best])
+        self.freq = self.nb_periods * sample_rate / length  # actual pitch of the loop
+        self.loop = (amplitude * np.sin(2 * np.pi * self.nb_periods * np.arange(length) / length)).astype(np.int16)
+
+    def tile(self, nb_samples: int) -> np.ndarray:
+        """
+        :return: nb_samples of the wave
+        """
+        return np.resize(self.loop, nb_samples)
+
+    def render(self, duration: float, envelope: ADSREnvelope = None) -> np.ndarray:
+        """
+        :param duration: in seconds
+        :param envelope: None for a constant level
+        :return: int16 samples of the note
+        """
+        nb_samples = int(duration * self.sample_rate)
+        if not envelope:
+            return self.tile(nb_samples)
+        gains = envelope.get_gains(nb_samples, self.sample_rate)
+        return (self.tile(nb_samples) * gains).astype(np.int16)
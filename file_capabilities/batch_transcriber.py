@@ -0,0 +1,242 @@
+"""
+Parallel offline transcription of a sound library, eg the files grabbed in download/
+
+The files are split into time segments which are transcribed by a pool of processes (one per core by default).
+Each segment starts with an overlap of the previous one, so that the detection window is full at its start;
+the notes heard in the overlap are dropped and the segments are merged back into one timeline per file.
+Each transcription is saved as JSON, named after the file & a hash of its path, next to a manifest
+which makes the batch resumable: files already transcribed since their last modification are skipped.
+A file which can't be transcribed, eg an unsupported WAV format, is recorded with its error in the manifest
+& tried again by the next batch, the other files being transcribed anyway.
+
+python -m file_capabilities.batch_transcriber download [-o transcriptions] [-j 4] [-d yin]
+"""
+import argparse
+import hashlib
+import json
+import os
+import wave
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import timedelta
+
+from audio.mic_analyzer import MicAnalyzer
+from audio.pitch_detectors import DEFAULT_PITCH_DETECTOR, PITCH_DETECTORS
+from file_capabilities.sound_file_transcriber import SoundFileTranscriber, get_sound_file_duration
+
+SOUND_FILE_EXTENSIONS = [".wav", ".mp3", ".mp4", ".m4a", ".webm", ".ogg", ".flac"]
+transcribers = {}  # transcribers of a worker process per pitch detector
+
+
+def transcribe_segment(file_name: str, start: float, duration: float, pitch_detector: str) -> [(str, float)]:
+    """
+    runs in a worker process
+    :param file_name:
+    :param start: position of the segment in seconds
+    :param duration: duration of the segment in seconds, None up to the end of the file
+    :param pitch_detector:
+    :return: the notes heard from start, with their position in seconds
+    """
+    if pitch_detector not in transcribers:
+        transcribers[pitch_detector] = SoundFileTranscriber(pitch_detector)
+    transcriber = transcribers[pitch_detector]
+    # the samples of the overlap only fill the detection window
+    # + the blocks are aligned on the ones of a whole file analysis
+    overlap = BatchTranscriber.get_overlap(transcriber.mic_analyzer)
+    window_step = transcriber.mic_analyzer.get_pitch_detector().window_step
+    read_start = max(int((start - overlap) * MicAnalyzer.SAMPLE_FREQ) // window_step, 0) * window_step \
+        / MicAnalyzer.SAMPLE_FREQ
+    read_duration = None if duration is None else duration + start - read_start
+    song = [(note, chrono.total_seconds()) for (note, chrono) in transcriber.transcribe(file_name, read_start,
+                                                                                        read_duration)]
+    # the note heard when the segment starts is kept at its start
+    heard_before = [(note, start) for (note, seconds) in song if seconds < start][-1:]
+    return heard_before + [(note, seconds) for (note, seconds) in song if seconds >= start]
+
+
+def merge_segments(segments: [[(str, float)]]) -> [(str, timedelta)]:
+    """
+    :param segments: notes of the consecutive segments of a file
+    :return: one timeline, a note repeated at the start of the next segment is kept once
+    """
+    song = []
+    for segment in segments:
+        for (note, seconds) in segment:
+            if not song or song[-1][0] != note:
+                song.append((note, timedelta(seconds=seconds)))
+    return song
+
+
+class BatchTranscriber:
+    SEGMENT_DURATION = 120  # files are split in segments of this duration in seconds
+    MANIFEST = "manifest.json"
+
+    def __init__(self, output_folder: str, pitch_detector: str = DEFAULT_PITCH_DETECTOR, nb_workers: int = None,
+                 segment_duration: float = SEGMENT_DURATION):
+        """
+        :param output_folder: where the transcriptions & the manifest are saved
+        :param pitch_detector: name of the pitch detection engine, see audio.pitch_detectors.PITCH_DETECTORS
+        :param nb_workers: number of processes, the number of cores by default
+        :param segment_duration: in seconds
+        """
+        if pitch_detector not in PITCH_DETECTORS:
+            raise ValueError(f"{pitch_detector} is not a known pitch detector - use one of {list(PITCH_DETECTORS)}")
+        if segment_duration <= 0:
+            raise ValueError(f"the segment duration ({segment_duration}) must be > 0")
+        self.output_folder = output_folder
+        self.pitch_detector = pitch_detector
+        self.nb_workers = nb_workers or os.cpu_count()
+        self.segment_duration = segment_duration
+        self.manifest_file = os.path.join(output_folder, self.MANIFEST)
+        self.manifest = {}
+        self.errors = {}  # file name -> error of the last batch
+
+    @staticmethod
+    def get_overlap(mic_analyzer: MicAnalyzer) -> float:
+        """
+        :return: seconds heard before a segment so that its first note is detected as in a whole file analysis
+        """
+        window_step = mic_analyzer.get_pitch_detector().window_step
+        nb_samples = mic_analyzer.get_pitch_detector().window_size + len(mic_analyzer.noteBuffer) * window_step
+        return nb_samples / MicAnalyzer.SAMPLE_FREQ
+
+    @staticmethod
+    def find_sound_files(folder: str) -> [str]:
+        """
+        :return: sound files of the folder & its sub folders
+        """
+        sound_files = []
+        for (path, _, file_names) in os.walk(folder):
+            for file_name in sorted(file_names):
+                if os.path.splitext(file_name)[1].lower() in SOUND_FILE_EXTENSIONS:
+                    sound_files.append(os.path.join(path, file_name))
+        return sorted(sound_files)
+
+    def load_manifest(self):
+        self.manifest = {}
+        if os.path.isfile(self.manifest_file):
+            with open(self.manifest_file, encoding='utf-8') as file:
+                self.manifest = json.load(file)
+
+    def save_manifest(self):
+        os.makedirs(self.output_folder, exist_ok=True)
+        tmp_file = self.manifest_file + ".tmp"
+        with open(tmp_file, "w", encoding='utf-8') as file:
+            json.dump(self.manifest, file, indent=4)
+        os.replace(tmp_file, self.manifest_file)  # the manifest is never left half written
+
+    @staticmethod
+    def get_mtime(file_name: str) -> float:
+        """
+        :return: the modification time of the file, None if it can't be read, eg deleted during the batch
+        """
+        try:
+            return os.path.getmtime(file_name)
+        except OSError:
+            return None
+
+    def is_transcribed(self, file_name: str) -> bool:
+        entry = self.manifest.get(os.path.abspath(file_name))
+        mtime = self.get_mtime(file_name)
+        return bool(entry) and "transcription" in entry and mtime is not None and entry["mtime"] == mtime \
+            and os.path.isfile(os.path.join(self.output_folder, entry["transcription"]))
+
+    def get_segments(self, file_name: str) -> [(float, float)]:
+        """
+        :return: (start, duration) of each segment of the file, the duration of the last one is None
+        """
+        try:
+            duration = get_sound_file_duration(file_name)
+        except (ValueError, EOFError, OSError, wave.Error):
+            return [(0.0, None)]  # unknown duration: the file is a single segment
+        nb_segments = max(int(-(-duration // self.segment_duration)), 1)
+        return [(i * self.segment_duration, self.segment_duration if i < nb_segments - 1 else None)
+                for i in range(nb_segments)]
+
+    def transcribe(self, file_names: [str], progress=None) -> {str: [(str, timedelta)]}:
+        """
+        :param file_names: the files already transcribed since their last modification are skipped
+        :param progress: called with (nb of transcribed segments, nb of segments, file name) after each segment
+        :return: new transcriptions per file - the files which failed are in errors
+        """
+        self.load_manifest()
+        self.errors = {}
+        pending_files = [file_name for file_name in file_names if not self.is_transcribed(file_name)]
+        segments = {file_name: self.get_segments(file_name) for file_name in pending_files}
+        nb_segments = sum(len(file_segments) for file_segments in segments.values())
+        results = {file_name: [None] * len(file_segments) for (file_name, file_segments) in segments.items()}
+        transcriptions = {}
+        nb_done = 0
+        with ProcessPoolExecutor(max_workers=self.nb_workers) as executor:
+            futures = {}
+            for (file_name, file_segments) in segments.items():
+                for (i, (start, duration)) in enumerate(file_segments):
+                    future = executor.submit(transcribe_segment, file_name, start, duration, self.pitch_detector)
+                    futures[future] = (file_name, i)
+            for future in as_completed(futures):
+                file_name, i = futures[future]
+                nb_done += 1
+                if progress:
+                    progress(nb_done, nb_segments, file_name)
+                if file_name in self.errors:
+                    continue  # another segment of the file failed
+                try:
+                    results[file_name][i] = future.result()
+                except Exception as err:  # eg wave.Error or ValueError raised by the worker, or a worker crash
+                    self._save_error(file_name, err)
+                    continue
+                if all(segment is not None for segment in results[file_name]):
+                    transcriptions[file_name] = merge_segments(results.pop(file_name))
+                    self._save_transcription(file_name, transcriptions[file_name])
+        return transcriptions
+
+    @staticmethod
+    def get_transcription_name(file_name: str) -> str:
+        """
+        :return: name of the JSON transcription of the file, distinct for the files of the same name in other
+                 folders or with another extension, eg "song-1a2b3c4d.json" for "download/rock/song.mp3"
+        """
+        path_hash = hashlib.sha1(os.path.abspath(file_name).encode('utf-8')).hexdigest()[:8]
+        return f"{os.path.splitext(os.path.basename(file_name))[0]}-{path_hash}.json"
+
+    def _save_transcription(self, file_name: str, song: [(str, timedelta)]):
+        transcription = self.get_transcription_name(file_name)
+        os.makedirs(self.output_folder, exist_ok=True)
+        with open(os.path.join(self.output_folder, transcription), "w", encoding='utf-8') as file:
+            json.dump({"file": os.path.abspath(file_name), "pitch detector": self.pitch_detector,
+                       "song": [[note, chrono.total_seconds()] for (note, chrono) in song]}, file)
+        self.manifest[os.path.abspath(file_name)] = {"mtime": self.get_mtime(file_name),
+                                                     "transcription": transcription}
+        self.save_manifest()
+
+    def _save_error(self, file_name: str, err: Exception):
+        self.errors[file_name] = f"{type(err).__name__}: {err}"
+        self.manifest[os.path.abspath(file_name)] = {"mtime": self.get_mtime(file_name),
+                                                     "error": self.errors[file_name]}
+        self.save_manifest()
+
+
+def print_progress(nb_done: int, nb_segments: int, file_name: str):
+    print(f"{nb_done}/{nb_segments} segments - {file_name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('folder', nargs='?', default="download", help='sound library (default: %(default)s)')
+    parser.add_argument('-o', '--output', default="transcriptions",
+                        help='transcriptions & manifest folder (default: %(default)s)')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(),
+                        help='number of processes (default: %(default)s)')
+    parser.add_argument('-d', '--detector', default=DEFAULT_PITCH_DETECTOR, choices=list(PITCH_DETECTORS),
+                        help='pitch detector (default: %(default)s)')
+    parser.add_argument('-s', '--segment', type=float, default=BatchTranscriber.SEGMENT_DURATION,
+                        help='segment duration in seconds (default: %(default)s)')
+    args = parser.parse_args()
+    batch_transcriber = BatchTranscriber(args.output, args.detector, args.jobs, args.segment)
+    transcriptions = batch_transcriber.transcribe(BatchTranscriber.find_sound_files(args.folder), print_progress)
+    for (file_name, error) in batch_transcriber.errors.items():
+        print(f"{file_name} not transcribed - {error}")
+    print(f"{len(transcriptions)} files transcribed in {args.output}, {len(batch_transcriber.errors)} failed")
+
+
+if __name__ == "__main__":
+    main()
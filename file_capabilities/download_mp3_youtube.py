@@ -6,8 +6,10 @@ from tkinter.ttk import Progressbar
 from pytube import YouTube
 import os
 
+from screen_manager import Screen
 
-class DownloadMP3Youtube(tkinter.Tk):
+
+class DownloadMP3Youtube(tkinter.Tk, Screen):
     def __init__(self):
         self.download_thread = None
         self.frame = None
@@ -33,6 +35,9 @@ class DownloadMP3Youtube(tkinter.Tk):
         self.progress_bar.pack()
         return self.frame
 
+    def is_busy(self) -> bool:
+        return bool(self.download_thread) and self.download_thread.is_alive()
+
     def do_download_mp3_from_url(self):
         self.download_thread = threading.Thread(target=self._download_mp3, name="_download_songs")
         self.download_thread.start()
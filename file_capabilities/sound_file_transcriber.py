@@ -0,0 +1,256 @@
+"""
+Offline note transcription of sound files
+
+The file is streamed chunk by chunk through the MicAnalyzer DSP path, so that memory stays bounded
+whatever the duration and the analysis runs as fast as the CPU allows.
+    - WAV files are read with the wave module
+    - any other format (MP3, MP4 audio downloaded from Youtube...) is decoded by ffmpeg, which must be in the PATH
+The result is the list of (note, chrono) tuples collected by VoiceTraining.song.
+
+python -m file_capabilities.sound_file_transcriber "download/my song.mp4" [-d yin]
+"""
+import argparse
+import itertools
+import math
+import os
+import subprocess
+import wave
+from datetime import timedelta
+
+import numpy as np
+from scipy.signal import resample_poly
+
+from audio.mic_analyzer import MicAnalyzer, MicListener
+from audio.pitch_detectors import DEFAULT_PITCH_DETECTOR, PITCH_DETECTORS
+
+
+def get_resampling_margin(up: int, down: int) -> int:
+    """
+    :return: input samples on each side of a sample which are read by the filter of resample_poly(),
+             rounded up to a multiple of down
+    """
+    half_len = 10 * max(up, down)  # half length of the default filter of resample_poly(), at up times the rate
+    margin = -(-half_len // up) + 1
+    return -(-margin // down) * down
+
+
+def resample_chunks(chunks, up: int, down: int):
+    """
+    resamples a stream of chunks by up / down as if the whole stream was resampled at once:
+    each chunk is resampled along with the samples around it, so that no chunk edge is padded with zeros
+    :param chunks: of float32 samples, all but the last one of a multiple of down samples
+                   & at least get_resampling_margin() long
+    :param up:
+    :param down:
+    :return: generator of the resampled float32 chunks, one per chunk - each one is delayed until the next is read
+    """
+    margin = get_resampling_margin(up, down)
+    previous_samples = np.zeros(0, dtype=np.float32)  # the last margin samples of the previous chunks
+    current_chunk = None
+    for next_chunk in itertools.chain(chunks, [None]):
+        if current_chunk is not None:
+            next_samples = next_chunk[:margin] if next_chunk is not None else previous_samples[:0]
+            resampled = resample_poly(np.concatenate((previous_samples, current_chunk, next_samples)), up, down)
+            first = len(previous_samples) * up // down
+            yield resampled[first:first + -(-len(current_chunk) * up // down)].astype(np.float32)
+            previous_samples = np.concatenate((previous_samples, current_chunk))[-margin:]
+        current_chunk = next_chunk
+
+
+def decode_pcm(frames: bytes, sample_width: int) -> np.ndarray:
+    """
+    :param frames: little endian PCM samples, unsigned if 8 bits, else signed
+    :param sample_width: 1, 2, 3 or 4 bytes
+    :return: float32 samples in [-1, 1]
+    """
+    if sample_width == 1:
+        return (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128) / 128
+    if sample_width == 2:
+        return np.frombuffer(frames, dtype=np.int16).astype(np.float32) / 2 ** 15
+    if sample_width == 3:
+        # each 24 bits sample is shifted into the 3 high bytes of an int32
+        padded = np.zeros((len(frames) // 3, 4), dtype=np.uint8)
+        padded[:, 1:] = np.frombuffer(frames, dtype=np.uint8).reshape(-1, 3)
+        return padded.view('<i4').ravel().astype(np.float32) / 2 ** 31
+    return np.frombuffer(frames, dtype=np.int32).astype(np.float32) / 2 ** 31
+
+
+def read_wav_file(file_name: str, chunk_size: int, sample_freq: int, start: float = 0.0, duration: float = None):
+    """
+    :param file_name: 8, 16, 24 or 32 bits PCM WAV file
+    :param chunk_size: samples per chunk at the file sample rate
+    :param sample_freq: the chunks are resampled to this rate if needed
+    :param start: position in seconds of the first sample to read
+    :param duration: seconds to read, None up to the end of the file
+    :return: generator of the first channel as float32 chunks in [-1, 1]
+    """
+    with wave.open(file_name, "rb") as wav:
+        sample_width = wav.getsampwidth()
+        frame_rate = wav.getframerate()
+        if sample_width not in [1, 2, 3, 4]:
+            raise ValueError(f"{file_name}: {8 * sample_width} bits samples not supported")
+        up = sample_freq // math.gcd(frame_rate, sample_freq)
+        down = frame_rate // math.gcd(frame_rate, sample_freq)
+        if frame_rate != sample_freq:
+            # the chunks are resampled as a stream: their size must be a multiple of the downsampling factor
+            chunk_size = max(chunk_size // down * down, get_resampling_margin(up, down))
+        chunks = read_wav_chunks(wav, chunk_size, start, duration)
+        if frame_rate == sample_freq:
+            yield from chunks
+        else:
+            yield from resample_chunks(chunks, up, down)
+
+
+def read_wav_chunks(wav: wave.Wave_read, chunk_size: int, start: float = 0.0, duration: float = None):
+    """
+    :return: generator of the first channel of the opened WAV file as float32 chunks in [-1, 1],
+             at the file sample rate
+    """
+    sample_width = wav.getsampwidth()
+    nb_channels = wav.getnchannels()
+    frame_rate = wav.getframerate()
+    first_frame = min(round(start * frame_rate), wav.getnframes())
+    wav.setpos(first_frame)
+    nb_frames = wav.getnframes() - first_frame
+    if duration is not None:
+        nb_frames = min(int(duration * frame_rate), nb_frames)
+    while nb_frames > 0:
+        frames = wav.readframes(min(chunk_size, nb_frames))
+        if not frames:
+            break
+        nb_frames -= len(frames) // (sample_width * nb_channels)
+        yield decode_pcm(frames, sample_width)[::nb_channels]
+
+
+def read_compressed_file(file_name: str, chunk_size: int, sample_freq: int, start: float = 0.0,
+                         duration: float = None):
+    """
+    :param file_name: any file ffmpeg can decode
+    :param chunk_size: samples per chunk
+    :param sample_freq:
+    :param start: position in seconds of the first sample to read
+    :param duration: seconds to read, None up to the end of the file
+    :return: generator of the mono float32 chunks decoded by ffmpeg
+    """
+    command = ["ffmpeg", "-v", "error", "-ss", str(start), "-i", file_name]
+    if duration is not None:
+        command += ["-t", str(duration)]
+    try:
+        decoder = subprocess.Popen(command + ["-f", "f32le", "-ac", "1", "-ar", str(sample_freq), "-"],
+                                   stdout=subprocess.PIPE)
+    except FileNotFoundError:
+        raise ValueError(f"{file_name}: ffmpeg is needed to decode this file, only WAV files can be read without it")
+    try:
+        while True:
+            data = decoder.stdout.read(4 * chunk_size)
+            if not data:
+                break
+            yield np.frombuffer(data[:len(data) // 4 * 4], dtype=np.float32)
+        if decoder.wait() != 0:
+            raise ValueError(f"{file_name}: ffmpeg could not decode this file")
+    finally:
+        decoder.stdout.close()
+        decoder.kill()
+        decoder.wait()
+
+
+def read_sound_file(file_name: str, chunk_size: int, sample_freq: int, start: float = 0.0, duration: float = None):
+    """
+    :return: generator of mono float32 chunks at sample_freq
+    """
+    if not os.path.isfile(file_name):
+        raise ValueError(f"{file_name} is not a file")
+    if file_name.lower().endswith(".wav"):
+        return read_wav_file(file_name, chunk_size, sample_freq, start, duration)
+    return read_compressed_file(file_name, chunk_size, sample_freq, start, duration)
+
+
+def get_sound_file_duration(file_name: str) -> float:
+    """
+    :param file_name: WAV file or any file ffprobe can read
+    :return: duration in seconds
+    """
+    if not os.path.isfile(file_name):
+        raise ValueError(f"{file_name} is not a file")
+    if file_name.lower().endswith(".wav"):
+        with wave.open(file_name, "rb") as wav:
+            return wav.getnframes() / wav.getframerate()
+    try:
+        result = subprocess.run(["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0",
+                                 file_name], capture_output=True, text=True)
+    except FileNotFoundError:
+        raise ValueError(f"{file_name}: ffprobe is needed to read this file, only WAV files can be read without it")
+    try:
+        return float(result.stdout.strip())
+    except ValueError:
+        raise ValueError(f"{file_name}: ffprobe could not read this file")
+
+
+class SoundFileTranscriber(MicListener):
+    CHUNK_SIZE = 48000  # samples read at once
+
+    def __init__(self, pitch_detector: str = DEFAULT_PITCH_DETECTOR):
+        """
+        :param pitch_detector: name of the pitch detection engine, see audio.pitch_detectors.PITCH_DETECTORS
+        """
+        super().__init__()
+        self.debug = False
+        self.mic_analyzer = MicAnalyzer(pitch_detector)
+        self.mic_analyzer.add_listener(self)
+        self.song = []
+        self.previous_note = None
+        self.nb_samples = 0  # position in the file of the samples analyzed so far
+
+    def transcribe(self, file_name: str, start: float = 0.0, duration: float = None) -> [(str, timedelta)]:
+        """
+        :param file_name: WAV file or any file ffmpeg can decode
+        :param start: position in seconds where the transcription starts
+        :param duration: seconds to transcribe, None up to the end of the file
+        :return: the heard notes with their position in the file, eg [("A4", timedelta(seconds=1.25)), ("-", ...)]
+        """
+        self.song = []
+        self.previous_note = None
+        self.nb_samples = round(start * MicAnalyzer.SAMPLE_FREQ)
+        self.mic_analyzer.reset()
+        block_size = self.mic_analyzer.get_pitch_detector().window_step
+        remaining_samples = np.zeros(0, dtype=np.float32)
+        for chunk in read_sound_file(file_name, self.CHUNK_SIZE, MicAnalyzer.SAMPLE_FREQ, start, duration):
+            # the blocks are fed as the mic stream would do, whatever the chunk size
+            if len(remaining_samples):
+                chunk = np.concatenate((remaining_samples, chunk))
+            nb_blocks = len(chunk) // block_size
+            for i in range(nb_blocks):
+                self._analyze_block(chunk[i * block_size:(i + 1) * block_size])
+            remaining_samples = chunk[nb_blocks * block_size:]
+        if len(remaining_samples):
+            self._analyze_block(remaining_samples)
+        return self.song
+
+    def _analyze_block(self, block: np.ndarray):
+        self.nb_samples += len(block)
+        self.mic_analyzer.analyze_block(block)
+
+    def set_current_note(self, new_note: str, heard_freq: float = 0.0, closest_pitch: float = 0.0):
+        if new_note != self.previous_note:
+            chrono = timedelta(seconds=self.nb_samples / MicAnalyzer.SAMPLE_FREQ)
+            self.song.append((new_note, chrono))
+            self.previous_note = new_note
+            if self.debug:
+                print("add_note", (new_note, chrono))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('files', nargs='+', help='sound files to transcribe')
+    parser.add_argument('-d', '--detector', default=DEFAULT_PITCH_DETECTOR, choices=list(PITCH_DETECTORS),
+                        help='pitch detector (default: %(default)s)')
+    args = parser.parse_args()
+    transcriber = SoundFileTranscriber(args.detector)
+    for file_name in args.files:
+        print(file_name)
+        for note in transcriber.transcribe(file_name):
+            print(note[1], ":", note[0])
+
+
+if __name__ == "__main__":
+    main()
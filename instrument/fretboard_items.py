@@ -0,0 +1,54 @@
+class FretboardItems:
+    """
+    Index of the canvas items of the fingerings per note, eg "A#" & "A#3", with their visibility
+    The visibility changes are diffed against the current state: only the items which actually change are returned,
+    so that the canvas is only configured for them.
+    """
+
+    def __init__(self):
+        self.items = {}  # tag -> item ids
+        self.visible = {}  # item id -> visibility
+
+    def add(self, item_id: int, tags: [str], visible: bool = True):
+        """
+        :param item_id: of the canvas
+        :param tags: notes of the item, eg ("A#", "A#3")
+        :param visible: state of the item when it is created
+        :return:
+        """
+        for tag in tags:
+            self.items.setdefault(tag, []).append(item_id)
+        self.visible[item_id] = visible
+
+    def get_items(self, note_name: str) -> [int]:
+        """
+        :param note_name: with or without octave
+        :return: item ids of the note
+        """
+        return self.items.get(note_name, [])
+
+    def set_visible(self, note_names: [str], visible: bool) -> [int]:
+        """
+        :param note_names: with or without octave
+        :param visible:
+        :return: item ids whose visibility changed
+        """
+        changed_items = []
+        for note_name in note_names:
+            for item_id in self.items.get(note_name, []):
+                if self.visible[item_id] != visible:
+                    self.visible[item_id] = visible
+                    changed_items.append(item_id)
+        return changed_items
+
+    def set_all_visible(self, visible: bool) -> [int]:
+        """
+        :return: item ids whose visibility changed
+        """
+        changed_items = [item_id for (item_id, is_visible) in self.visible.items() if is_visible != visible]
+        for item_id in changed_items:
+            self.visible[item_id] = visible
+        return changed_items
+
+    def is_visible(self, item_id: int) -> bool:
+        return self.visible[item_id]
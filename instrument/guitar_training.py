@@ -1,7 +1,7 @@
 import tkinter
 from datetime import datetime
 from functools import partial
-from tkinter import Canvas, CENTER, Frame
+from tkinter import Canvas, CENTER, Frame, messagebox
 from tkinter.ttk import Progressbar
 
 from pyharmonytools.guitar.guitar_neck.neck import Neck
@@ -10,9 +10,12 @@ from pyharmonytools.harmony.note import Note
 from audio.mic_analyzer import MicListener, MicAnalyzer
 # handling click on note : https://www.hashbangcode.com/article/using-events-tkinter-canvas-elements-python
 from audio.note_player import NotePlayer
+from instrument.fretboard_items import FretboardItems
+from instrument.neck_position_index import NeckPositionIndex
 from learning.instrument_listener import InstrumentListener
 from learning.learning_center_interfaces import LearningCenterInterface
 from learning.pilotable_instrument import PilotableInstrument
+from ui_event_bridge import TkMicListener
 
 
 class GuitarTraining(MicListener, PilotableInstrument):
@@ -37,12 +40,15 @@ class GuitarTraining(MicListener, PilotableInstrument):
         self.learn_button = None
         # guitar
         self.note_player = NotePlayer()
-        self.guitar_neck = Neck()
-        self.MAX_FRET = self.guitar_neck.FRET_QUANTITY_CLASSIC
-        self.MAX_STRING = len(self.guitar_neck.TUNING)
+        self.note_player.prewarm(self.get_lowest_note(), self.get_highest_note())
+        self.MAX_FRET = Neck.FRET_QUANTITY_CLASSIC
+        self.neck_index = NeckPositionIndex.get_instance(NeckPositionIndex.STANDARD_TUNING, self.MAX_FRET)
+        self.MAX_STRING = len(self.neck_index.tuning)
         # mic
-        self.mic_analyzer = MicAnalyzer()
-        self.mic_analyzer.add_listener(self)
+        self.mic_analyzer = MicAnalyzer(self.PITCH_DETECTOR)
+        # the notes are handled by the Tk thread
+        self.mic_listener = TkMicListener(self)
+        self.mic_analyzer.add_listener(self.mic_listener)
         self.mic_analyzer.debug = False
         self.download_thread = None
         # UI widgets
@@ -55,6 +61,9 @@ class GuitarTraining(MicListener, PilotableInstrument):
         self.margin_E = 10
         self.margin_W = 20
         self.fingerings_tk_id = []
+        self.fingering_positions = []  # (string, fret) of each fingering
+        self.string_label_ids = []
+        self.fretboard_items = FretboardItems()  # built by _initialize_fingers()
         self.fretboard_width = 500
         self.fretboard_height = 200
         self.string_interval_size = 0
@@ -83,12 +92,12 @@ class GuitarTraining(MicListener, PilotableInstrument):
         return self.frame
 
     def __test_note_display(self):
-        self._draw_finger_on_neck("D", the_string='E', the_fret=5)
-        self._draw_finger_on_neck("D", the_string='A', the_fret=6)
-        self._draw_finger_on_neck("D", the_string='D', the_fret=7)
-        self._draw_finger_on_neck("D", the_string='G', the_fret=8)
-        self._draw_finger_on_neck("D", the_string='B', the_fret=9)
-        self._draw_finger_on_neck("D", the_string='e', the_fret=10)
+        self._draw_finger_on_neck("D", the_string=0, the_fret=5)
+        self._draw_finger_on_neck("D", the_string=1, the_fret=6)
+        self._draw_finger_on_neck("D", the_string=2, the_fret=7)
+        self._draw_finger_on_neck("D", the_string=3, the_fret=8)
+        self._draw_finger_on_neck("D", the_string=4, the_fret=9)
+        self._draw_finger_on_neck("D", the_string=5, the_fret=10)
         self._draw_note("A")
         self._draw_note("B")
         self._draw_note("C")
@@ -123,19 +132,25 @@ class GuitarTraining(MicListener, PilotableInstrument):
     def do_start_hearing(self, lc: LearningCenterInterface):
         self.learning_center = lc
         self.mic_analyzer.debug = True
-        for n in Note.CHROMATIC_SCALE_SHARP_BASED:
-            self.change_note_visible_status(n, False)
+        self._render(self.fretboard_items.set_all_visible(False), False)
         self.start_time = datetime.now()
         self.progress_bar.start()
         self.mic_analyzer.do_start_hearing()
 
     def do_stop_hearing(self):
-        for n in Note.CHROMATIC_SCALE_SHARP_BASED:
-            self.change_note_visible_status(n, True)
+        self._render(self.fretboard_items.set_all_visible(True), True)
         self.mic_analyzer.do_stop_hearing()
         self.progress_bar.stop()
         self.display_song()
 
+    def is_hearing(self) -> bool:
+        return self.mic_analyzer.is_listening
+
+    def release(self):
+        self.mic_analyzer.do_stop_hearing()
+        self.mic_analyzer.remove_listener(self.mic_listener)
+        self.mic_listener.close()
+
     def set_current_note(self, new_note: str, heard_freq: float = 0.0, closest_pitch: float = 0.0):
         """
 
@@ -162,10 +177,17 @@ class GuitarTraining(MicListener, PilotableInstrument):
         :return:
         """
         # print("reveal" if visible else "hide", note_name)
-        notes_id = self.fretboard.find_withtag(note_name)
-        # print(notes_id)
-        for n_id in notes_id:
-            self.fretboard.itemconfigure(n_id, state='normal' if visible else 'hidden')
+        self._render(self.fretboard_items.set_visible([note_name], visible), visible)
+
+    def _render(self, item_ids: [int], visible: bool):
+        """
+        configures only the items whose visibility changed
+        :param item_ids: see FretboardItems
+        :param visible:
+        :return:
+        """
+        for item_id in item_ids:
+            self.fretboard.itemconfigure(item_id, state='normal' if visible else 'hidden')
 
     def unset_current_note(self, all_same_notes: bool = False):
         # print("unset", self.current_note)
@@ -193,16 +215,16 @@ class GuitarTraining(MicListener, PilotableInstrument):
         # print("draw note", note)
         raw_note = note[0:len(note) - 1]
         octave = int(note[-1:])
-        pos = self.guitar_neck.find_positions_from_note(raw_note, octave)
+        pos = self.neck_index.find_positions_from_note(raw_note, octave)
         # print("all notes", pos)
         for p in pos:
             self._draw_finger_on_neck(raw_note, p[0], p[1])
 
-    def _draw_finger_on_neck(self, note: str, the_string: str, the_fret: int):
+    def _draw_finger_on_neck(self, note: str, the_string: int, the_fret: int):
         """
 
         :param note:
-        :param the_string: E A D G B e
+        :param the_string: 0 for the lowest string, see NeckPositionIndex
         :param the_fret:
         :return:
         """
@@ -249,43 +271,75 @@ class GuitarTraining(MicListener, PilotableInstrument):
                                    self.margin_N + (self.MAX_STRING - 1) * self.string_interval_size,
                                    fill="lightgray", width=10)
         # string names
-        string_id = 5
         font = ('Helvetica', 12)
-        for s in self.guitar_neck.TUNING:
-            self.fretboard.create_text(10, self.margin_N + self.string_interval_size * string_id, text=s,
-                                       font=font, anchor=CENTER, fill="#000000")
-            string_id -= 1
+        self.string_label_ids = []
+        for string in range(0, self.MAX_STRING):
+            y = self.margin_N + self.string_interval_size * (self.MAX_STRING - string - 1)
+            self.string_label_ids.append(self.fretboard.create_text(10, y, font=font, anchor=CENTER, fill="#000000"))
 
     def _initialize_fingers(self):
-        font = ('Helvetica', 10)
         width = 20
+        self.fingerings_tk_id = []
+        self.fingering_positions = []
         for the_fret in range(0, self.MAX_FRET):
-            for note in self.guitar_neck.TUNING:
+            for string in range(0, self.MAX_STRING):
                 nw_x = self.margin_W + the_fret * self.fretboard_width / self.MAX_FRET + 3
-                nw_y = self.string_interval_size * (self.MAX_STRING - self.guitar_neck.TUNING.index(note) - 1)
+                nw_y = self.string_interval_size * (self.MAX_STRING - string - 1)
                 se_x = nw_x + width
                 se_y = nw_y + width
-                raw_note_name = self.guitar_neck.find_note_from_position(note, the_fret)
-                octave = self.guitar_neck.octave[note][the_fret]
-                note_color = self.note_colors[raw_note_name]
-                if 'b' in raw_note_name:
-                    raw_note_name = Note.CHROMATIC_SCALE_SHARP_BASED[
-                        Note.CHROMATIC_SCALE_FLAT_BASED.index(raw_note_name)]
-                tags = (raw_note_name, octave, raw_note_name + str(self.guitar_neck.octave[note][the_fret]))
-                oval_id = self.fretboard.create_oval(nw_x, nw_y, se_x, se_y, fill=note_color,
-                                                     outline=note_color, width=1, tags=tags)
-                text_id = self.fretboard.create_text(nw_x + width / 2, nw_y + width / 2, text=raw_note_name, font=font,
-                                                     anchor=CENTER, fill="#222222", tags=tags)
-                self.fretboard.tag_bind(oval_id, sequence='<Button-1>',
-                                        func=partial(self._note_clicked, raw_note_name, octave))
-                self.fretboard.tag_bind(text_id, sequence='<Button-1>',
-                                        func=partial(self._note_clicked, raw_note_name, octave))
+                oval_id = self.fretboard.create_oval(nw_x, nw_y, se_x, se_y, width=1)
+                text_id = self.fretboard.create_text(nw_x + width / 2, nw_y + width / 2, font=('Helvetica', 10),
+                                                     anchor=CENTER, fill="#222222")
                 self.fingerings_tk_id.append((oval_id, text_id))
-                self.change_note_visible_status(raw_note_name, True)
+                self.fingering_positions.append((string, the_fret))
+        self._label_fingers()
+
+    def _label_fingers(self):
+        """
+        (re)configures the fingerings & the string names according to the neck index
+        - the canvas items are kept when the tuning changes
+        :return:
+        """
+        self.fretboard_items = FretboardItems()
+        for (string_label_id, string_name) in zip(self.string_label_ids, self.neck_index.string_names):
+            self.fretboard.itemconfigure(string_label_id, text=string_name)
+        for ((oval_id, text_id), (string, the_fret)) in zip(self.fingerings_tk_id, self.fingering_positions):
+            note = self.neck_index.find_note_from_position(string, the_fret)
+            raw_note_name = note[:-1]
+            octave = int(note[-1])
+            note_color = self.note_colors[raw_note_name]
+            tags = (raw_note_name, octave, note)
+            self.fretboard.itemconfigure(oval_id, fill=note_color, outline=note_color, tags=tags, state='normal')
+            self.fretboard.itemconfigure(text_id, text=raw_note_name, tags=tags, state='normal')
+            self.fretboard.tag_bind(oval_id, sequence='<Button-1>',
+                                    func=partial(self._note_clicked, raw_note_name, octave))
+            self.fretboard.tag_bind(text_id, sequence='<Button-1>',
+                                    func=partial(self._note_clicked, raw_note_name, octave))
+            # the items are visible
+            self.fretboard_items.add(oval_id, (raw_note_name, note))
+            self.fretboard_items.add(text_id, (raw_note_name, note))
+
+    def set_tuning(self, tuning: [str]):
+        """
+        alternate tunings of the same number of strings - the fretboard is relabelled, not drawn again
+        :param tuning: notes of the open strings from the lowest one, eg NeckPositionIndex.TUNINGS["Drop D"]
+        :return:
+        """
+        if len(tuning) != self.MAX_STRING:
+            raise ValueError(f"{tuning} does not fit a {self.MAX_STRING} strings neck")
+        self.neck_index = NeckPositionIndex.get_instance(tuning, self.MAX_FRET)
+        super().set_lowest_note(self.neck_index.get_lowest_note())
+        super().set_highest_note(self.neck_index.get_highest_note())
+        self.note_player.prewarm(self.get_lowest_note(), self.get_highest_note())
+        if self.fretboard:
+            self._label_fingers()
+        try:
+            self.instrument_listener.instrument_updated(self.get_lowest_note(), self.get_highest_note())
+        except ValueError:
+            messagebox.showwarning("Tuning", "The new tuning is not compatible with the exercise")
 
     def clear_notes(self, with_calibration: bool = False):
-        for n in Note.CHROMATIC_SCALE_SHARP_BASED:
-            self.change_note_visible_status(n, False)
+        self._render(self.fretboard_items.set_all_visible(False), False)
 
     def show_note(self, note: str):
         if self.debug:
@@ -0,0 +1,80 @@
+import threading
+
+from pyharmonytools.guitar.guitar_neck.neck import Neck
+from pyharmonytools.harmony.note import Note
+
+
+class NeckPositionIndex:
+    """
+    Notes of all the positions of a neck & positions of all the notes, computed once per tuning & number of frets
+    The strings are numbered from 0 (the lowest one), the frets from 0 (open string) to nb_frets;
+    the notes are sharp based, eg "A#3".
+    """
+    STANDARD_TUNING = ["E2", "A2", "D3", "G3", "B3", "E4"]
+    TUNINGS = {"Standard": STANDARD_TUNING,
+               "Drop D": ["D2", "A2", "D3", "G3", "B3", "E4"],
+               "Half step down": ["D#2", "G#2", "C#3", "F#3", "A#3", "D#4"],
+               "Open G": ["D2", "G2", "D3", "G3", "B3", "D4"],
+               "DADGAD": ["D2", "A2", "D3", "G3", "A3", "D4"]}
+    indexes = {}  # (tuning, nb_frets) -> NeckPositionIndex
+    indexes_lock = threading.Lock()
+
+    def __init__(self, tuning: [str] = STANDARD_TUNING, nb_frets: int = Neck.FRET_QUANTITY_CLASSIC):
+        """
+        :param tuning: notes of the open strings from the lowest one, eg ["E2", "A2", "D3", "G3", "B3", "E4"]
+        :param nb_frets:
+        """
+        if not tuning or nb_frets < 0:
+            raise ValueError(f"a neck needs strings and frets - got {tuning} & {nb_frets} frets")
+        self.tuning = tuple(tuning)
+        self.nb_frets = nb_frets
+        self.string_names = []  # eg E A D G B e: the name of an open string played by a lower string is lower case
+        self.notes = []  # string -> fret -> note
+        self.positions = {}  # note with or without octave -> [(string, fret)]
+        for (string, open_note) in enumerate(self.tuning):
+            note = Note(open_note)
+            raw_note_name = note.get_sharp_based_note()
+            self.string_names.append(raw_note_name.lower() if raw_note_name in self.string_names else raw_note_name)
+            note_id = note.octave * 12 + Note.CHROMATIC_SCALE_SHARP_BASED.index(raw_note_name)
+            string_notes = []
+            for fret in range(0, nb_frets + 1):
+                raw_note_name = Note.CHROMATIC_SCALE_SHARP_BASED[(note_id + fret) % 12]
+                fret_note = f"{raw_note_name}{(note_id + fret) // 12}"
+                string_notes.append(fret_note)
+                self.positions.setdefault(fret_note, []).append((string, fret))
+                self.positions.setdefault(raw_note_name, []).append((string, fret))
+            self.notes.append(string_notes)
+
+    @staticmethod
+    def get_instance(tuning: [str] = STANDARD_TUNING, nb_frets: int = Neck.FRET_QUANTITY_CLASSIC):
+        """
+        :return: the index shared by all the instruments with this tuning & number of frets
+        """
+        key = (tuple(tuning), nb_frets)
+        with NeckPositionIndex.indexes_lock:
+            if key not in NeckPositionIndex.indexes:
+                NeckPositionIndex.indexes[key] = NeckPositionIndex(tuning, nb_frets)
+            return NeckPositionIndex.indexes[key]
+
+    def find_note_from_position(self, string: int, fret: int) -> str:
+        """
+        :param string: 0 for the lowest one
+        :param fret: 0 for the open string
+        :return: eg "A#3"
+        """
+        return self.notes[string][fret]
+
+    def find_positions_from_note(self, note: str, octave: int = -1) -> [(int, int)]:
+        """
+        :param note: eg "A#" or "Bb"
+        :param octave: -1 for all the octaves
+        :return: (string, fret) of the note, from the lowest string
+        """
+        raw_note_name = Note(note).get_sharp_based_note()
+        return self.positions.get(raw_note_name if octave == -1 else f"{raw_note_name}{octave}", [])
+
+    def get_lowest_note(self) -> Note:
+        return min([Note(string_notes[0]) for string_notes in self.notes])
+
+    def get_highest_note(self) -> Note:
+        return max([Note(string_notes[-1]) for string_notes in self.notes])
@@ -0,0 +1,83 @@
+from pyharmonytools.harmony.note import Note
+
+
+class NoteButtons:
+    """
+    Color & text of the note buttons of an instrument, eg the ones of VoiceTraining, with the ordinal of their note
+    The changes are diffed against the current state: only the buttons whose color or text actually change are
+    returned, so that the widgets are only configured for them.
+    """
+
+    def __init__(self, color: str, disabled_color: str):
+        """
+        :param color: of a button whose note is in the range of the instrument
+        :param disabled_color: of a button whose note is out of the range
+        """
+        self.color = color
+        self.disabled_color = disabled_color
+        self.ordinals = {}  # note with octave, eg "A#3" -> ordinal
+        self.colors = {}  # note with octave -> current color
+        self.texts = {}  # note with octave -> current text
+
+    @staticmethod
+    def get_ordinal(note: Note) -> int:
+        """
+        :return: number of half tones from C0
+        """
+        return note.octave * 12 + Note.CHROMATIC_SCALE_SHARP_BASED.index(note.get_sharp_based_note())
+
+    def add(self, note_name: str, octave: int) -> str:
+        """
+        :param note_name: sharp based, eg "A#"
+        :param octave:
+        :return: the note of the button, eg "A#3"
+        """
+        note = f"{note_name}{octave}"
+        self.ordinals[note] = octave * 12 + Note.CHROMATIC_SCALE_SHARP_BASED.index(note_name)
+        self.colors[note] = self.color
+        self.texts[note] = note
+        return note
+
+    def set_aspect(self, note: str, color: str, text: str = None) -> bool:
+        """
+        :param note: eg "A#3"
+        :param color:
+        :param text: None for the note itself
+        :return: True if the button changed
+        """
+        text = text or note
+        if self.colors[note] == color and self.texts[note] == text:
+            return False
+        self.colors[note] = color
+        self.texts[note] = text
+        return True
+
+    def set_range(self, lowest_note: Note, highest_note: Note) -> [str]:
+        """
+        the buttons in the range get the color, the other ones the disabled color - their text is kept
+        :param lowest_note:
+        :param highest_note:
+        :return: notes of the buttons which changed
+        """
+        lowest_ordinal = self.get_ordinal(lowest_note)
+        highest_ordinal = self.get_ordinal(highest_note)
+        changed_notes = []
+        for (note, ordinal) in self.ordinals.items():
+            color = self.color if lowest_ordinal <= ordinal <= highest_ordinal else self.disabled_color
+            if self.colors[note] != color:
+                self.colors[note] = color
+                changed_notes.append(note)
+        return changed_notes
+
+    def reset(self) -> [str]:
+        """
+        all the buttons get the color & the text of their note
+        :return: notes of the buttons which changed
+        """
+        return [note for note in self.ordinals if self.set_aspect(note, self.color)]
+
+    def get_color(self, note: str) -> str:
+        return self.colors[note]
+
+    def get_text(self, note: str) -> str:
+        return self.texts[note]
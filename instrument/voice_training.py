@@ -8,9 +8,11 @@ from pyharmonytools.harmony.note import Note
 
 from audio.mic_analyzer import MicAnalyzer, MicListener
 from audio.note_player import NotePlayer
+from instrument.note_buttons import NoteButtons
 from learning.instrument_listener import InstrumentListener
 from learning.learning_center_interfaces import LearningCenterInterface
 from learning.pilotable_instrument import PilotableInstrument
+from ui_event_bridge import TkMicListener
 
 
 class VoiceTraining(MicListener, PilotableInstrument):
@@ -46,12 +48,15 @@ class VoiceTraining(MicListener, PilotableInstrument):
         self.debug = False
         self.learning_center = None
         #
-        self.mic_analyzer = MicAnalyzer()
-        self.mic_analyzer.add_listener(self)
+        self.mic_analyzer = MicAnalyzer(self.PITCH_DETECTOR)
+        # the notes are handled by the Tk thread
+        self.mic_listener = TkMicListener(self)
+        self.mic_analyzer.add_listener(self.mic_listener)
         # UI data
         self.progress_bar = None
         self.ui_root_tk = None
         self.notes_buttons = {}
+        self.note_buttons = NoteButtons(VoiceTraining.NOTE_MUTE, VoiceTraining.NOTE_DISABLED)
         self.learning_thread = None
         # song data
         self.song = []
@@ -143,6 +148,7 @@ class VoiceTraining(MicListener, PilotableInstrument):
                                                                width=10,
                                                                command=partial(self.do_play_note, note, octave))
                 self.notes_buttons[str(octave)][note].grid(row=1 + half_tone, column=octave, padx=5)
+                self.note_buttons.add(note, octave)
         return self.frame
 
     def _do_change_vocal_range(self):
@@ -173,6 +179,8 @@ class VoiceTraining(MicListener, PilotableInstrument):
             self.highest_note = Note("B9")
         self.set_lowest_note(self.lowest_note)
         self.set_highest_note(self.highest_note)
+        if selected_range in ["Bass", "Baritone", "Tenor", "Contralto", "Mezzo-soprano", "Soprano", "Castrato"]:
+            self.note_player.prewarm(self.get_lowest_note(), self.get_highest_note())
 
     def _do_calibrate_with_voice(self):
         self.debug = True
@@ -202,6 +210,14 @@ class VoiceTraining(MicListener, PilotableInstrument):
         self.progress_bar.stop()
         self.display_song()
 
+    def is_hearing(self) -> bool:
+        return self.mic_analyzer.is_listening
+
+    def release(self):
+        self.mic_analyzer.do_stop_hearing()
+        self.mic_analyzer.remove_listener(self.mic_listener)
+        self.mic_listener.close()
+
     def show_note(self, note: str, color: str = NOTE_SHOW):
         if self.debug:
             print("show_note", note, color)
@@ -289,14 +305,18 @@ class VoiceTraining(MicListener, PilotableInstrument):
         self._disable_lower_and_higher_notes()
 
     def _disable_lower_and_higher_notes(self):
-        # disable higher & lower notes
-        for octave in range(0, len(self.mic_analyzer.OCTAVE_BANDS)):
-            for note in Note.CHROMATIC_SCALE_SHARP_BASED:
-                n = Note(f"{note}{octave}")
-                if self.get_lowest_note() <= n <= self.get_highest_note():
-                    self.notes_buttons[str(octave)][note].config(bg=VoiceTraining.NOTE_MUTE)
-                else:
-                    self.notes_buttons[str(octave)][note].config(bg=VoiceTraining.NOTE_DISABLED)
+        # disable higher & lower notes - only the buttons crossed by the range change are configured
+        self._render(self.note_buttons.set_range(self.get_lowest_note(), self.get_highest_note()))
+
+    def _render(self, notes: [str]):
+        """
+        configures the buttons of the notes after a change of their state
+        :param notes: eg ["A#2", "B3"]
+        :return:
+        """
+        for note in notes:
+            self.notes_buttons[note[-1]][note[:-1]].configure(bg=self.note_buttons.get_color(note),
+                                                              text=self.note_buttons.get_text(note))
 
     def unset_current_note(self):
         if self.debug:
@@ -317,14 +337,12 @@ class VoiceTraining(MicListener, PilotableInstrument):
         if self.debug:
             print("Changed Note:", note, bg, self.current_note)
         if note and len(note) in [2, 3]:  # and bg and len(bg) == 7:
-            octave = note[-1]
-            the_note = note[0:len(note) - 1]
             if accuracy == -1:
-                btn_text = f"{the_note}{octave}"
-                self.notes_buttons[str(octave)][the_note].configure(bg=bg, text=btn_text)
+                btn_text = note
             else:
-                btn_text = f"{the_note}{octave} ({round(accuracy, 2)}%)"
-                self.notes_buttons[str(octave)][the_note].configure(bg=bg, text=btn_text)
+                btn_text = f"{note} ({round(accuracy, 2)}%)"
+            if self.note_buttons.set_aspect(note, bg, btn_text):
+                self._render([note])
 
     def add_note(self, new_note):
         if self.previous_note != new_note:
@@ -339,16 +357,10 @@ class VoiceTraining(MicListener, PilotableInstrument):
             print(note[1], ":", note[0])
 
     def clear_notes(self, with_calibration: bool = False):
-        for octave in range(0, len(self.mic_analyzer.OCTAVE_BANDS)):
-            for note in Note.CHROMATIC_SCALE_SHARP_BASED:
-                if with_calibration:
-                    n = Note(f"{note}{octave}")
-                    if self.get_lowest_note() <= n <= self.get_highest_note():
-                        self.notes_buttons[str(octave)][note].config(bg=VoiceTraining.NOTE_MUTE)
-                    else:
-                        self.notes_buttons[str(octave)][note].config(bg=VoiceTraining.NOTE_DISABLED)
-                else:
-                    self.notes_buttons[str(octave)][note].configure(bg=VoiceTraining.NOTE_MUTE, text=f"{note}{octave}")
+        if with_calibration:
+            self._disable_lower_and_higher_notes()
+        else:
+            self._render(self.note_buttons.reset())
 
 
 if __name__ == "__main__":
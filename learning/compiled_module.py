@@ -0,0 +1,128 @@
+import numpy as np
+from pyharmonytools.harmony.note import Note
+
+
+class CompiledModule:
+    """
+    Notes of a learning module parsed once: MIDI numbers in a numpy array, with their range & durations
+    The note names of the module keep their octave, eg "C3" -> 48: the transpositions are array additions
+    & the range checks compare the precomputed lowest & highest notes.
+    The transpositions feasible for an instrument range are the contiguous offsets between the lowest & highest ones,
+    computed from the lowest & highest notes of the module & kept per range, like the transposed modules.
+    """
+    MIDI_C0 = 12
+    LOWEST_NOTE_ID = MIDI_C0  # C0
+    HIGHEST_NOTE_ID = MIDI_C0 + 9 * 12 - 1  # B8, the last note transposable by Note.transpose()
+    note_ids = {}  # note name, eg "Bb3" -> MIDI number, filled on first use
+
+    def __init__(self, notes: [str], durations: [float] = None, module_content: dict = None):
+        """
+        :param notes: eg ["C3", "E3", "G3"] or ["Bb2"]
+        :param durations: in beats, 1 per note by default
+        :param module_content: the module the notes come from, eg {"name": "C chord", "play_notes": "C3-E3-G3", ...}
+        """
+        if not notes:
+            raise ValueError("a module needs at least one note")
+        if durations is not None and len(durations) != len(notes):
+            raise ValueError(f"{len(durations)} durations for {len(notes)} notes")
+        self.notes = list(notes)
+        self.midi_notes = np.array([self.get_note_id(note) for note in self.notes], dtype=np.int16)
+        self.durations = np.ones(len(self.notes)) if durations is None else np.asarray(durations, dtype=float)
+        self.lowest_note_id = int(self.midi_notes.min())
+        self.highest_note_id = int(self.midi_notes.max())
+        self.module_content = module_content or {}
+        self.sharp_based_notes = None
+        self.feasible_transpositions = {}  # (lowest note id, highest note id) -> offsets
+        self.transposed_modules = {}  # offset -> CompiledModule
+
+    @staticmethod
+    def compile(module_content: dict):
+        """
+        :param module_content: eg {"name": "C chord", "play_notes": "C3-E3-G3", "durations": [1, 1, 2]}
+        :return: the compiled module
+        """
+        # silences removed  # todo introduce notes & rests durations in the exercices
+        notes = list(filter(None, module_content["play_notes"].split("-")))
+        return CompiledModule(notes, module_content.get("durations"), module_content)
+
+    @staticmethod
+    def get_note_id(note: str) -> int:
+        """
+        :param note: with octave, eg "A#3" or "Bb3"
+        :return: the MIDI number of the note
+        """
+        note_id = CompiledModule.note_ids.get(note)
+        if note_id is None:
+            if len(note) < 2 or not note[-1].isdigit():
+                raise ValueError(f"{note} is not a note with octave")
+            note_id = CompiledModule.MIDI_C0 + int(note[-1]) * 12 + Note.get_index(Note(note).name)
+            CompiledModule.note_ids[note] = note_id
+        return note_id
+
+    @staticmethod
+    def get_note_name(note_id: int) -> str:
+        """
+        :return: the sharp based name of the MIDI number, eg "A#3"
+        """
+        return f"{Note.CHROMATIC_SCALE_SHARP_BASED[note_id % 12]}{note_id // 12 - 1}"
+
+    def __len__(self):
+        return len(self.midi_notes)
+
+    def get_sharp_based_notes(self) -> [str]:
+        """
+        :return: the notes of the module, eg "A#3" for "Bb3"
+        """
+        if self.sharp_based_notes is None:
+            self.sharp_based_notes = [self.get_note_name(note_id) for note_id in self.midi_notes.tolist()]
+        return self.sharp_based_notes
+
+    def get_play_notes(self) -> str:
+        """
+        :return: the notes in the format of the module files, eg "C3-E3-G3"
+        """
+        return "-".join(self.notes)
+
+    def transpose(self, half_tones: int):
+        """
+        :param half_tones: < 0 to lower the notes
+        :return: the transposed module, with sharp based notes
+        """
+        if half_tones == 0:
+            return self
+        if half_tones not in self.transposed_modules:
+            if not self.LOWEST_NOTE_ID <= self.lowest_note_id + half_tones \
+                    or not self.highest_note_id + half_tones <= self.HIGHEST_NOTE_ID:
+                raise ValueError(f"Could not transpose {self.get_play_notes()} by {half_tones} half tones: "
+                                 f"note transposition out of octave band")
+            midi_notes = self.midi_notes + half_tones
+            transposed_module = CompiledModule([self.get_note_name(note_id) for note_id in midi_notes.tolist()],
+                                               self.durations, self.module_content)
+            transposed_module.module_content = dict(self.module_content,
+                                                    play_notes=transposed_module.get_play_notes())
+            self.transposed_modules[half_tones] = transposed_module
+        return self.transposed_modules[half_tones]
+
+    def get_transposition_range(self, lowest_note: Note, highest_note: Note) -> (int, int):
+        """
+        :param lowest_note: of the instrument
+        :param highest_note: of the instrument
+        :return: the lowest & highest transpositions keeping the module in the range of the instrument
+                 & in the octave band of Note.transpose(), the lowest one is greater than the highest one
+                 if the module does not fit the range
+        """
+        return (max(self.get_note_id(str(lowest_note)), self.LOWEST_NOTE_ID) - self.lowest_note_id,
+                min(self.get_note_id(str(highest_note)), self.HIGHEST_NOTE_ID) - self.highest_note_id)
+
+    def get_feasible_transpositions(self, lowest_note: Note, highest_note: Note) -> np.ndarray:
+        """
+        :param lowest_note: of the instrument
+        :param highest_note: of the instrument
+        :return: the sorted offsets in half tones keeping all the notes of the module in the range of the instrument
+                 & in the octave band of Note.transpose(), empty if the module does not fit the range
+        """
+        key = (self.get_note_id(str(lowest_note)), self.get_note_id(str(highest_note)))
+        if key not in self.feasible_transpositions:
+            lowest_transposition, highest_transposition = self.get_transposition_range(lowest_note, highest_note)
+            self.feasible_transpositions[key] = np.arange(lowest_transposition, highest_transposition + 1)
+        return self.feasible_transpositions[key]
@@ -0,0 +1,221 @@
+import json
+import math
+
+import numpy as np
+
+from learning.compiled_module import CompiledModule
+
+
+class StepResult:
+    """
+    Outcome of a step of an exercise
+    """
+    HIT = "hit"
+    MISSED = "missed"
+
+    def __init__(self, step: int, note_id: int, status: str, time: float, timing_error: float = None,
+                 cents: float = None):
+        """
+        :param step: index of the note in the exercise
+        :param note_id: MIDI number of the expected note
+        :param status: HIT or MISSED
+        :param time: of the detection validating the step, or of the end of its window if missed
+        :param timing_error: seconds between the expected & the actual onset, None without tempo
+        :param cents: deviation of the heard pitch, None if missed
+        """
+        self.step = step
+        self.note_id = note_id
+        self.status = status
+        self.time = time
+        self.timing_error = timing_error
+        self.cents = cents
+
+    def is_hit(self) -> bool:
+        return self.status == StepResult.HIT
+
+    def to_dict(self) -> dict:
+        return {"step": self.step, "note": CompiledModule.get_note_name(self.note_id), "status": self.status,
+                "time": self.time, "timing error": self.timing_error, "cents": self.cents}
+
+
+class ExerciseMatcher:
+    """
+    Validation of the steps of an exercise from a stream of detection events (time, note id, cents)
+    Each event is checked against the current step only: O(1) per event, the missed steps being skipped once.
+    Without tempo, the steps are expected one after the other whatever the time.
+    With a tempo, step i is expected at the onset of its beat, within onset_tolerance seconds, the clock starting
+    with the first note of the exercise; a step whose window is over is missed.
+    A note is validated when it is heard within cents_tolerance for min_hold of its duration.
+    The matcher only depends on the events: an event log recorded during a session is replayed offline
+    with the same results.
+    """
+    NO_NOTE = -1  # id of the silences & of the names which are not notes, eg "-"
+    CENTS_TOLERANCE = 50  # the closest note of the analyzer is always within 50 cents
+    ONSET_TOLERANCE = 0.25  # seconds
+
+    def __init__(self, training_module: CompiledModule, tempo: float = None,
+                 cents_tolerance: float = CENTS_TOLERANCE, onset_tolerance: float = ONSET_TOLERANCE,
+                 min_hold: float = 0.0):
+        """
+        :param training_module: the exercise
+        :param tempo: beats per minute, None to ignore the timing
+        :param cents_tolerance: highest deviation of the heard pitch from the expected note
+        :param onset_tolerance: highest deviation of the onset from the beat, with a tempo only
+        :param min_hold: part of the duration of the note it must be held, with a tempo only, 0 for any
+        """
+        if tempo is not None and tempo <= 0:
+            raise ValueError(f"tempo must be > 0 - got {tempo}")
+        if cents_tolerance < 0 or onset_tolerance < 0 or not 0 <= min_hold <= 1:
+            raise ValueError(f"invalid tolerances: {cents_tolerance} cents, {onset_tolerance}s, hold {min_hold}")
+        self.training_module = training_module
+        self.note_ids = training_module.midi_notes.tolist()
+        self.tempo = tempo
+        self.cents_tolerance = cents_tolerance
+        self.onset_tolerance = onset_tolerance
+        if tempo:
+            beat = 60 / tempo
+            self.onsets = (np.concatenate(([0], np.cumsum(training_module.durations)[:-1])) * beat).tolist()
+            self.hold_times = (training_module.durations * beat * min_hold).tolist()
+        else:
+            self.onsets = None
+            self.hold_times = [0.0] * len(self.note_ids)
+        self.events = []  # (time, note id, cents) received, for the event log
+        self.results = []
+        self.reset()
+
+    def reset(self):
+        """
+        the exercise starts again
+        :return:
+        """
+        self.current_step = 0
+        self.start_time = None
+        self.hold_start = None
+        self.events = []
+        self.results = []
+        self.nb_hits = 0
+
+    def is_finished(self) -> bool:
+        return self.current_step >= len(self.note_ids)
+
+    def get_score(self) -> float:
+        """
+        :return: percentage of the steps hit so far
+        """
+        return 100 * self.nb_hits / len(self.note_ids)
+
+    @staticmethod
+    def to_event(time: float, note: str, heard_freq: float = 0.0, closest_pitch: float = 0.0) -> (float, int, float):
+        """
+        :param time: of the detection, in seconds
+        :param note: as analyzed by MicAnalyzer, eg "A#3" or "-"
+        :param heard_freq:
+        :param closest_pitch: frequency of the note
+        :return: the detection event
+        """
+        try:
+            note_id = CompiledModule.get_note_id(note)
+        except ValueError:
+            return time, ExerciseMatcher.NO_NOTE, 0.0
+        cents = 1200 * math.log2(heard_freq / closest_pitch) if heard_freq > 0 and closest_pitch > 0 else 0.0
+        return time, note_id, cents
+
+    def add_note(self, time: float, note: str, heard_freq: float = 0.0, closest_pitch: float = 0.0) -> [StepResult]:
+        """
+        :return: the steps validated or missed by the note, see add_event()
+        """
+        return self.add_event(*self.to_event(time, note, heard_freq, closest_pitch))
+
+    def add_event(self, time: float, note_id: int, cents: float = 0.0) -> [StepResult]:
+        """
+        :param time: of the detection, in seconds, not decreasing
+        :param note_id: MIDI number of the heard note, NO_NOTE for a silence
+        :param cents: deviation of the heard pitch from the note
+        :return: the steps validated or missed by the event, in order - none once the exercise is finished
+        """
+        self.events.append((time, note_id, cents))
+        if self.is_finished():
+            return []
+        results = self._skip_missed_steps(time)
+        if self.is_finished():
+            return results
+        step = self.current_step
+        if note_id != self.note_ids[step] or abs(cents) > self.cents_tolerance:
+            self.hold_start = None
+            return results
+        timing_error = None
+        if self.onsets is not None:
+            if self.start_time is None:
+                self.start_time = time - self.onsets[step]
+            timing_error = time - self.start_time - self.onsets[step]
+            if timing_error < -self.onset_tolerance:
+                return results  # too early, eg the note of the previous step held on
+        if self.hold_start is None:
+            self.hold_start = time
+        if time - self.hold_start >= self.hold_times[step]:
+            if self.onsets is not None:
+                timing_error = self.hold_start - self.start_time - self.onsets[step]
+            results.append(self._end_step(StepResult.HIT, time, timing_error, cents))
+        return results
+
+    def finish(self, time: float) -> [StepResult]:
+        """
+        the remaining steps are missed
+        :param time: of the end of the session
+        :return: the missed steps
+        """
+        results = []
+        while not self.is_finished():
+            results.append(self._end_step(StepResult.MISSED, time))
+        return results
+
+    def _skip_missed_steps(self, time: float) -> [StepResult]:
+        results = []
+        if self.onsets is None or self.start_time is None:
+            return results
+        while not self.is_finished() and self.hold_start is None \
+                and time - self.start_time > self.onsets[self.current_step] + self.onset_tolerance:
+            end_of_window = self.start_time + self.onsets[self.current_step] + self.onset_tolerance
+            results.append(self._end_step(StepResult.MISSED, end_of_window))
+        return results
+
+    def _end_step(self, status: str, time: float, timing_error: float = None, cents: float = None) -> StepResult:
+        result = StepResult(self.current_step, self.note_ids[self.current_step], status, time, timing_error, cents)
+        self.results.append(result)
+        if result.is_hit():
+            self.nb_hits += 1
+        self.current_step += 1
+        self.hold_start = None
+        return result
+
+    def save_events(self, file_name: str):
+        """
+        saves the event log of the session, see replay()
+        :return:
+        """
+        with open(file_name, "w", encoding='utf-8') as file:
+            json.dump({"play_notes": self.training_module.get_play_notes(),
+                       "durations": self.training_module.durations.tolist(), "events": self.events}, file)
+
+    @staticmethod
+    def load_events(file_name: str) -> (CompiledModule, [(float, int, float)]):
+        """
+        :return: the exercise & the detection events of a session saved by save_events()
+        """
+        with open(file_name, encoding='utf-8') as file:
+            session = json.load(file)
+        return CompiledModule.compile(session), [tuple(event) for event in session["events"]]
+
+    def replay(self, events: [(float, int, float)], end_time: float = None) -> [StepResult]:
+        """
+        grades a recorded session from the start
+        :param events: (time, note id, cents)
+        :param end_time: of the session, the steps not hit are missed, None to keep them pending
+        :return: the results of all the steps ended
+        """
+        self.reset()
+        for event in events:
+            self.add_event(*event)
+        if end_time is not None:
+            self.finish(end_time)
+        return self.results
@@ -1,8 +1,6 @@
-import json
 import os
 import random
 import tkinter
-from copy import deepcopy
 from tkinter import Button, Label, Frame, messagebox, Scale, Tk, LabelFrame
 from tkinter.constants import *
 from tkinter.ttk import Treeview, Combobox
@@ -13,22 +11,26 @@ from instrument.guitar_training import GuitarTraining
 from instrument.voice_training import VoiceTraining
 from learning.instrument_listener import InstrumentListener
 from learning.learning_center_interfaces import LearningCenterInterface
+from learning.module_catalog import ModuleCatalog
+from learning.module_watcher import ModuleListener, ModuleWatcher
+from screen_manager import Screen
 
 
-class LearningCenter(InstrumentListener):
+class LearningCenter(InstrumentListener, ModuleListener, Screen):
     MODULES_PATH = 'learning modules/'
+    NOT_LOADED = "not loaded"  # iid suffix of the placeholder child of a folder, replaced when it is expanded
 
     def __init__(self):
         super().__init__()
         self.instrument_labelframe = None
         self.frame = None
-        self.training_module_id = 0
+        self.module_catalog = ModuleCatalog(LearningCenter.MODULES_PATH)
+        self.module_watcher = None
         self.instrument_selector_labelframe = None
         self.training_module_labelframe = None
         self.transposing_labelframe = None
         self.learn_with_random_transpose = None
         self.transposed_training_module = None
-        self.previous_transposition_value = 0
         self.transpose_scale = None
         self.reload_button = None
         self.selected_instrument_training = None
@@ -68,8 +70,12 @@ class LearningCenter(InstrumentListener):
         self.list_of_modules.heading('Path', text="Path", anchor=CENTER)
         # http://tkinter.fdex.eu/doc/event.html#events
         self.list_of_modules.bind("<ButtonRelease-1>", self._do_module_select)
+        self.list_of_modules.bind("<<TreeviewOpen>>", self._do_folder_open)
         self.list_of_modules.grid(row=2, column=0)
         self.fill_list_of_modules()
+        # the modules saved by the note recorder or copied meanwhile are shown without reload
+        self.module_watcher = ModuleWatcher(self.module_catalog, self)
+        self.module_watcher.start()
 
         self.instrument_selector_labelframe = LabelFrame(self.frame, text='Select your instrument')
         self.instrument_selector_labelframe.grid(row=1, column=0)
@@ -102,14 +108,30 @@ class LearningCenter(InstrumentListener):
         self.learning_center_interface.set_instrument(self.selected_instrument_training)
         return self.frame
 
+    def suspend(self):
+        if self.selected_instrument_training and self.selected_instrument_training.is_hearing():
+            self.selected_instrument_training.do_stop_hearing()
+
+    def release(self):
+        if self.module_watcher:
+            self.module_watcher.stop()
+            self.module_watcher = None
+        if self.learning_center_interface:
+            self.learning_center_interface.release()
+        self._release_instrument()
+
+    def _release_instrument(self):
+        if self.selected_instrument_training:
+            self.selected_instrument_training.release()
+            self.selected_instrument_training = None
+
     def _do_exercize_random_transpose(self):
-        note_min = self.selected_instrument_training.get_lowest_note()
-        note_max = self.selected_instrument_training.get_highest_note()
-        first_note = Note(self.selected_training_module["play_notes"].split("-")[0])
-        interval_min = first_note.get_interval_in_half_tones(note_min) + 1
-        interval_max = first_note.get_interval_in_half_tones(note_max) - 1
+        feasible_transpositions = self.selected_training_module.get_feasible_transpositions(
+            self.selected_instrument_training.get_lowest_note(), self.selected_instrument_training.get_highest_note())
+        if len(feasible_transpositions) == 0:
+            return
         random.seed()
-        random_transpose = random.randrange(interval_min, interval_max)
+        random_transpose = random.choice(feasible_transpositions.tolist())
         self.transpose_scale.set(random_transpose)
         self._do_transpose_change(None)
         self.selected_instrument_training.clear_notes(with_calibration=True)
@@ -118,71 +140,45 @@ class LearningCenter(InstrumentListener):
 
     def instrument_updated(self, lowest_note: Note, highest_note: Note):
         """
-        todo : check if [lowest note, highest note] within [note_min,  note_max] instead of first_note
+        the transpose scale only offers the transpositions keeping the module in the range of the instrument
         :return:
         """
-        module_lowest_note = Note("B9")
-        module_highest_note = Note("C0")
-        if self.selected_training_module and "play_notes" in self.selected_training_module.keys():
-            for n in self.selected_training_module["play_notes"].split("-"):
-                the_note = Note(n)
-                if module_lowest_note > the_note:
-                    module_lowest_note = the_note
-                if module_highest_note < the_note:
-                    module_highest_note = the_note
-
-        interval_min = module_lowest_note.get_interval_in_half_tones(lowest_note)
-        interval_max = module_highest_note.get_interval_in_half_tones(highest_note)
-        if interval_min > 0 > interval_max:
+        if not self.selected_training_module:
+            return
+        feasible_transpositions = self.selected_training_module.get_feasible_transpositions(lowest_note,
+                                                                                            highest_note)
+        if len(feasible_transpositions) == 0:
             raise ValueError("Module out of vocal range")
-        elif 0 < interval_min:
-            self.transpose_scale.configure(from_=interval_min, to=interval_max,
-                                           tickinterval=(interval_max - interval_min) / 11)
-        elif 0 > interval_max:
-            self.transpose_scale.configure(from_=interval_min, to=interval_max,
-                                           tickinterval=(interval_max - interval_min) / 11)
-        else:
-            self.transpose_scale.configure(from_=interval_min, to=interval_max,
-                                           tickinterval=(interval_max - interval_min) / 11)
-        self.transpose_scale.set(0)
+        # the feasible transpositions are contiguous
+        interval_min = int(feasible_transpositions[0])
+        interval_max = int(feasible_transpositions[-1])
+        self.transpose_scale.configure(from_=interval_min, to=interval_max,
+                                       tickinterval=max((interval_max - interval_min) / 11, 1))
+        self.transpose_scale.set(0 if interval_min <= 0 <= interval_max else interval_min)
         self.learn_with_random_transpose.config(state="normal")
 
     def _do_transpose_change(self, event):
-        transposed_value = self.transpose_scale.get()
-        print(transposed_value)
-        notes = self.selected_training_module["play_notes"].split("-")
-        self.transposed_training_module = deepcopy(self.selected_training_module)
-        new_notes = []
-        Note.debug = True
-        no_error = True
-        for n in notes:
-            try:
-                new_notes.append(Note(n).transpose(transposed_value))
-            except ValueError as ve:
-                self.transpose_scale.set(self.previous_transposition_value)
-                Tk.update(self.ui_root_tk)
-                no_error = False
-                # messagebox.showinfo("Transpose", str(ve))
-                print("Transposing Error", str(ve))
-                # break
-        if no_error:
-            self.transpose_scale.set(transposed_value)
-            self.previous_transposition_value = transposed_value
-            self.transposed_training_module["play_notes"] = "-".join(new_notes)
+        if not self.selected_training_module:
+            return
+        # the scale only offers feasible transpositions: see instrument_updated()
+        transposed_training_module = self.selected_training_module.transpose(self.transpose_scale.get())
+        if transposed_training_module is not self.transposed_training_module:  # else dragged within a half tone
+            self.transposed_training_module = transposed_training_module
             self.learning_center_interface.set_training_module(self.transposed_training_module)
 
     def do_reload_exercises(self):
         self.fill_list_of_modules()
 
     def _do_module_select(self, event):
-        item = self.list_of_modules.item(self.list_of_modules.selection())['values']
-        if item and item[1]:
+        selection = self.list_of_modules.selection()
+        if not selection or "module" not in self.list_of_modules.item(selection[0])['tags']:
+            return
+        training_module = self.module_catalog.get_compiled_module(selection[0])
+        if training_module:
             self.transpose_scale.set(0)
-            f = open(f"{item[3]}/{item[0]}.json")
-            module_content = json.load(f)
-            f.close()
-            self.selected_training_module = module_content
-            self.learning_center_interface.set_training_module(module_content)
+            self.selected_training_module = training_module
+            self.transposed_training_module = training_module
+            self.learning_center_interface.set_training_module(training_module)
             if self.selected_instrument_training and self.selected_training_module:
                 self.learn_with_random_transpose.config(state="normal")
                 self.instrument_updated(self.selected_instrument_training.get_lowest_note(),
@@ -197,7 +193,8 @@ class LearningCenter(InstrumentListener):
         # "Voice", "Guitar", "Piano", "Flute", "Saxophone"
         # select instrument
         instr = self.instrument_combobox.get()
-        self.selected_instrument_training = None
+        # the previous instrument releases its mic before being replaced
+        self._release_instrument()
         if instr == "Voice":
             self.selected_instrument_training = VoiceTraining(self)
         elif instr == "Guitar":
@@ -208,19 +205,11 @@ class LearningCenter(InstrumentListener):
             self.learning_center_interface.set_instrument(self.selected_instrument_training)
             for widgets in self.instrument_labelframe.winfo_children():
                 widgets.destroy()
-        if instr == "Voice":
-            self.selected_instrument_training = VoiceTraining(self)
+        if self.selected_instrument_training:
             self.instrument_labelframe = self.selected_instrument_training.get_ui_frame(self.frame)
             self.instrument_labelframe.grid(row=0, column=1, rowspan=5)
             # self.selected_instrument_training.set_lowest_note(Note("C3"))
             # self.selected_instrument_training.set_highest_note(Note("B5"))
-        elif instr == "Guitar":
-            self.selected_instrument_training = GuitarTraining(self)
-            self.instrument_labelframe = self.selected_instrument_training.get_ui_frame(self.frame)
-            self.instrument_labelframe.grid(row=0, column=1, rowspan=5)
-        else:
-            messagebox.showinfo("PyHarmony", "This instrument is not yet implemented - try 'Voice' instead")
-        if self.selected_instrument_training:
             self.learning_center_interface.set_instrument(self.selected_instrument_training)
         if self.selected_instrument_training and self.selected_training_module:
             try:
@@ -231,33 +220,87 @@ class LearningCenter(InstrumentListener):
         Tk.update(self.ui_root_tk)
 
     def fill_list_of_modules(self):
-        for item in self.list_of_modules.get_children():
-            self.list_of_modules.delete(item)
-        self.training_module_id = 0
-        self.fill_list_of_modules_folder("", LearningCenter.MODULES_PATH)
+        """
+        rescans the modules - only the changed files are parsed - & shows the root folder,
+        the folders which were expanded are filled again
+        :return:
+        """
+        open_folders = [iid for iid in self._get_folder_items("") if self.list_of_modules.item(iid, "open")]
+        self.list_of_modules.delete(*self.list_of_modules.get_children())
+        self.module_catalog.scan()
+        self.fill_list_of_modules_folder("", None, open_folders)
         self.list_of_modules.tag_configure("folder", background='orange')
 
-    def fill_list_of_modules_folder(self, parent, path: str):
-        modules = os.listdir(path)
-        for module in modules:
-            abspath = path + "/" + module
-            if module.endswith("json"):
-                try:
-                    f = open(abspath)
-                    module_content = json.load(f)
-                    f.close()
-                    oid = self.list_of_modules.insert(parent=parent, index='end', iid=self.training_module_id, text="",
-                                                      values=(module_content["name"], module_content["description"],
-                                                              module_content["play_notes"], path),
-                                                      tags="module")
-                    self.training_module_id += 1
-                except Exception as err:
-                    oid = self.list_of_modules.insert(parent=parent, index='end', iid=self.training_module_id, text="",
-                                                      values=(module, "** error **", str(err)), tags="module")
-                    self.training_module_id += 1
+    def fill_list_of_modules_folder(self, parent, path: str, open_folders: [str] = ()):
+        """
+        :param parent: iid of the folder item, "" for the root
+        :param path: of the folder, None for the root folder
+        :param open_folders: paths of the sub folders to be filled & expanded, the other ones are filled on expand
+        :return:
+        """
+        sub_folders, module_paths = self.module_catalog.list_folder(path)
+        for folder in sub_folders:
+            self.list_of_modules.insert(parent=parent, index='end', iid=folder, text="",
+                                        values=(os.path.basename(folder), "", "", folder), tags="folder")
+            if folder in open_folders:
+                self.list_of_modules.item(folder, open=True)
+                self.fill_list_of_modules_folder(folder, folder, open_folders)
             else:
-                oid = self.list_of_modules.insert(parent=parent, index='end', iid=self.training_module_id, text="",
-                                                  values=(module, "", "", abspath),
-                                                  tags="folder")
-                self.training_module_id += 1
-                self.fill_list_of_modules_folder(oid, abspath)
+                self.list_of_modules.insert(parent=folder, index='end', iid=f"{folder}/{self.NOT_LOADED}", text="")
+        for module_path in module_paths:
+            self.list_of_modules.insert(parent=parent, index='end', iid=module_path, text="",
+                                        values=self._get_module_values(module_path), tags="module")
+
+    def modules_changed(self, added: [str], modified: [str], removed: [str]):
+        """
+        updates the rows of the modules & folders shown - the ones of the folders not loaded yet are skipped
+        """
+        if not self.module_watcher:
+            return  # the screen was released meanwhile
+        for path in removed:
+            if self.list_of_modules.exists(path):
+                self.list_of_modules.delete(path)
+        for path in modified:
+            if self.list_of_modules.exists(path):
+                self.list_of_modules.item(path, values=self._get_module_values(path))
+        for path in added:
+            parent = os.path.dirname(path)
+            if parent == self.module_catalog.modules_path:
+                parent = ""
+            elif not self.list_of_modules.exists(parent) \
+                    or self.list_of_modules.exists(f"{parent}/{self.NOT_LOADED}"):
+                continue
+            if self.list_of_modules.exists(path):
+                continue
+            position = self.module_catalog.get_position(path)
+            if self.module_catalog.is_folder(path):
+                self.list_of_modules.insert(parent=parent, index=position, iid=path, text="",
+                                            values=(os.path.basename(path), "", "", path), tags="folder")
+                self.list_of_modules.insert(parent=path, index='end', iid=f"{path}/{self.NOT_LOADED}", text="")
+            else:
+                self.list_of_modules.insert(parent=parent, index=position, iid=path, text="",
+                                            values=self._get_module_values(path), tags="module")
+
+    def _get_module_values(self, module_path: str) -> tuple:
+        summary = self.module_catalog.get_summary(module_path)
+        if "error" in summary:
+            return os.path.basename(module_path), "** error **", summary["error"], os.path.dirname(module_path)
+        return summary["name"], summary["description"], summary["play_notes"], os.path.dirname(module_path)
+
+    def _do_folder_open(self, event):
+        folder = self.list_of_modules.focus()
+        placeholder = f"{folder}/{self.NOT_LOADED}"
+        if self.list_of_modules.exists(placeholder):
+            self.list_of_modules.delete(placeholder)
+            self.fill_list_of_modules_folder(folder, folder)
+
+    def _get_folder_items(self, parent) -> [str]:
+        """
+        :return: iids of the folder items loaded below parent
+        """
+        folders = []
+        for iid in self.list_of_modules.get_children(parent):
+            if "folder" in self.list_of_modules.item(iid, "tags"):
+                folders.append(iid)
+                folders += self._get_folder_items(iid)
+        return folders
@@ -1,15 +1,18 @@
 import time
-from copy import deepcopy
 from tkinter import Frame, Button, Canvas, Tk, LabelFrame
 from tkinter.constants import *
 
 import PIL.ImageTk
 from PIL import Image
-from pyharmonytools.harmony.note import Note
+
+from audio.mixing_engine import MixingEngine
+from learning.compiled_module import CompiledModule
+from learning.exercise_matcher import ExerciseMatcher
 
 
 class LearningCenterInterface:
-    img = Image.open("resources/checked_icon.png")
+    img = None  # checked icon, loaded by the first interface
+    demonstration_latency = 0.1  # seconds between the scheduling of a demonstration & its first note
 
     def __init__(self):
         self.exercise_labelframe = None
@@ -26,15 +29,23 @@ class LearningCenterInterface:
         self.scenario = None
         self.stop_button = None
         self.demonstrate_button = None
-        self.debug = True
+        self.debug = False  # True to trace the notes checked & the steps shown
         self.ui_root_tk = None
         self.pause_between_notes = 1
         self.notes_sequence = None
         self.current_expected_note_step = 0
+        self.exercise_matcher = None
+        self.tempo = None  # beats per minute of the exercises without tempo, None to sing them at your own pace
         self.selected_instrument_training = None
-        self.exercise_achieved_img = self.img.resize((20, 20), Image.LANCZOS)
+        self.exercise_achieved_img = self.get_checked_icon().resize((20, 20), Image.LANCZOS)
         self.achieved_pyimg = None
 
+    @staticmethod
+    def get_checked_icon() -> Image:
+        if not LearningCenterInterface.img:
+            LearningCenterInterface.img = Image.open("resources/checked_icon.png")
+        return LearningCenterInterface.img
+
     def display(self, parent_frame: Frame):
         self.ui_root_tk = parent_frame
         self.exercise_labelframe = LabelFrame(self.ui_root_tk, text='Your performance')
@@ -56,20 +67,19 @@ class LearningCenterInterface:
         if self.selected_instrument_training and self.scenario:
             self.hear_user_button.config(state=NORMAL)
 
-    def set_training_module(self, module_content: dict):
+    def set_training_module(self, training_module: CompiledModule):
         """
         registers the training module content + displays the module checkpoints
-        :param module_content: ex {"name": "C chord", "description": "", "play_notes": "C3-E3-G3", "check condition": 100}
+        :param training_module: ex CompiledModule.compile({"name": "C chord", "description": "",
+                                                           "play_notes": "C3-E3-G3", "check condition": 100})
         :return:
         """
-        self.scenario = deepcopy(module_content)
+        self.scenario = training_module
         if self.scenario:
             self.demonstrate_button.config(state=NORMAL)
         if self.selected_instrument_training and self.scenario:
             self.hear_user_button.config(state=NORMAL)
-        self.notes_sequence = self.scenario["play_notes"].split("-")
-        # silences removed  # todo introduce notes & rests durations in the exercices
-        self.notes_sequence = list(filter(None, self.notes_sequence))
+        self.notes_sequence = self.scenario.notes
         self.module_path_canvas.delete("all")
         note_width = 20
         margin_W = 20
@@ -105,25 +115,19 @@ class LearningCenterInterface:
         Tk.update(self.ui_root_tk)
 
     def check_note(self, note: str, heard_freq: float = 0.0, closest_pitch: float = 0.0):
+        if not self.exercise_matcher or self.exercise_matcher.is_finished():
+            return
         if self.debug:
-            print("expected:", self.notes_sequence[self.current_expected_note_step], "heard:", note)
-        try:
-            heard_raw_heard_note = note[:-1]
-            heard_octave = int(note[-1])
-            expected_raw_note = self.notes_sequence[self.current_expected_note_step][:-1]
-            expected_octave = int(self.notes_sequence[self.current_expected_note_step][-1])
-            if Note(heard_raw_heard_note) == Note(expected_raw_note) and heard_octave == expected_octave:
-                self.validate_current_step()
-                self.current_expected_note_step += 1
-            if self.debug:
-                print("status:", int(100 * self.current_expected_note_step / len(self.notes_sequence)), "%")
-            if self.current_expected_note_step == len(self.notes_sequence):
-                self.module_path_canvas.itemconfigure(self.achieved_img_id, state='normal')
-                self.do_stop_exercise()
-                Tk.update(self.ui_root_tk)
-        except ValueError:
-            if self.debug:
-                print("Not a note")
+            print("expected:", self.notes_sequence[self.exercise_matcher.current_step], "heard:", note)
+        for result in self.exercise_matcher.add_note(time.monotonic(), note, heard_freq, closest_pitch):
+            self.current_expected_note_step = result.step
+            self.validate_current_step("#26ea6e" if result.is_hit() else "#ea2626")
+            self.current_expected_note_step += 1
+        if self.debug:
+            print("status:", int(self.exercise_matcher.get_score()), "%")
+        if self.exercise_matcher.is_finished():
+            self.module_path_canvas.itemconfigure(self.achieved_img_id, state='normal')
+            self.do_stop_exercise()
 
     def do_demonstrate_exercise(self):
         """
@@ -135,15 +139,25 @@ class LearningCenterInterface:
             # self.selected_instrument_training.debug = True
             self.selected_instrument_training.clear_notes(with_calibration=True)
             self.current_expected_note_step = 0
-            for note in self.notes_sequence:
-                n = Note(note)
-                raw_note_name = n.get_sharp_based_note()
-                octave = n.octave
-                note = f"{raw_note_name}{octave}"
-                self._preview_step(self.current_expected_note_step, "#26ea6e")
-                time.sleep(self.pause_between_notes)
+            # the whole sequence is scheduled at once so that the notes do not drift with the UI updates
+            mixing_engine = self._get_mixing_engine()
+            if mixing_engine:
+                start = mixing_engine.get_time() + self.demonstration_latency
+                mixing_engine.schedule_sequence(self.notes_sequence, start, self.pause_between_notes,
+                                                self.pause_between_notes)
+                time.sleep(self.demonstration_latency)
+            for note in self.scenario.get_sharp_based_notes():
+                self._preview_step(self.current_expected_note_step, "#26ea6e", play=mixing_engine is None)
+                if mixing_engine:
+                    next_start = start + (self.current_expected_note_step + 1) * self.pause_between_notes
+                    time.sleep(max(next_start - mixing_engine.get_time(), 0))
+                else:
+                    time.sleep(self.pause_between_notes)
                 self.selected_instrument_training.mask_note(note)
                 self.current_expected_note_step += 1
+            if mixing_engine:
+                time.sleep(mixing_engine.envelope.release)  # the last note fades out before the sound card is freed
+                mixing_engine.stop()
         self.current_expected_note_step = 0
 
     def do_hear_user(self):
@@ -152,11 +166,28 @@ class LearningCenterInterface:
             self.set_training_module(self.scenario)
             self.selected_instrument_training.clear_notes(with_calibration=True)
             self.current_expected_note_step = 0
+            self.exercise_matcher = ExerciseMatcher(self.scenario, self.get_tempo())
             self.selected_instrument_training.do_start_hearing(self)
 
+    def get_tempo(self) -> float:
+        """
+        :return: beats per minute of the "tempo" of the module if any, else the one of the interface
+        """
+        return self.scenario.module_content.get("tempo", self.tempo)
+
     def do_stop_exercise(self):
         self.selected_instrument_training.do_stop_hearing()
 
+    def release(self):
+        """
+        the demonstration being played is stopped & the sound card is freed
+        :return:
+        """
+        mixing_engine = MixingEngine.instance
+        if mixing_engine and mixing_engine.is_started():
+            mixing_engine.cancel_all()
+            mixing_engine.stop()
+
     def demonstrate_step(self, step: int):
         """
         the note will temporarily blink to acknowledge what has been heard
@@ -165,20 +196,38 @@ class LearningCenterInterface:
         """
         self._preview_step(step, "#26ea6e")
 
-    def _preview_step(self, note_index: int, color: str):
+    def _get_mixing_engine(self):
+        """
+        :return: the started mixing engine, None if no sound card can be used
+        """
+        try:
+            import sounddevice as sd  # raises OSError without PortAudio
+        except (ImportError, OSError) as e:
+            if self.debug:
+                print("Mixing engine unavailable:", e)
+            return None
+        try:
+            mixing_engine = MixingEngine.get_instance()
+            mixing_engine.start()
+            return mixing_engine
+        except (sd.PortAudioError, OSError) as e:  # eg no output device
+            if self.debug:
+                print("Mixing engine unavailable:", e)
+            return None
+
+    def _preview_step(self, note_index: int, color: str, play: bool = True):
         """
         the note will temporarily blink to acknowledge what has been heard
         :param note:
+        :param play: False if the note is already scheduled on the mixing engine
         :return:
         """
         self.preview_running = True
-        note = self.notes_sequence[note_index]
+        note = self.scenario.get_sharp_based_notes()[note_index]
         raw_note_name = note[:-1]
-        if 'b' in raw_note_name:
-            raw_note_name = Note.CHROMATIC_SCALE_SHARP_BASED[Note.CHROMATIC_SCALE_FLAT_BASED.index(raw_note_name)]
         octave = int(note[-1])
-        note = f"{raw_note_name}{octave}"
-        self.selected_instrument_training.do_play_note(raw_note_name, octave)
+        if play:
+            self.selected_instrument_training.do_play_note(raw_note_name, octave)
         self.validate_current_step()
         self.selected_instrument_training.show_note(note)
         the_note = self.canvas_step_notes[note_index]
@@ -189,14 +238,14 @@ class LearningCenterInterface:
         self.module_path_canvas.itemconfigure(the_note[1], state='normal')
         self.preview_running = False
 
-    def validate_current_step(self):
+    def validate_current_step(self, color: str = "#26ea6e"):
         """
         the note will temporarily blink to acknowledge what has been heard
-        :param note:
+        :param color: green if hit, red if missed
         :return:
         """
         the_note = self.canvas_step_notes[self.current_expected_note_step]
-        self.module_path_canvas.itemconfigure(the_note[0], state='normal', fill="#26ea6e")
+        self.module_path_canvas.itemconfigure(the_note[0], state='normal', fill=color)
         self.module_path_canvas.itemconfigure(the_note[1], state='normal')
 
     def make_note_blink(self, note_index: int, new_color: str):
@@ -0,0 +1,276 @@
+import bisect
+import json
+import os
+import threading
+
+from learning.compiled_module import CompiledModule
+
+class ModuleCatalog:
+    """
+    Learning modules of a folder tree, eg "learning modules/", indexed by path with the mtime & size of their file
+    The index is saved in index_file: a scan only parses the files added or changed since the previous one,
+    even after a restart, & the modules read for an exercise are kept in memory.
+    The catalog is thread safe: it can be updated by a ModuleWatcher while the UI reads it. The folder tree is
+    walked & the modules are parsed out of the lock, which is only held to swap the results in.
+    """
+    VERSION = 1  # to be increased when the format of the index changes
+    MODULES_PATH = 'learning modules'
+    INDEX_FILE = os.path.join("cache", "module_catalog.json")
+    SUMMARY_KEYS = ["name", "description", "play_notes"]
+
+    def __init__(self, modules_path: str = MODULES_PATH, index_file: str = INDEX_FILE):
+        """
+        :param modules_path: root folder of the modules
+        :param index_file: None to keep the index in memory only
+        """
+        self.modules_path = os.path.normpath(modules_path)
+        self.index_file = index_file
+        self.entries = {}  # file path -> {"mtime", "size", "name", "description", "play_notes"} or {..., "error"}
+        self.folders = {}  # folder path -> ([sub folder paths], [module file paths]), sorted
+        self.modules = {}  # file path -> content of the module, read on first use
+        self.compiled_modules = {}  # file path -> CompiledModule, compiled on first use
+        self.nb_parsed = 0
+        self.is_loaded = False
+        self.changes = {"added": [], "modified": [], "removed": []}  # paths of the last scan or update
+        self.lock = threading.RLock()
+
+    def scan(self) -> int:
+        """
+        walks the folder tree & parses the new or changed modules only
+        :return: the number of files parsed
+        """
+        return self._scan()[0]
+
+    def _scan(self) -> (int, dict):
+        """
+        :return: the number of files parsed & the paths of the modules & folders added, modified & removed
+        """
+        with self.lock:
+            if not self.is_loaded:
+                self.load()
+            previous_entries = self.entries
+        folders = {}
+        entries = {}
+        parsed_modules = {}  # path -> content of the modules parsed by the scan, None if it can't be read
+        self._scan_folder(self.modules_path, previous_entries, folders, entries, parsed_modules)
+        with self.lock:
+            previous_folders = self.folders
+            previous_entries = self.entries  # may have been updated during the walk
+            self.folders = folders
+            self.entries = entries
+            modified = [path for (path, entry) in entries.items()
+                        if path in previous_entries and entry is not previous_entries[path]]
+            changes = {"added": sorted(path for path in list(folders) + list(entries)
+                                       if path not in previous_folders and path not in previous_entries),
+                       "modified": modified,
+                       "removed": [path for path in list(previous_folders) + list(previous_entries)
+                                   if path not in folders and path not in entries]}
+            self.changes = changes
+            for path in changes["removed"]:
+                self._forget(path)
+            for (path, module_content) in parsed_modules.items():
+                self._forget(path)
+                if module_content is not None:
+                    self.modules[path] = module_content
+            self.nb_parsed += len(parsed_modules)
+            if parsed_modules or len(entries) != len(previous_entries):
+                self.save()
+            return len(parsed_modules), changes
+
+    def update(self, paths: [str]) -> dict:
+        """
+        updates the catalog for the files which may have been added, changed or removed, eg by a file system event
+        The whole tree is scanned again if a folder is among the paths.
+        :param paths: of module files or folders
+        :return: the paths of the modules & folders added, modified & removed
+        """
+        paths = sorted(set(os.path.normpath(path) for path in paths))
+        with self.lock:
+            if not self.is_loaded or any(path in self.folders or os.path.isdir(path)
+                                         or os.path.dirname(path) not in self.folders for path in paths):
+                previous_entries = None
+            else:
+                previous_entries = {path: self.entries.get(path) for path in paths if path.endswith("json")}
+        if previous_entries is None:
+            return self._scan()[1]
+        parsed_modules = {}  # path -> (entry, content) of the modules parsed out of the lock, None if removed
+        for (path, entry) in previous_entries.items():
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                parsed_modules[path] = None
+                continue
+            if not entry or entry["mtime"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+                parsed_modules[path] = self._parse(path, stat)
+        with self.lock:
+            self.changes = {"added": [], "modified": [], "removed": []}
+            for (path, parsed_module) in parsed_modules.items():
+                self._update_file(path, parsed_module)
+            if self.changes["added"] or self.changes["modified"] or self.changes["removed"]:
+                self.save()
+            return self.changes
+
+    def _update_file(self, path: str, parsed_module: (dict, dict)):
+        """
+        :param path: of a module file
+        :param parsed_module: entry & content of the module, None if the file was removed
+        """
+        if os.path.dirname(path) not in self.folders:
+            return  # the folder was removed by a scan meanwhile
+        module_paths = self.folders[os.path.dirname(path)][1]
+        entry = self.entries.get(path)
+        if parsed_module is None:
+            if entry:
+                del self.entries[path]
+                self._forget(path)
+                module_paths.remove(path)
+                self.changes["removed"].append(path)
+            return
+        self._forget(path)
+        self.entries[path], module_content = parsed_module
+        self.nb_parsed += 1
+        if module_content is not None:
+            self.modules[path] = module_content
+        if entry:
+            self.changes["modified"].append(path)
+        else:
+            bisect.insort(module_paths, path)
+            self.changes["added"].append(path)
+
+    def _scan_folder(self, folder: str, previous_entries: dict, folders: dict, entries: dict,
+                     parsed_modules: dict) -> bool:
+        """
+        runs out of the lock: the catalog is not modified
+        :return: False if the folder was removed during the walk
+        """
+        sub_folders = []
+        module_paths = []
+        try:
+            with os.scandir(folder) as folder_entries:
+                dir_entries = sorted(folder_entries, key=lambda e: e.name)
+        except FileNotFoundError:
+            if folder == self.modules_path:
+                raise
+            return False
+        for dir_entry in dir_entries:
+            if dir_entry.is_dir():
+                if self._scan_folder(dir_entry.path, previous_entries, folders, entries, parsed_modules):
+                    sub_folders.append(dir_entry.path)
+            elif dir_entry.name.endswith("json"):
+                try:
+                    stat = dir_entry.stat()
+                except FileNotFoundError:
+                    continue  # removed during the walk
+                module_paths.append(dir_entry.path)
+                entry = previous_entries.get(dir_entry.path)
+                if entry and entry["mtime"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+                    entries[dir_entry.path] = entry
+                else:
+                    entries[dir_entry.path], parsed_modules[dir_entry.path] = self._parse(dir_entry.path, stat)
+        folders[folder] = (sub_folders, module_paths)
+        return True
+
+    def _forget(self, path: str):
+        self.modules.pop(path, None)
+        self.compiled_modules.pop(path, None)
+
+    def _parse(self, path: str, stat: os.stat_result) -> (dict, dict):
+        """
+        :return: the index entry of the module & its content, None if it can't be read
+        """
+        entry = {"mtime": stat.st_mtime_ns, "size": stat.st_size}
+        try:
+            module_content = self._read(path)
+            entry.update({key: module_content[key] for key in self.SUMMARY_KEYS})
+            return entry, module_content
+        except (OSError, ValueError, KeyError, TypeError) as err:
+            entry["error"] = str(err)
+            return entry, None
+
+    def _read(self, path: str) -> dict:
+        with open(path, encoding='utf-8') as file:
+            return json.load(file)
+
+    def list_folder(self, folder: str = None) -> ([str], [str]):
+        """
+        :param folder: None for the root folder
+        :return: the sub folders & the module files of the folder, as of the last scan
+        """
+        with self.lock:
+            sub_folders, module_paths = self.folders.get(folder or self.modules_path, ([], []))
+            return list(sub_folders), list(module_paths)
+
+    def get_position(self, path: str) -> int:
+        """
+        :param path: of a module or folder of the catalog
+        :return: the position of the path among the items of its folder, the sub folders first
+        """
+        with self.lock:
+            sub_folders, module_paths = self.folders[os.path.dirname(path)]
+            if path in self.folders:
+                return bisect.bisect_left(sub_folders, path)
+            return len(sub_folders) + bisect.bisect_left(module_paths, path)
+
+    def is_folder(self, path: str) -> bool:
+        with self.lock:
+            return path in self.folders
+
+    def get_summary(self, path: str) -> dict:
+        """
+        :param path: of the module file
+        :return: name, description & play_notes of the module, or error if it can't be read
+        """
+        with self.lock:
+            return self.entries[path]
+
+    def get_module(self, path: str) -> dict:
+        """
+        :param path: of the module file
+        :return: the content of the module, None if it can't be read
+        """
+        with self.lock:
+            if path not in self.modules:
+                try:
+                    self.modules[path] = self._read(path)
+                except (OSError, ValueError):
+                    return None
+            return self.modules[path]
+
+    def get_compiled_module(self, path: str) -> CompiledModule:
+        """
+        :param path: of the module file
+        :return: the notes of the module compiled once, None if the module can't be read
+        """
+        with self.lock:
+            if path not in self.compiled_modules:
+                module_content = self.get_module(path)
+                try:
+                    self.compiled_modules[path] = CompiledModule.compile(module_content)
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    return None
+            return self.compiled_modules[path]
+
+    def load(self):
+        """
+        reads the index saved by the previous run - a missing or outdated index is ignored
+        :return:
+        """
+        self.is_loaded = True
+        if not self.index_file:
+            return
+        try:
+            with open(self.index_file, encoding='utf-8') as file:
+                index = json.load(file)
+            if index["version"] == self.VERSION and index["modules path"] == self.modules_path:
+                self.entries = index["entries"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    def save(self):
+        if not self.index_file:
+            return
+        os.makedirs(os.path.dirname(self.index_file) or ".", exist_ok=True)
+        tmp_file = f"{self.index_file}.{os.getpid()}.tmp"
+        with open(tmp_file, "w", encoding='utf-8') as file:
+            json.dump({"version": self.VERSION, "modules path": self.modules_path, "entries": self.entries}, file)
+        os.replace(tmp_file, self.index_file)
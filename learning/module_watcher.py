@@ -0,0 +1,149 @@
+import logging
+import os
+import threading
+import time
+
+from learning.module_catalog import ModuleCatalog
+from ui_event_bridge import UIEventBridge
+
+logger = logging.getLogger(__name__)
+
+
+class ModuleListener:
+    def modules_changed(self, added: [str], modified: [str], removed: [str]):
+        """
+        called by the Tk thread once per burst of changes
+        :param added: paths of the modules & folders added to the catalog, parents first
+        :param modified: paths of the modules changed
+        :param removed: paths of the modules & folders removed from the catalog
+        :return:
+        """
+        pass
+
+
+class ModuleWatcher:
+    """
+    Background thread updating a ModuleCatalog when module files are added, changed or removed
+    The file system events are received from watchdog (inotify on Linux), see requirements.txt - if it is not
+    installed, the folder tree is scanned every POLL_PERIOD seconds instead. The events are debounced:
+    the catalog is updated once the files are quiet for DEBOUNCE_DELAY seconds, or at least every MAX_DELAY seconds
+    during a bulk import, & the listener gets one notification per update through the UIEventBridge.
+    """
+    POLL_PERIOD = 2.0
+    DEBOUNCE_DELAY = 0.2
+    MAX_DELAY = 1.0
+
+    def __init__(self, module_catalog: ModuleCatalog, listener: ModuleListener,
+                 ui_event_bridge: UIEventBridge = None, use_watchdog: bool = True):
+        """
+        :param module_catalog: scanned at least once
+        :param listener:
+        :param ui_event_bridge: None for the one of the process
+        :param use_watchdog: False to poll even if watchdog is installed
+        """
+        self.module_catalog = module_catalog
+        self.listener = listener
+        self.ui_event_bridge = ui_event_bridge or UIEventBridge.get_instance()
+        self.use_watchdog = use_watchdog
+        self.observer = None
+        self.watch_thread = None
+        self.is_watching = False
+        self.lock = threading.Lock()
+        self.changed = threading.Condition(self.lock)
+        self.pending_paths = set()
+        self.nb_events = 0
+        self.nb_updates = 0
+
+    def start(self):
+        """
+        :return: True if the changes are notified by watchdog, False if they are polled
+        """
+        self.is_watching = True
+        if self.use_watchdog:
+            self.observer = self._create_observer()
+        self.watch_thread = threading.Thread(target=self._watch, name="_watch_modules", daemon=True)
+        self.watch_thread.start()
+        return self.observer is not None
+
+    def stop(self):
+        with self.lock:
+            self.is_watching = False
+            self.changed.notify()
+        if self.observer:
+            self.observer.stop()
+            self.observer.join()
+            self.observer = None
+        if self.watch_thread and self.watch_thread is not threading.current_thread():
+            self.watch_thread.join()
+
+    def _create_observer(self):
+        """
+        :return: the started watchdog observer of the modules folder, None if watchdog is not installed
+        """
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            return None
+        watcher = self
+
+        class ModuleEventHandler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.is_directory and event.event_type == "modified":
+                    return  # a file of the folder changed: notified by its own event
+                watcher.add_changed_paths([event.src_path, getattr(event, "dest_path", "")])
+
+        observer = Observer()
+        observer.schedule(ModuleEventHandler(), self.module_catalog.modules_path, recursive=True)
+        observer.daemon = True
+        observer.start()
+        return observer
+
+    def add_changed_paths(self, paths: [str]):
+        """
+        thread safe - called for the file system events
+        :param paths: of the files or folders changed, "" ignored
+        :return:
+        """
+        with self.lock:
+            self.pending_paths.update(path for path in paths if path)
+            self.nb_events += 1
+            self.changed.notify()
+
+    def _watch(self):
+        while self.is_watching:
+            paths = self._wait_for_changes()
+            if paths is None:
+                continue
+            try:
+                # a poll updates the root folder, ie scans the whole tree
+                changes = self.module_catalog.update(paths or [self.module_catalog.modules_path])
+            except Exception:  # eg the modules folder removed: the next changes or poll will update the catalog
+                logger.exception(f"the module catalog could not be updated for {paths}")
+                continue
+            if changes["added"] or changes["modified"] or changes["removed"]:
+                self.nb_updates += 1
+                self.ui_event_bridge.post(self.listener.modules_changed,
+                                          (changes["added"], changes["modified"], changes["removed"]))
+
+    def _wait_for_changes(self) -> [str]:
+        """
+        :return: the paths changed once quiet, [] for a poll, None when stopped
+        """
+        with self.lock:
+            if not self.observer:
+                self.changed.wait(self.POLL_PERIOD)
+                return [] if self.is_watching else None
+            while self.is_watching and not self.pending_paths:
+                self.changed.wait()
+            first_change = time.monotonic()
+            while self.is_watching:
+                nb_events = self.nb_events
+                self.changed.wait(self.DEBOUNCE_DELAY)
+                if self.nb_events == nb_events or time.monotonic() - first_change >= self.MAX_DELAY:
+                    break
+            if not self.is_watching:
+                return None
+            paths = [os.path.normpath(path) for path in self.pending_paths]
+            self.pending_paths.clear()
+            return paths
@@ -1,9 +1,12 @@
 from pyharmonytools.harmony.note import Note
 
+from audio.pitch_detectors import DEFAULT_PITCH_DETECTOR
 from learning.learning_center_interfaces import LearningCenterInterface
 
 
 class PilotableInstrument:
+    PITCH_DETECTOR = DEFAULT_PITCH_DETECTOR  # pitch detection engine of the instrument, see audio.pitch_detectors
+
     def __init__(self):
         self.highest_note = Note("B9")
         self.lowest_note = Note("C0")
@@ -90,3 +93,16 @@ class PilotableInstrument:
         :return:
         """
         pass
+
+    def is_hearing(self) -> bool:
+        """
+        :return: True if the mic is heard
+        """
+        return False
+
+    def release(self):
+        """
+        the instrument is dropped: its mic must be released
+        :return:
+        """
+        pass
@@ -1,4 +1,5 @@
 import json
+import os
 import tkinter
 from datetime import datetime
 from tkinter import Frame, LabelFrame, messagebox, Tk, Button
@@ -11,9 +12,10 @@ from pyharmonytools.harmony.note import Note
 from instrument.guitar_training import GuitarTraining
 from instrument.voice_training import VoiceTraining
 from learning.instrument_listener import InstrumentListener
+from screen_manager import Screen
 
 
-class NoteRecorder(InstrumentListener, mtkEditTableListener):
+class NoteRecorder(InstrumentListener, mtkEditTableListener, Screen):
     def __init__(self):
         self.instrument_frame = None
         self.notes_cells = None
@@ -83,6 +85,7 @@ class NoteRecorder(InstrumentListener, mtkEditTableListener):
         # todo take rests & durations into account
         file_content = {"name": score_file_name, "description": "recorded notes", "play_notes": "-".join(score),
                         "next possible": ""}
+        os.makedirs("learning modules/songs", exist_ok=True)
         with open("learning modules/songs/" + score_file_name + ".json", "w", encoding='utf-8') as file:
             json.dump(file_content, file, indent=4, ensure_ascii=False)
         print(f"Saved to {score_file_name}")
@@ -94,6 +97,15 @@ class NoteRecorder(InstrumentListener, mtkEditTableListener):
         self.selected_instrument.do_stop_hearing()
         self.do_save_score()
 
+    def suspend(self):
+        if self.selected_instrument and self.selected_instrument.is_hearing():
+            self.selected_instrument.do_stop_hearing()
+
+    def release(self):
+        if self.selected_instrument:
+            self.selected_instrument.release()
+            self.selected_instrument = None
+
     def _do_select_instrument(self, event):
         """
         todo refactor code to avoid duplication in [learning_center.py](learning_center.py)
@@ -103,25 +115,17 @@ class NoteRecorder(InstrumentListener, mtkEditTableListener):
         # "Voice", "Guitar", "Piano", "Flute", "Saxophone"
         # select instrument
         instr = self.instrument_combobox.get()
-        self.selected_instrument = None
+        # the previous instrument releases its mic before being replaced
+        self.release()
         if instr == "Voice":
             self.selected_instrument = VoiceTraining(self)
         elif instr == "Guitar":
             self.selected_instrument = GuitarTraining(self)
         else:
             messagebox.showinfo("PyHarmony", "This instrument is not yet implemented - try 'Voice' instead")
-        if instr == "Voice":
-            self.selected_instrument = VoiceTraining(self)
+        if self.selected_instrument:
             for widget in self.instrument_frame.winfo_children():
                 widget.destroy()
             self.instrument_frame = self.selected_instrument.get_ui_frame(self.frame)
             self.instrument_frame.grid(row=1, column=0, columnspan=5, sticky='nsew', padx=5, pady=5)
-        elif instr == "Guitar":
-            self.selected_instrument = GuitarTraining(self)
-            for widget in self.instrument_frame.winfo_children():
-                widget.destroy()
-            self.instrument_frame = self.selected_instrument.get_ui_frame(self.frame)
-            self.instrument_frame.grid(row=1, column=0, columnspan=5, sticky='nsew', padx=5, pady=5)
-        else:
-            messagebox.showinfo("PyHarmony", "This instrument is not yet implemented - try 'Voice' instead")
         Tk.update(self.ui_root_tk)
\ No newline at end of file
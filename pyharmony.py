@@ -1,16 +1,15 @@
+import threading
 import tkinter
 from importlib.metadata import version
 from tkinter import Label, Menu, messagebox, Frame
 # https://www.youtube.com/watch?v=XhCfsuMyhXo&list=PLCC34OHNcOtoC6GglhF3ncJ5rLwQrLGnV&index=6
 from tkinter.filedialog import askopenfilename
 
-from audio.capture_sound_fft import CaptureSoundFFT
-from audio.capture_sound_plot import capture_and_display_sound
-from file_capabilities.download_mp3_youtube import DownloadMP3Youtube
-from learning.learning_center import LearningCenter
-from note_recorder.note_recorder import NoteRecorder
-from ultimate_guitar.search_cadence import SearchSongFromCadence
-from ultimate_guitar.search_chords import SearchSongFromChords
+from screen_manager import ScreenManager
+from ui_event_bridge import UIEventBridge
+
+# the screens are imported by the menu commands on their first use so that the main window shows up
+# before matplotlib, scipy, pygame... are loaded - see tests/benchmarks/bench_startup.py
 
 
 #https://stackoverflow.com/questions/61274017/splitting-windows-using-frames-in-tkinter-and-python
@@ -20,14 +19,14 @@ from ultimate_guitar.search_chords import SearchSongFromChords
 class RootWindow(tkinter.Tk):
     def __init__(self):
         super().__init__()
-        self.note_recorder = None
-        self.learning_center = None
-        self.search_chords = None
-        self.search_cadence = None
         self.live_hearing = None
         self.menu_bar = None
+        self.screen_manager = ScreenManager(self)  # the screens are reused when their menu is selected again
+        UIEventBridge.get_instance().start(self)  # the notes heard by the audio threads are displayed by this thread
         self._set_layout()
-        self.record_youtube = None
+        self.transcription_thread = None
+        self.transcription = None
+        self.transcription_error = None
 
     def _set_layout(self):
         self.title('Harmony tools')
@@ -51,9 +50,9 @@ class RootWindow(tkinter.Tk):
 
         menu_file = Menu(self.menu_bar, tearoff=0)
         menu_file.add_command(label="Youtube MP3 grabbing", command=self.do_youtube_mp3_grabbing)
-        menu_file.add_command(label="Sound file loading", command=self.do_something)
+        menu_file.add_command(label="Sound file loading", command=self.do_sound_file_loading)
         menu_file.add_separator()
-        menu_file.add_command(label="Exit", command=self.quit)
+        menu_file.add_command(label="Exit", command=self.do_exit)
         self.menu_bar.add_cascade(label="File", menu=menu_file)
 
         menu_audio = Menu(self.menu_bar, tearoff=0)
@@ -81,66 +80,84 @@ class RootWindow(tkinter.Tk):
         self.config(menu=self.menu_bar)
 
     def do_learning_center(self):
-        self.clear_root()
-        self.learning_center = LearningCenter()
-        frame = self.learning_center.get_ui_frame(self)
-        frame.grid(row=1, column=0, columnspan=5, sticky='nsew', padx=5, pady=5)
+        from audio.note_cache import NoteCache
+        from audio.note_player import NotePlayer
+        from audio.wavetable import ADSREnvelope
+        from learning.learning_center import LearningCenter
+        if not NotePlayer.envelope:
+            # the notes are shaped once by the envelope & mapped from the note cache by the next starts
+            NotePlayer.set_note_cache(NoteCache())
+            NotePlayer.set_envelope(ADSREnvelope())
+        self.screen_manager.show("LearningCenter", LearningCenter)
 
     def do_FFT_hearing(self):
+        from audio.capture_sound_fft import CaptureSoundFFT
         c = CaptureSoundFFT()
         c.capture()
 
     def do_live_hearing(self):
+        from audio.capture_sound_plot import capture_and_display_sound
         capture_and_display_sound()
 
     def do_youtube_mp3_grabbing(self):
-        self.clear_root()
-        self.record_youtube = DownloadMP3Youtube()
-        frame = self.record_youtube.get_ui_frame(self)
-        frame.grid(row=1, column=0, columnspan=5, sticky='nsew', padx=5, pady=5)
+        from file_capabilities.download_mp3_youtube import DownloadMP3Youtube
+        self.screen_manager.show("DownloadMP3Youtube", DownloadMP3Youtube)
 
     def do_about(self):
         messagebox.showinfo("Harmony tools", f"(c) C. Moustier - 2023\nBased on pyHarmonyTooling v.{version('pyHarmonyTooling')} - https://github.com/Moustov/pyharmonytooling")
 
-    def open_file(self):
-        file = askopenfilename(title="Choose the file to open",
+    def open_file(self) -> str:
+        return askopenfilename(title="Choose the file to open",
                                filetypes=[("PNG image", ".png"), ("GIF image", ".gif"), ("All files", ".*")])
-        print(file)
 
-    def do_something(self):
-        messagebox.showinfo("Harmony tools", f"Not yet implemented :-P")
+    def do_sound_file_loading(self):
+        file = askopenfilename(title="Choose the sound file to transcribe", initialdir="download",
+                               filetypes=[("Sound files", ".wav .mp3 .mp4 .m4a .webm .ogg"), ("All files", ".*")])
+        if not file or (self.transcription_thread and self.transcription_thread.is_alive()):
+            return
+        self.transcription = None
+        self.transcription_error = None
+        self.transcription_thread = threading.Thread(target=self._transcribe, args=(file,), name="_transcribe")
+        self.transcription_thread.start()
+        self.after(200, self._check_transcription, file)
+
+    def _transcribe(self, file: str):
+        import wave
+        from file_capabilities.sound_file_transcriber import SoundFileTranscriber
+        try:
+            self.transcription = SoundFileTranscriber().transcribe(file)
+        except (ValueError, EOFError, OSError, wave.Error) as err:  # eg a float WAV file or a truncated file
+            # the errors of SoundFileTranscriber already name the file, not the ones of the wave module
+            self.transcription_error = str(err) if file in str(err) else f"{file}: {err}"
+
+    def _check_transcription(self, file: str):
+        """
+        the result is shown by the Tk thread once the transcription thread is over
+        """
+        if self.transcription_thread.is_alive():
+            self.after(200, self._check_transcription, file)
+        elif self.transcription_error or self.transcription is None:
+            messagebox.showwarning("Harmony tools", self.transcription_error or f"{file} could not be transcribed")
+        else:
+            heard_notes = [note for note in self.transcription if note[0] != "-"]
+            messagebox.showinfo("Harmony tools", f"{file}\n{len(heard_notes)} notes transcribed")
 
     def do_search_chords(self):
-        self.clear_root()
-        self.search_chords = SearchSongFromChords()
-        frame = self.search_chords.get_ui_frame(self)
-        frame.grid(row=1, column=0, columnspan=5, sticky='nsew', padx=5, pady=5)
+        from ultimate_guitar.search_chords import SearchSongFromChords
+        self.screen_manager.show("SearchSongFromChords", SearchSongFromChords)
 
     def do_search_cadence(self):
-        self.clear_root()
-        self.search_cadence = SearchSongFromCadence()
-        frame = self.search_cadence.get_ui_frame(self)
-        frame.grid(row=1, column=0, columnspan=5, sticky='nsew', padx=5, pady=5)
+        from ultimate_guitar.search_cadence import SearchSongFromCadence
+        self.screen_manager.show("SearchSongFromCadence", SearchSongFromCadence)
 
     def do_record_notes(self):
-        self.clear_root()
-        self.note_recorder = NoteRecorder()
-        frame = self.note_recorder.get_ui_frame(self)
-        frame.grid(row=1, column=0, columnspan=5, sticky='nsew', padx=5, pady=5)
-
-    def clear_root(self):
-        if self.record_youtube:
-            self.record_youtube.frame.grid_remove()
-        if self.learning_center:
-            self.learning_center.frame.grid_remove()
-        if self.search_chords:
-            self.search_chords.frame.grid_remove()
-        if self.search_cadence:
-            self.search_cadence.frame.grid_remove()
-        if self.note_recorder:
-            self.note_recorder.frame.grid_remove()
-
+        from note_recorder.note_recorder import NoteRecorder
+        self.screen_manager.show("NoteRecorder", NoteRecorder)
 
+    def do_exit(self):
+        self.screen_manager.release_all()
+        UIEventBridge.get_instance().stop()
+        self.quit()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,128 @@
+from collections import OrderedDict
+
+
+class Screen:
+    """
+    Content of the main window shown by a menu command
+    """
+
+    def get_ui_frame(self, root):
+        """
+        builds the widgets of the screen, called once per screen instance
+        :param root:
+        :return: the frame of the screen
+        """
+        raise NotImplementedError
+
+    def suspend(self):
+        """
+        the screen is hidden: the mic should not be heard anymore
+        :return:
+        """
+        pass
+
+    def release(self):
+        """
+        the screen is dropped: its threads must be stopped & its audio devices released
+        :return:
+        """
+        pass
+
+    def is_busy(self) -> bool:
+        """
+        :return: True if a background task still uses the widgets of the screen, which is not dropped meanwhile
+        """
+        return False
+
+
+class ScreenManager:
+    """
+    Keeps the screens of the main window so that they are reused when their menu is selected again
+    Beyond MAX_SCREENS, the least recently shown screen is released & its frame destroyed.
+    """
+    MAX_SCREENS = 3
+
+    def __init__(self, root, max_screens: int = MAX_SCREENS):
+        """
+        :param root: parent of the frames of the screens
+        :param max_screens: screens kept alive, including the one shown
+        """
+        if max_screens < 1:
+            raise ValueError(f"at least 1 screen must be kept - got {max_screens}")
+        self.root = root
+        self.max_screens = max_screens
+        self.screens = OrderedDict()  # name -> (screen, frame), the least recently shown first
+        self.current_screen_name = None
+        self.nb_created = 0
+        self.nb_released = 0
+
+    def show(self, name: str, create_screen) -> Screen:
+        """
+        hides the current screen & shows the named one
+        :param name: of the screen, eg its menu label
+        :param create_screen: called without parameter to create the screen if it is not kept
+        :return: the screen shown
+        """
+        if name == self.current_screen_name:
+            return self.screens[name][0]
+        self.hide()
+        if name in self.screens:
+            self.screens.move_to_end(name)
+            screen, frame = self.screens[name]
+        else:
+            screen = create_screen()
+            frame = screen.get_ui_frame(self.root)
+            self.screens[name] = (screen, frame)
+            self.nb_created += 1
+        self._place(frame)
+        self.current_screen_name = name
+        self._evict()
+        return screen
+
+    def hide(self):
+        """
+        hides the current screen, which is kept for later
+        :return:
+        """
+        if self.current_screen_name:
+            screen, frame = self.screens[self.current_screen_name]
+            screen.suspend()
+            frame.grid_remove()
+            self.current_screen_name = None
+
+    def get_screen(self, name: str) -> Screen:
+        """
+        :return: the screen kept with this name, None if not kept
+        """
+        return self.screens[name][0] if name in self.screens else None
+
+    def release_all(self):
+        """
+        releases all the screens, eg before exiting
+        :return:
+        """
+        self.hide()
+        for name in list(self.screens):
+            self._release(name)
+
+    def _place(self, frame):
+        frame.grid(row=1, column=0, columnspan=5, sticky='nsew', padx=5, pady=5)
+
+    def _evict(self):
+        """
+        releases the least recently shown screens beyond max_screens - the busy ones are kept until they are idle
+        :return:
+        """
+        nb_to_release = len(self.screens) - self.max_screens
+        for name in list(self.screens):
+            if nb_to_release <= 0:
+                break
+            if name != self.current_screen_name and not self.screens[name][0].is_busy():
+                self._release(name)
+                nb_to_release -= 1
+
+    def _release(self, name: str):
+        screen, frame = self.screens.pop(name)
+        screen.release()
+        frame.destroy()
+        self.nb_released += 1
@@ -0,0 +1,82 @@
+"""
+Throughput of BatchTranscriber from 1 process up to the number of cores
+A library of generated WAV files is transcribed from scratch for each number of processes.
+Reported: seconds of audio transcribed per second, speedup & parallel efficiency against 1 process.
+
+python -m tests.benchmarks.bench_batch_transcription [-f 8] [-t 60] [-d hps] [-o results.json]
+"""
+import argparse
+import json
+import os
+import platform
+import tempfile
+import time
+import wave
+from datetime import datetime
+
+import numpy as np
+
+from audio.pitch_detectors import DEFAULT_PITCH_DETECTOR, PITCH_DETECTORS
+from file_capabilities.batch_transcriber import BatchTranscriber
+from tests.benchmarks.fixtures import SAMPLE_FREQ, harmonic_tone, midi_to_freq
+
+RESULTS_PATH = os.path.join(os.path.dirname(__file__), "results", "batch_transcription.json")
+
+
+def write_library(folder: str, nb_files: int, duration: float) -> [str]:
+    """
+    :return: WAV files of notes changing every second
+    """
+    file_names = []
+    rng = np.random.default_rng(0)
+    for i in range(nb_files):
+        samples = np.concatenate([harmonic_tone(midi_to_freq(midi_note), 1.0)
+                                  for midi_note in rng.integers(40, 85, int(duration))])
+        file_name = os.path.join(folder, f"track {i}.wav")
+        with wave.open(file_name, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(SAMPLE_FREQ)
+            wav.writeframes((np.clip(samples, -1, 1) * (2 ** 15 - 1)).astype(np.int16).tobytes())
+        file_names.append(file_name)
+    return file_names
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-f', '--files', type=int, default=2 * os.cpu_count(),
+                        help='number of files (default: %(default)s)')
+    parser.add_argument('-t', '--duration', type=float, default=60, help='seconds per file (default: %(default)s)')
+    parser.add_argument('-d', '--detector', default=DEFAULT_PITCH_DETECTOR, choices=list(PITCH_DETECTORS),
+                        help='pitch detector (default: %(default)s)')
+    parser.add_argument('-o', '--output', default=RESULTS_PATH, help='JSON results file (default: %(default)s)')
+    args = parser.parse_args()
+
+    results = {"date": str(datetime.now()), "platform": platform.platform(), "cores": os.cpu_count(),
+               "files": args.files, "seconds per file": args.duration, "detector": args.detector, "runs": {}}
+    nb_workers_list = sorted({2 ** i for i in range(os.cpu_count().bit_length()) if 2 ** i <= os.cpu_count()}
+                             | {os.cpu_count()})
+    with tempfile.TemporaryDirectory() as folder:
+        file_names = write_library(folder, args.files, args.duration)
+        audio_duration = args.files * args.duration
+        for nb_workers in nb_workers_list:
+            # the segments are shorter than the files so that a few files are enough to feed all the processes
+            batch_transcriber = BatchTranscriber(os.path.join(folder, f"transcriptions {nb_workers}"),
+                                                 args.detector, nb_workers, segment_duration=args.duration / 4)
+            start = time.perf_counter()
+            batch_transcriber.transcribe(file_names)
+            elapsed = time.perf_counter() - start
+            speedup = results["runs"]["1"]["elapsed (s)"] / elapsed if results["runs"] else 1.0
+            results["runs"][str(nb_workers)] = {"elapsed (s)": round(elapsed, 3),
+                                                "audio seconds per second": round(audio_duration / elapsed, 1),
+                                                "speedup": round(speedup, 2),
+                                                "efficiency": round(speedup / nb_workers, 2)}
+            print(f"{nb_workers:3} processes", results["runs"][str(nb_workers)])
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding='utf-8') as file:
+        json.dump(results, file, indent=4)
+    print(f"Saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
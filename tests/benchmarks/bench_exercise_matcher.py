@@ -0,0 +1,84 @@
+"""
+Offline grading of recorded sessions with an ExerciseMatcher
+Sessions of a generated exercise are simulated like the MicAnalyzer would report them: one detection per analysis
+block, with silences, wrong & out of tune notes & timing jitter. Each session is graded twice to check that
+the replay is deterministic.
+
+python -m tests.benchmarks.bench_exercise_matcher [-s 2000] [-n 16] [-o results.json]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import time
+from datetime import datetime
+
+from learning.compiled_module import CompiledModule
+from learning.exercise_matcher import ExerciseMatcher
+
+RESULTS_PATH = os.path.join(os.path.dirname(__file__), "results", "exercise_matcher.json")
+TEMPO = 90
+BLOCK_DURATION = 2048 / 48000  # seconds between 2 detections of the MicAnalyzer
+
+
+def generate_session(training_module: CompiledModule, seed: int) -> [(float, int, float)]:
+    """
+    :return: the detection events of a simulated session
+    """
+    generator = random.Random(seed)
+    beat = 60 / TEMPO
+    events = []
+    onset = 0.0
+    for (note_id, duration) in zip(training_module.midi_notes.tolist(), training_module.durations.tolist()):
+        note_start = onset + generator.gauss(0, 0.1)
+        note_id = note_id if generator.random() > 0.1 else note_id + generator.choice([-1, 1])
+        t = max(note_start, events[-1][0] + BLOCK_DURATION if events else 0.0)
+        while t < onset + duration * beat:
+            if generator.random() < 0.05:
+                events.append((t, ExerciseMatcher.NO_NOTE, 0.0))
+            else:
+                events.append((t, note_id, generator.gauss(0, 20)))
+            t += BLOCK_DURATION
+        onset += duration * beat
+    return events
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-s', '--sessions', type=int, default=2000, help='sessions graded (default: %(default)s)')
+    parser.add_argument('-n', '--notes', type=int, default=16, help='notes of the exercise (default: %(default)s)')
+    parser.add_argument('-o', '--output', default=RESULTS_PATH, help='JSON results file (default: %(default)s)')
+    args = parser.parse_args()
+
+    generator = random.Random(0)
+    notes = [CompiledModule.get_note_name(generator.randint(48, 72)) for _ in range(args.notes)]
+    training_module = CompiledModule(notes, [generator.choice([0.5, 1, 2]) for _ in range(args.notes)])
+    sessions = [generate_session(training_module, seed) for seed in range(args.sessions)]
+    nb_events = sum(len(events) for events in sessions)
+    exercise_matcher = ExerciseMatcher(training_module, tempo=TEMPO, min_hold=0.25)
+    begin = time.perf_counter()
+    scores = []
+    for events in sessions:
+        exercise_matcher.replay(events, end_time=events[-1][0])
+        scores.append(exercise_matcher.get_score())
+    duration = time.perf_counter() - begin
+    replayed_scores = []
+    for events in sessions:
+        exercise_matcher.replay(events, end_time=events[-1][0])
+        replayed_scores.append(exercise_matcher.get_score())
+
+    results = {"date": str(datetime.now()), "platform": platform.platform(), "sessions": args.sessions,
+               "notes": args.notes, "events": nb_events, "time (s)": round(duration, 3),
+               "sessions per second": round(args.sessions / duration), "events per second": round(nb_events / duration),
+               "mean score (%)": round(sum(scores) / len(scores), 1), "deterministic": scores == replayed_scores}
+    for (key, value) in results.items():
+        print(f"{key:20} {value}")
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding='utf-8') as file:
+        json.dump(results, file, indent=4)
+    print(f"Saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
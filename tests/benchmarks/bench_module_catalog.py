@@ -0,0 +1,88 @@
+"""
+Reload time of the learning modules with a ModuleCatalog, for a generated library of modules
+    - full parse: every file is opened & parsed, as LearningCenter did on each reload
+    - first scan: the catalog is built & its index saved
+    - reload: nothing changed since the previous scan
+    - reload after edit: a few modules changed
+    - restart: a new catalog reads the index saved by the previous run
+The tree of the LearningCenter is filled per folder on expand & is not measured.
+
+python -m tests.benchmarks.bench_module_catalog [-n 20000] [-o results.json]
+"""
+import argparse
+import json
+import os
+import platform
+import tempfile
+import time
+from datetime import datetime
+
+from learning.module_catalog import ModuleCatalog
+
+RESULTS_PATH = os.path.join(os.path.dirname(__file__), "results", "module_catalog.json")
+MODULES_PER_FOLDER = 100
+NB_EDITED = 10
+
+
+def write_library(modules_path: str, nb_modules: int) -> [str]:
+    paths = []
+    for module_id in range(nb_modules):
+        folder = os.path.join(modules_path, f"folder {module_id // MODULES_PER_FOLDER}")
+        os.makedirs(folder, exist_ok=True)
+        paths.append(os.path.join(folder, f"module {module_id}.json"))
+        with open(paths[-1], "w", encoding='utf-8') as file:
+            json.dump({"name": f"module {module_id}", "description": "generated", "play_notes": "C3-E3-G3-C4",
+                       "next possible": ""}, file)
+    return paths
+
+
+def full_parse(modules_path: str) -> int:
+    nb_parsed = 0
+    for (folder, _, files) in os.walk(modules_path):
+        for name in files:
+            with open(os.path.join(folder, name), encoding='utf-8') as file:
+                json.load(file)
+            nb_parsed += 1
+    return nb_parsed
+
+
+def timed(function, *args) -> (float, int):
+    begin = time.perf_counter()
+    result = function(*args)
+    return round(1000 * (time.perf_counter() - begin), 2), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-n', '--modules', type=int, default=20000, help='modules generated (default: %(default)s)')
+    parser.add_argument('-o', '--output', default=RESULTS_PATH, help='JSON results file (default: %(default)s)')
+    args = parser.parse_args()
+
+    results = {"date": str(datetime.now()), "platform": platform.platform(), "modules": args.modules, "runs": {}}
+    with tempfile.TemporaryDirectory() as folder:
+        modules_path = os.path.join(folder, "learning modules")
+        index_file = os.path.join(folder, "module_catalog.json")
+        paths = write_library(modules_path, args.modules)
+        module_catalog = ModuleCatalog(modules_path, index_file)
+        runs = {"full parse": timed(full_parse, modules_path),
+                "first scan": timed(module_catalog.scan),
+                "reload": timed(module_catalog.scan)}
+        time.sleep(0.01)  # another mtime for the edited files
+        for path in paths[:NB_EDITED]:
+            with open(path, "a", encoding='utf-8') as file:
+                file.write(" ")
+        runs["reload after edit"] = timed(module_catalog.scan)
+        runs["restart"] = timed(ModuleCatalog(modules_path, index_file).scan)
+    for (name, (duration, nb_parsed)) in runs.items():
+        results["runs"][name] = {"time (ms)": duration, "parsed files": nb_parsed}
+        print(f"{name:18} {duration:9.2f}ms {nb_parsed:7} files parsed")
+    results["reload speedup"] = round(runs["full parse"][0] / runs["reload"][0], 2)
+    print(f"reload speedup {results['reload speedup']}")
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding='utf-8') as file:
+        json.dump(results, file, indent=4)
+    print(f"Saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
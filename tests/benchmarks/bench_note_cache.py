@@ -0,0 +1,79 @@
+"""
+Start time of the NotePlayer sounds with a NoteCache
+    - no cache: the notes are synthesized on each start
+    - cold start: the notes are synthesized & saved to an empty cache
+    - warm start: the notes are mapped from the cache
+A start is the synthesis of the sounds prewarmed by the instruments (MAX_SOUNDS notes from E2) with an ADSR envelope;
+the loops played without envelope are never cached. No sound card is needed: the pygame sounds are not created.
+
+python -m tests.benchmarks.bench_note_cache [-r 5] [-o results.json]
+"""
+import argparse
+import json
+import os
+import platform
+import tempfile
+import time
+from datetime import datetime
+
+from pyharmonytools.harmony.note import Note
+
+from audio.note_cache import NoteCache
+from audio.note_player import NotePlayer
+from audio.wavetable import ADSREnvelope
+
+RESULTS_PATH = os.path.join(os.path.dirname(__file__), "results", "note_cache.json")
+NOTES = [(note, octave) for octave in range(2, 10) for note in Note.CHROMATIC_SCALE_SHARP_BASED][4:][
+        :NotePlayer.MAX_SOUNDS]
+
+
+class SoundCardFreeNotePlayer(NotePlayer):
+    def _create_sound(self, signal):
+        return signal
+
+
+def start(note_cache: NoteCache, envelope: ADSREnvelope) -> float:
+    """
+    :return: seconds to get the sounds of NOTES from a state as fresh as a new process
+    """
+    NotePlayer.set_note_cache(note_cache)
+    NotePlayer.set_envelope(envelope)
+    NotePlayer.wavetables.clear()
+    if envelope:
+        envelope.gains.clear()
+    begin = time.perf_counter()
+    note_player = SoundCardFreeNotePlayer()
+    for (note, octave) in NOTES:
+        note_player.get_sound(note, octave)
+    return time.perf_counter() - begin
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-r', '--runs', type=int, default=5, help='starts per measure (default: %(default)s)')
+    parser.add_argument('-o', '--output', default=RESULTS_PATH, help='JSON results file (default: %(default)s)')
+    args = parser.parse_args()
+
+    results = {"date": str(datetime.now()), "platform": platform.platform(), "notes": len(NOTES), "runs": {}}
+    for (name, envelope) in [("ADSR", ADSREnvelope())]:
+        no_cache, cold, warm = [], [], []
+        for _ in range(args.runs):
+            with tempfile.TemporaryDirectory() as folder:
+                no_cache.append(start(None, envelope))
+                cold.append(start(NoteCache(folder), envelope))
+                warm.append(start(NoteCache(folder), envelope))
+        results["runs"][name] = {"no cache (ms)": round(1000 * min(no_cache), 2),
+                                 "cold start (ms)": round(1000 * min(cold), 2),
+                                 "warm start (ms)": round(1000 * min(warm), 2),
+                                 "speedup": round(min(no_cache) / min(warm), 2)}
+        print(f"{name:5}", results["runs"][name])
+    NotePlayer.set_note_cache(None)
+    NotePlayer.set_envelope(None)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding='utf-8') as file:
+        json.dump(results, file, indent=4)
+    print(f"Saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Cost of the NotePlayer note synthesis for the whole chromatic range (12 notes x 10 octaves)
+    - legacy: 5 seconds np.sin buffer per note
+    - wavetable: single loop per note, repeated by the mixer
+    - wavetable + ADSR: loop tiled & shaped for a NOTE_DURATION note
+No sound card is needed: the pygame sounds are not created.
+
+python -m tests.benchmarks.bench_note_synthesis
+"""
+import time
+
+from pyharmonytools.harmony.note import Note
+
+from audio.note_player import NotePlayer
+from audio.wavetable import Wavetable, ADSREnvelope
+
+OCTAVES = range(0, 10)
+
+
+def measure(synthesize) -> dict:
+    """
+    :param synthesize: called with (note, octave), returns the samples kept for the note
+    """
+    start = time.perf_counter()
+    kept = [synthesize(note, octave) for octave in OCTAVES for note in Note.CHROMATIC_SCALE_SHARP_BASED]
+    elapsed = time.perf_counter() - start
+    return {"per note (ms)": round(1000 * elapsed / len(kept), 3),
+            "memory (KB)": round(sum(samples.nbytes for samples in kept) / 1024, 1)}
+
+
+if __name__ == "__main__":
+    note_player = NotePlayer()
+    envelope = ADSREnvelope()
+
+    def legacy(note: str, octave: int):
+        return note_player._get_wave(Note.notes[note][octave], 5)
+
+    def wavetable(note: str, octave: int):
+        return Wavetable(Note.notes[note][octave] / NotePlayer.MAGIC_NUMBER, NotePlayer.samplerate).loop
+
+    def wavetable_adsr(note: str, octave: int):
+        table = Wavetable(Note.notes[note][octave] / NotePlayer.MAGIC_NUMBER, NotePlayer.samplerate)
+        return table.render(NotePlayer.NOTE_DURATION, envelope)
+
+    for name, synthesize in [("legacy", legacy), ("wavetable", wavetable), ("wavetable + ADSR", wavetable_adsr)]:
+        print(f"{name:18}", measure(synthesize))
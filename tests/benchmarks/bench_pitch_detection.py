@@ -0,0 +1,111 @@
+"""
+Headless benchmark of MicAnalyzer: the fixtures are fed block by block through MicAnalyzer.analyze_block()
+as the analysis thread would do, so no sound card is needed.
+Reported per pitch detector:
+    - blocks per second & per-block latency percentiles
+    - note detection accuracy per fixture / frequency and time to the first right note
+
+python -m tests.benchmarks.bench_pitch_detection [-d hps yin] [-o results.json]
+"""
+import argparse
+import json
+import os
+import platform
+import time
+from datetime import datetime
+
+import numpy as np
+
+from audio.mic_analyzer import MicAnalyzer, MicListener
+from audio.pitch_detectors import PITCH_DETECTORS
+from tests.benchmarks.fixtures import AudioFixture, generated_fixtures, wav_fixtures, WAV_FIXTURES_PATH
+
+RESULTS_PATH = os.path.join(os.path.dirname(__file__), "results", "pitch_detection.json")
+
+
+class NoteCollector(MicListener):
+    def __init__(self):
+        super().__init__()
+        self.notes = []
+
+    def set_current_note(self, new_note: str, heard_freq: float = 0.0, closest_pitch: float = 0.0):
+        self.notes.append(new_note)
+
+
+def run_fixture(mic_analyzer: MicAnalyzer, collector: NoteCollector, fixture: AudioFixture) -> dict:
+    mic_analyzer.reset()
+    collector.notes = []
+    block_size = mic_analyzer.get_pitch_detector().window_step
+    nb_blocks = len(fixture.samples) // block_size
+    blocks = fixture.samples[:nb_blocks * block_size].reshape(nb_blocks, block_size)
+    latencies = np.zeros(nb_blocks)
+    for i in range(nb_blocks):
+        start = time.perf_counter()
+        mic_analyzer.analyze_block(blocks[i])
+        latencies[i] = time.perf_counter() - start
+    result = {"blocks": nb_blocks, "latencies": latencies}
+    if fixture.expected_notes:
+        hits = [note in fixture.expected_notes for note in collector.notes]
+        # blocks heard before the detection window is full are not taken into account
+        first_full_block = min(mic_analyzer.get_pitch_detector().window_size // block_size, nb_blocks - 1)
+        result["accuracy"] = float(np.mean(hits[first_full_block:])) if hits[first_full_block:] else 0.0
+        result["time to note (s)"] = (hits.index(True) + 1) * block_size / MicAnalyzer.SAMPLE_FREQ \
+            if True in hits else None
+    return result
+
+
+def run_detector(detector_name: str, fixtures: [AudioFixture]) -> dict:
+    mic_analyzer = MicAnalyzer(detector_name)
+    collector = NoteCollector()
+    mic_analyzer.add_listener(collector)
+    all_latencies = []
+    per_fixture = {}
+    start = time.perf_counter()
+    for fixture in fixtures:
+        result = run_fixture(mic_analyzer, collector, fixture)
+        all_latencies.append(result.pop("latencies"))
+        result["frequency"] = round(fixture.frequency, 2)
+        per_fixture[fixture.name] = result
+    total_time = time.perf_counter() - start
+    latencies = np.concatenate(all_latencies) * 1000
+    nb_blocks = len(latencies)
+    tones = [r for (name, r) in per_fixture.items() if name.startswith("tone")]
+    return {
+        "window size": mic_analyzer.get_pitch_detector().window_size,
+        "block size": mic_analyzer.get_pitch_detector().window_step,
+        "blocks per second": round(nb_blocks / total_time, 1),
+        "real time factor": round(total_time / (nb_blocks * mic_analyzer.get_pitch_detector().window_step
+                                                / MicAnalyzer.SAMPLE_FREQ), 4),
+        "latency (ms)": {f"p{p}": round(float(np.percentile(latencies, p)), 3) for p in [50, 90, 99]} |
+                        {"max": round(float(latencies.max()), 3)},
+        "tone accuracy": round(float(np.mean([r["accuracy"] for r in tones])), 3) if tones else None,
+        "fixtures": per_fixture,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-d', '--detectors', nargs='*', default=list(PITCH_DETECTORS),
+                        help='pitch detectors to benchmark (default: all)')
+    parser.add_argument('-w', '--wav-fixtures', default=WAV_FIXTURES_PATH,
+                        help='folder of recorded WAV fixtures (default: %(default)s)')
+    parser.add_argument('-t', '--duration', type=float, default=2.0,
+                        help='duration of each generated fixture in seconds (default: %(default)s)')
+    parser.add_argument('-o', '--output', default=RESULTS_PATH, help='JSON results file (default: %(default)s)')
+    args = parser.parse_args()
+
+    fixtures = generated_fixtures(args.duration) + wav_fixtures(args.wav_fixtures)
+    results = {"date": str(datetime.now()), "platform": platform.platform(), "python": platform.python_version(),
+               "numpy": np.__version__, "detectors": {}}
+    for detector_name in args.detectors:
+        results["detectors"][detector_name] = run_detector(detector_name, fixtures)
+        summary = {k: v for (k, v) in results["detectors"][detector_name].items() if k != "fixtures"}
+        print(f"{detector_name:16}", summary)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding='utf-8') as file:
+        json.dump(results, file, indent=4)
+    print(f"Saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Microbenchmark of the sample window handling done by MicAnalyzer.callback for each audio block
+    - legacy: np.concatenate + slicing of the whole window
+    - ring buffer: in-place SampleRingBuffer.write() + zero-copy window()
+
+python -m tests.benchmarks.bench_sample_window
+"""
+import time
+import tracemalloc
+
+import numpy as np
+
+from audio.ring_buffer import SampleRingBuffer
+
+WINDOW_SIZE = 48000
+WINDOW_STEP = 12000
+NB_BLOCKS = 500
+
+
+class LegacySampleWindow:
+    def __init__(self):
+        self.window_samples = [0 for _ in range(WINDOW_SIZE)]
+        self.hann_window = np.hanning(WINDOW_SIZE)
+
+    def callback(self, indata):
+        self.window_samples = np.concatenate((self.window_samples, indata[:, 0]))
+        self.window_samples = self.window_samples[len(indata[:, 0]):]
+        return self.window_samples * self.hann_window
+
+
+class RingBufferSampleWindow:
+    def __init__(self):
+        self.window_samples = SampleRingBuffer(WINDOW_SIZE)
+        self.hann_window = np.hanning(WINDOW_SIZE).astype(np.float32)
+        self.hann_samples = np.zeros(WINDOW_SIZE, dtype=np.float32)
+
+    def callback(self, indata):
+        self.window_samples.write(indata[:, 0])
+        return np.multiply(self.window_samples.window(), self.hann_window, out=self.hann_samples)
+
+
+def run(sample_window, blocks: []) -> dict:
+    for block in blocks[:4]:  # fill the window first
+        sample_window.callback(block)
+    latencies = []
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    start_allocated, _ = tracemalloc.get_traced_memory()
+    peak_per_block = 0
+    for block in blocks:
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        sample_window.callback(block)
+        latencies.append(time.perf_counter() - start)
+        _, peak = tracemalloc.get_traced_memory()
+        peak_per_block = max(peak_per_block, peak - start_allocated)
+    tracemalloc.stop()
+    latencies = np.array(latencies) * 1e6
+    return {"peak allocated bytes per block": peak_per_block,
+            "median latency (us)": round(float(np.median(latencies)), 1),
+            "p99 latency (us)": round(float(np.percentile(latencies, 99)), 1)}
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    blocks = [rng.uniform(-1, 1, (WINDOW_STEP, 1)).astype(np.float32) for _ in range(NB_BLOCKS)]
+    for name, sample_window in [("legacy", LegacySampleWindow()), ("ring buffer", RingBufferSampleWindow())]:
+        print(f"{name:12}", run(sample_window, blocks))
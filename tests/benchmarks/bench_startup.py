@@ -0,0 +1,93 @@
+"""
+Import-time report of pyharmony.py: time to the first paint of the main window against the former eager start,
+which imported every screen before showing the window, & cost of each screen on its first use.
+Each measure runs in a new interpreter so that nothing is already imported; the window is only painted
+when a display is available, otherwise the import of pyharmony is measured alone.
+
+python -m tests.benchmarks.bench_startup [-r 5] [-o results.json]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime
+
+RESULTS_PATH = os.path.join(os.path.dirname(__file__), "results", "startup.json")
+TARGET = 1.0  # seconds to the first paint of the main window
+SCREENS = {"Youtube MP3 grabbing": "file_capabilities.download_mp3_youtube",
+           "Sound file loading": "file_capabilities.sound_file_transcriber",
+           "Live hearing": "audio.capture_sound_plot",
+           "Live analysis": "audio.capture_sound_fft",
+           "Learning Center": "learning.learning_center",
+           "Note recorder": "note_recorder.note_recorder",
+           "Chords Search UG": "ultimate_guitar.search_chords",
+           "Cadence Search UG": "ultimate_guitar.search_cadence"}
+HEAVY_MODULES = ["numpy", "scipy", "matplotlib", "sounddevice", "pygame", "pytube", "PIL", "pyharmonytools"]
+# run in a new interpreter, prints the measures as JSON
+MEASURE = """
+import importlib, json, sys, time
+failed = []
+start = time.perf_counter()
+for module in {modules}:
+    try:
+        importlib.import_module(module)
+    except (ImportError, OSError):  # eg no PortAudio for sounddevice
+        failed.append(module)
+imported = time.perf_counter()
+painted = None
+if {paint}:
+    import pyharmony, tkinter
+    try:
+        app = pyharmony.RootWindow()
+        app.update()
+        painted = time.perf_counter()
+        app.destroy()
+    except tkinter.TclError:
+        pass
+print(json.dumps({{"import (s)": imported - start, "first paint (s)": None if painted is None else painted - start,
+                  "heavy modules": [m for m in {heavy} if m in sys.modules], "failed imports": failed}}))
+"""
+
+
+def measure(modules: [str], paint: bool = False) -> dict:
+    code = MEASURE.format(modules=modules, paint=paint, heavy=HEAVY_MODULES)
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def best_of(runs: int, modules: [str], paint: bool = False) -> dict:
+    measures = [measure(modules, paint) for _ in range(runs)]
+    best = min(measures, key=lambda m: m["first paint (s)"] or m["import (s)"])
+    return {key: round(value, 3) if isinstance(value, float) else value for (key, value) in best.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-r', '--runs', type=int, default=5, help='runs per measure (default: %(default)s)')
+    parser.add_argument('-o', '--output', default=RESULTS_PATH, help='JSON results file (default: %(default)s)')
+    args = parser.parse_args()
+
+    results = {"date": str(datetime.now()), "platform": platform.platform(), "target (s)": TARGET}
+    results["lazy start"] = best_of(args.runs, ["pyharmony"], paint=True)
+    results["eager start"] = best_of(args.runs, ["pyharmony"] + list(SCREENS.values()), paint=True)
+    start_key = "first paint (s)" if results["lazy start"]["first paint (s)"] is not None else "import (s)"
+    results["saving (s)"] = round(results["eager start"][start_key] - results["lazy start"][start_key], 3)
+    results["target met"] = results["lazy start"][start_key] < TARGET
+    for name in ["lazy start", "eager start"]:
+        print(f"{name:12} {start_key} {results[name][start_key]:7.3f}  heavy modules: {results[name]['heavy modules']}")
+    print(f"saving {results['saving (s)']}s - target of {TARGET}s {'met' if results['target met'] else 'missed'}")
+    results["first use (s)"] = {}
+    base = results["lazy start"]["import (s)"]
+    for (screen, module) in SCREENS.items():
+        results["first use (s)"][screen] = round(best_of(args.runs, ["pyharmony", module])["import (s)"] - base, 3)
+        print(f"  first use of {screen:22} {results['first use (s)'][screen]:7.3f}s")
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding='utf-8') as file:
+        json.dump(results, file, indent=4)
+    print(f"Saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark of the HPS pitch detection per analyzed block
+    - legacy: complex scipy.fftpack FFT + 5x np.interp of the whole spectrum + HPS of the whole spectrum
+    - stft: StreamingSTFT real-input FFT + interpolation at the harmonics of the candidate pitches only
+Both search the pitch on the same 0.2 Hz grid. CPU time is measured with time.process_time().
+The StreamingSTFT cost is also reported for a few window / hop / zero padding settings.
+
+python -m tests.benchmarks.bench_stft [-n 200]
+"""
+import argparse
+import copy
+import time
+
+import numpy as np
+import scipy.fftpack
+
+from audio.pitch_detectors import HPSPitchDetector
+from audio.spectral_gate import SpectralGate
+from audio.stft import StreamingSTFT
+from tests.benchmarks.fixtures import SAMPLE_FREQ, harmonic_tone, midi_to_freq
+
+
+class LegacyHPSPitchDetector(HPSPitchDetector):
+    def __init__(self, sample_freq: int = 48000):
+        super().__init__(sample_freq)
+        self.delta_freq = sample_freq / self.window_size
+        self.hann_window = np.hanning(self.window_size).astype(np.float32)
+        self.hann_samples = np.zeros(self.window_size, dtype=np.float32)
+        self.spectral_gate = SpectralGate(self.delta_freq, self.window_size // 2, self.OCTAVE_BANDS,
+                                          mains_hum_freq=self.MAINS_HUM_FREQ,
+                                          white_noise_thresh=self.WHITE_NOISE_THRESH)
+
+    def detect(self, window_samples: np.ndarray) -> float:
+        hann_samples = np.multiply(window_samples, self.hann_window, out=self.hann_samples)
+        magnitude_spec = abs(scipy.fftpack.fft(hann_samples)[:len(hann_samples) // 2])
+        self.spectral_gate.apply(magnitude_spec)
+        mag_spec_ipol = np.interp(np.arange(0, len(magnitude_spec), 1 / self.NUM_HPS),
+                                  np.arange(0, len(magnitude_spec)),
+                                  magnitude_spec)
+        norm = np.linalg.norm(mag_spec_ipol, ord=2)
+        if norm == 0:
+            return 0.0
+        mag_spec_ipol = mag_spec_ipol / norm
+        hps_spec = copy.deepcopy(mag_spec_ipol)
+        for i in range(self.NUM_HPS):
+            tmp_hps_spec = np.multiply(hps_spec[:int(np.ceil(len(mag_spec_ipol) / (i + 1)))],
+                                       mag_spec_ipol[::(i + 1)])
+            if not tmp_hps_spec.any():
+                break
+            hps_spec = tmp_hps_spec
+        max_ind = np.argmax(hps_spec)
+        return max_ind * self.delta_freq / self.NUM_HPS
+
+
+def cpu_per_call(function, nb_calls: int) -> float:
+    """
+    :return: median CPU time of a call in ms, measured over 5 runs
+    """
+    runs = []
+    for _ in range(5):
+        start = time.process_time()
+        for _ in range(nb_calls):
+            function()
+        runs.append((time.process_time() - start) / nb_calls * 1000)
+    return float(np.median(runs))
+
+
+def compare_detectors(nb_calls: int):
+    legacy = LegacyHPSPitchDetector(SAMPLE_FREQ)
+    detector = HPSPitchDetector(SAMPLE_FREQ)
+    windows = [harmonic_tone(midi_to_freq(midi_note), detector.window_size / SAMPLE_FREQ)
+               for midi_note in range(40, 85, 4)]
+    same_pitches = [legacy.detect(window) == detector.detect(window) for window in windows]
+    legacy_cpu = cpu_per_call(lambda: [legacy.detect(window) for window in windows], nb_calls) / len(windows)
+    stft_cpu = cpu_per_call(lambda: [detector.detect(window) for window in windows], nb_calls) / len(windows)
+    print(f"HPS per block: legacy {legacy_cpu:.3f} ms - stft {stft_cpu:.3f} ms - "
+          f"{legacy_cpu / stft_cpu:.1f}x less CPU - same pitch for {sum(same_pitches)}/{len(windows)} tones")
+
+
+def compare_stft_settings(nb_calls: int):
+    samples = harmonic_tone(440, 2.0)
+    for window_size, hop_size, zero_padding in [(48000, 12000, 1), (8192, 2048, 1), (8192, 2048, 4),
+                                                (2048, 512, 1), (2048, 512, 8)]:
+        stft = StreamingSTFT(window_size, hop_size, SAMPLE_FREQ, zero_padding)
+        frames = [samples[end - window_size:end] for end in range(window_size, len(samples) + 1, hop_size)]
+        cpu = cpu_per_call(lambda: [stft.magnitude(frame) for frame in frames], max(nb_calls // 20, 1)) / len(frames)
+        print(f"StreamingSTFT window {window_size:6} hop {hop_size:6} zero padding {zero_padding}: "
+              f"{cpu:.3f} ms per frame - {stft.delta_freq:.2f} Hz per bin")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-n', '--nb-calls', type=int, default=20, help='calls per measure (default: %(default)s)')
+    args = parser.parse_args()
+    compare_detectors(args.nb_calls)
+    compare_stft_settings(args.nb_calls)
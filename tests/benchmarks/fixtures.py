@@ -0,0 +1,110 @@
+"""
+Audio fixtures fed to the pitch detection benchmarks
+    - generated: harmonic tones, chords, white noise, silence
+    - recorded: WAV files whose name starts with the expected note, eg "A4 guitar.wav"
+"""
+import os
+import wave
+
+import numpy as np
+from scipy.signal import resample_poly
+
+SAMPLE_FREQ = 48000
+WAV_FIXTURES_PATH = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+class AudioFixture:
+    def __init__(self, name: str, samples: np.ndarray, expected_notes: [], frequency: float = 0.0):
+        """
+        :param name:
+        :param samples: mono float32 samples at SAMPLE_FREQ
+        :param expected_notes: notes that may be reported, eg ["A4"] - ["-"] for silence, [] if unknown
+        :param frequency: fundamental frequency in Hz, 0.0 if none
+        """
+        self.name = name
+        self.samples = samples
+        self.expected_notes = expected_notes
+        self.frequency = frequency
+
+
+def midi_to_freq(midi_note: int) -> float:
+    return 440 * 2 ** ((midi_note - 69) / 12)
+
+
+def midi_to_note(midi_note: int) -> str:
+    """
+    :param midi_note: 69 for A4
+    :return: note name as reported by MicAnalyzer, eg "A4"
+    """
+    return ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"][midi_note % 12] + str(midi_note // 12 - 1)
+
+
+def harmonic_tone(freq: float, duration: float, noise_level: float = 0.01, nb_harmonics: int = 8) -> np.ndarray:
+    """
+    sawtooth-like tone + white noise
+    """
+    rng = np.random.default_rng(int(freq))
+    nb_samples = int(duration * SAMPLE_FREQ)
+    t = np.arange(nb_samples) / SAMPLE_FREQ
+    tone = np.zeros(nb_samples)
+    for k in range(1, nb_harmonics + 1):
+        if freq * k < SAMPLE_FREQ / 2:
+            tone += np.sin(2 * np.pi * freq * k * t) / k
+    return (0.2 * tone + noise_level * rng.standard_normal(nb_samples)).astype(np.float32)
+
+
+def white_noise(duration: float, level: float = 0.1) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return (level * rng.standard_normal(int(duration * SAMPLE_FREQ))).astype(np.float32)
+
+
+def generated_fixtures(duration: float = 2.0) -> [AudioFixture]:
+    fixtures = []
+    for midi_note in range(40, 85):  # E2 -> C6
+        freq = midi_to_freq(midi_note)
+        fixtures.append(AudioFixture(f"tone {midi_to_note(midi_note)}", harmonic_tone(freq, duration),
+                                     [midi_to_note(midi_note)], freq))
+    for root, name in [(48, "C3 major"), (57, "A3 minor"), (52, "E3 major")]:
+        intervals = [0, 4, 7] if "major" in name else [0, 3, 7]
+        chord = sum(harmonic_tone(midi_to_freq(root + i), duration) for i in intervals) / len(intervals)
+        fixtures.append(AudioFixture(f"chord {name}", chord.astype(np.float32),
+                                     [midi_to_note(root + i) for i in intervals], midi_to_freq(root)))
+    fixtures.append(AudioFixture("white noise", white_noise(duration), ["-"]))
+    fixtures.append(AudioFixture("silence", np.zeros(int(duration * SAMPLE_FREQ), dtype=np.float32), ["-"]))
+    return fixtures
+
+
+def read_wav(path: str) -> np.ndarray:
+    """
+    :param path: 8, 16 or 32 bits PCM WAV file
+    :return: first channel as float32 samples in [-1, 1] at SAMPLE_FREQ
+    """
+    with wave.open(path, "rb") as wav:
+        sample_width = wav.getsampwidth()
+        nb_channels = wav.getnchannels()
+        frame_rate = wav.getframerate()
+        frames = wav.readframes(wav.getnframes())
+    if sample_width == 1:
+        samples = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif sample_width == 2:
+        samples = np.frombuffer(frames, dtype=np.int16).astype(np.float32) / 2 ** 15
+    elif sample_width == 4:
+        samples = np.frombuffer(frames, dtype=np.int32).astype(np.float32) / 2 ** 31
+    else:
+        raise ValueError(f"{path}: {8 * sample_width} bits samples not supported")
+    samples = samples[::nb_channels]
+    if frame_rate != SAMPLE_FREQ:
+        samples = resample_poly(samples, SAMPLE_FREQ, frame_rate).astype(np.float32)
+    return samples
+
+
+def wav_fixtures(path: str = WAV_FIXTURES_PATH) -> [AudioFixture]:
+    fixtures = []
+    if not os.path.isdir(path):
+        return fixtures
+    for file_name in sorted(os.listdir(path)):
+        if file_name.lower().endswith(".wav"):
+            expected_note = os.path.splitext(file_name)[0].split(" ")[0]
+            expected_notes = [expected_note] if expected_note[-1:].isdigit() else []
+            fixtures.append(AudioFixture(f"wav {file_name}", read_wav(os.path.join(path, file_name)), expected_notes))
+    return fixtures
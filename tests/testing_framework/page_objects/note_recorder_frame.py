@@ -13,7 +13,7 @@ class NoteRecorderFrame:
     def display_frame(self):
         # self.app.open_search_chords_frame()
         self.root_app.open_note_recorder_frame()
-        self.note_recorder_object = self.root_app.app.note_recorder
+        self.note_recorder_object = self.root_app.get_screen("NoteRecorder")
 
     def start_listening_bars(self, bpm: float, signature: tuple, bars: int):
         # todo metronome
@@ -30,7 +30,15 @@ class RootWindowFrame:
         provides the path of the recorded youtube file
         :return:
         """
-        return self.app.record_youtube.out_file
+        return self.get_screen("DownloadMP3Youtube").out_file
+
+    def get_screen(self, name: str):
+        """
+        provides a screen shown by the main window
+        :param name: of the screen in the ScreenManager, eg "NoteRecorder"
+        :return: the screen, None if it was never shown or was released
+        """
+        return self.app.screen_manager.get_screen(name)
 
     def quit(self):
         """
@@ -12,7 +12,7 @@ class SearchCadenceFrame:
     def display_frame(self):
         # self.app.open_search_chords_frame()
         self.root_app.open_search_cadence_frame()
-        self.search_cadence_object = self.root_app.app.search_cadence
+        self.search_cadence_object = self.root_app.get_screen("SearchSongFromCadence")
 
     def set_cadence_to_search(self, cadence: str):
         self.search_cadence_object.pattern.delete(0, END)
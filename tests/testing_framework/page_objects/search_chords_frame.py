@@ -12,7 +12,7 @@ class SearchChordsFrame:
     def display_frame(self):
         # self.app.open_search_chords_frame()
         self.root_app.open_search_chords_frame()
-        self.search_chord_object = self.root_app.app.search_chords
+        self.search_chord_object = self.root_app.get_screen("SearchSongFromChords")
 
     def set_chords_to_search(self, chord_sequence: str):
         self.search_chord_object.pattern.delete(0, END)
@@ -23,4 +23,4 @@ class YoutubeMp3GrabbingFrame:
 
     def display_frame(self):
         self.root_app.open_youtube_recorder_frame()
-        self.youtube_object = self.root_app.app.record_youtube
+        self.youtube_object = self.root_app.get_screen("DownloadMP3Youtube")
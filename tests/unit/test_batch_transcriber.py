@@ -0,0 +1,103 @@
+import json
+import os
+import tempfile
+from datetime import timedelta
+from unittest import TestCase
+
+import numpy as np
+
+from file_capabilities.batch_transcriber import BatchTranscriber, merge_segments
+from file_capabilities.sound_file_transcriber import SoundFileTranscriber
+from tests.unit.test_sound_file_transcriber import write_wav, tone
+
+
+class TestBatchTranscriber(TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.library = os.path.join(self.folder.name, "download")
+        self.output = os.path.join(self.folder.name, "transcriptions")
+        os.makedirs(self.library)
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def test_merge_segments(self):
+        # TEST
+        song = merge_segments([[("-", 0.0), ("A4", 0.5)], [("A4", 2.0), ("C4", 2.5)], [("C4", 4.0)]])
+        assert song == [("-", timedelta(0)), ("A4", timedelta(seconds=0.5)), ("C4", timedelta(seconds=2.5))]
+
+    def test_segments_as_whole_file(self):
+        # SETUP
+        file_name = os.path.join(self.library, "song.wav")
+        samples = np.concatenate([tone(freq, 1.3, 48000) for freq in [220, 440, 329.63, 261.63, 392, 220]])
+        write_wav(file_name, samples, 48000)
+        batch_transcriber = BatchTranscriber(self.output, "yin", nb_workers=2, segment_duration=2)
+        # TEST
+        assert len(batch_transcriber.get_segments(file_name)) == 4
+        transcriptions = batch_transcriber.transcribe(BatchTranscriber.find_sound_files(self.library))
+        assert transcriptions[file_name] == SoundFileTranscriber("yin").transcribe(file_name)
+
+    def test_resume_from_manifest(self):
+        # SETUP
+        for (name, freq) in [("a.wav", 440), ("b.wav", 261.63)]:
+            write_wav(os.path.join(self.library, name), tone(freq, 1, 48000), 48000)
+        batch_transcriber = BatchTranscriber(self.output, "yin", nb_workers=2)
+        progress = []
+        file_names = BatchTranscriber.find_sound_files(self.library)
+        batch_transcriber.transcribe(file_names[:1])
+        # TEST
+        transcriptions = batch_transcriber.transcribe(file_names, lambda *args: progress.append(args))
+        assert list(transcriptions) == file_names[1:]
+        assert progress == [(1, 1, file_names[1])]
+        with open(os.path.join(self.output, BatchTranscriber.MANIFEST), encoding='utf-8') as file:
+            assert len(json.load(file)) == 2
+        with open(os.path.join(self.output, BatchTranscriber.get_transcription_name(file_names[1])),
+                  encoding='utf-8') as file:
+            assert "C4" in [note for (note, seconds) in json.load(file)["song"]]
+
+    def test_failed_file(self):
+        # SETUP
+        write_wav(os.path.join(self.library, "a.wav"), tone(440, 1, 48000), 48000)
+        with open(os.path.join(self.library, "b.wav"), "wb") as file:
+            file.write(b"not a RIFF file")
+        batch_transcriber = BatchTranscriber(self.output, "yin", nb_workers=2)
+        file_names = BatchTranscriber.find_sound_files(self.library)
+        # TEST
+        transcriptions = batch_transcriber.transcribe(file_names)
+        assert list(transcriptions) == file_names[:1]
+        assert list(batch_transcriber.errors) == file_names[1:]
+        with open(os.path.join(self.output, BatchTranscriber.MANIFEST), encoding='utf-8') as file:
+            assert "error" in json.load(file)[os.path.abspath(file_names[1])]
+        assert not batch_transcriber.is_transcribed(file_names[1])
+
+    def test_files_of_same_name(self):
+        # SETUP
+        os.makedirs(os.path.join(self.library, "rock"))
+        for (name, freq) in [("song.wav", 440), (os.path.join("rock", "song.wav"), 261.63)]:
+            write_wav(os.path.join(self.library, name), tone(freq, 1, 48000), 48000)
+        batch_transcriber = BatchTranscriber(self.output, "yin", nb_workers=2)
+        file_names = BatchTranscriber.find_sound_files(self.library)
+        # TEST
+        assert len(batch_transcriber.transcribe(file_names)) == 2
+        assert all(batch_transcriber.is_transcribed(file_name) for file_name in file_names)
+        for (file_name, note) in zip(file_names, ["C4", "A4"]):
+            with open(os.path.join(self.output, BatchTranscriber.get_transcription_name(file_name)),
+                      encoding='utf-8') as file:
+                transcription = json.load(file)
+            assert transcription["file"] == os.path.abspath(file_name)
+            assert note in [note for (note, seconds) in transcription["song"]]
+        assert batch_transcriber.transcribe(file_names) == {}
+
+    def test_missing_file(self):
+        # SETUP
+        file_name = os.path.join(self.library, "a.wav")
+        write_wav(file_name, tone(440, 1, 48000), 48000)
+        missing_file = os.path.join(self.library, "missing.wav")
+        batch_transcriber = BatchTranscriber(self.output, "yin", nb_workers=2)
+        # TEST
+        transcriptions = batch_transcriber.transcribe([file_name, missing_file])
+        assert list(transcriptions) == [file_name]
+        assert list(batch_transcriber.errors) == [missing_file]
+        with open(os.path.join(self.output, BatchTranscriber.MANIFEST), encoding='utf-8') as file:
+            assert json.load(file)[os.path.abspath(missing_file)]["mtime"] is None
+        assert not batch_transcriber.is_transcribed(missing_file)
@@ -0,0 +1,123 @@
+import time
+from unittest import TestCase
+
+import numpy as np
+
+from audio.capture_hub import CaptureHub
+from audio.mic_analyzer import MicAnalyzer, MicListener
+from audio.pitch_detectors import DEFAULT_PITCH_DETECTOR
+
+SAMPLE_FREQ = 48000
+
+
+class NoteCollector(MicListener):
+    def __init__(self):
+        super().__init__()
+        self.notes = []
+
+    def set_current_note(self, new_note: str, heard_freq: float = 0.0, closest_pitch: float = 0.0):
+        self.notes.append(new_note)
+
+
+class SoundCardFreeCaptureHub(CaptureHub):
+    """
+    the blocks are pushed by the test through callback() instead of an input stream
+    """
+    def __init__(self):
+        super().__init__()
+        self.opened_streams = 0
+
+    def _open_stream(self):
+        self.opened_streams += 1
+        return "stream"
+
+    def _close_stream(self, stream):
+        self.opened_streams -= 1
+
+
+def feed_tone(hub: CaptureHub, freq: float, nb_blocks: int, nb_harmonics: int = 2):
+    t = np.arange(nb_blocks * CaptureHub.BLOCK_SIZE) / SAMPLE_FREQ
+    samples = sum(0.2 / k * np.sin(2 * np.pi * freq * k * t) for k in range(1, nb_harmonics + 1)).astype(np.float32)
+    for block in samples.reshape(nb_blocks, CaptureHub.BLOCK_SIZE, 1):
+        hub.callback(block, CaptureHub.BLOCK_SIZE, None, None)
+        for analyzer in hub.active_analyzers:
+            while not analyzer.blocks.empty():
+                time.sleep(0.001)
+
+
+def wait_for_notes(collector: NoteCollector, nb_notes: int, timeout: float = 5) -> [str]:
+    """
+    the last block may still be analyzed once the queue is empty
+    """
+    deadline = time.monotonic() + timeout
+    while len(collector.notes) < nb_notes and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.1)  # any extra note
+    return collector.notes
+
+
+def subscribed_analyzer(hub: CaptureHub, pitch_detector: str) -> (MicAnalyzer, NoteCollector):
+    mic_analyzer = MicAnalyzer(pitch_detector)
+    collector = NoteCollector()
+    mic_analyzer.add_listener(collector)
+    hub.subscribe(mic_analyzer)
+    return mic_analyzer, collector
+
+
+class TestCaptureHub(TestCase):
+    def test_shared_analysis(self):
+        # SETUP
+        hub = SoundCardFreeCaptureHub()
+        analyzer_1, collector_1 = subscribed_analyzer(hub, "yin")
+        analyzer_2, collector_2 = subscribed_analyzer(hub, "yin")
+        # TEST
+        feed_tone(hub, 440, 8)
+        assert hub.opened_streams == 1
+        assert len(hub.analyzers) == 1
+        assert "A4" in collector_1.notes
+        hub.unsubscribe(analyzer_1)
+        hub.unsubscribe(analyzer_2)
+        assert collector_2.notes[:len(collector_1.notes)] == collector_1.notes
+        assert hub.opened_streams == 0
+        assert not hub.analyzers
+
+    def test_relaying_analyzers_analyze_nothing(self):
+        # SETUP
+        hub = SoundCardFreeCaptureHub()
+        mic_analyzer, collector = subscribed_analyzer(hub, "yin")
+        # TEST
+        feed_tone(hub, 440, 8)
+        assert "A4" in collector.notes
+        assert mic_analyzer.pitch_detector is None and mic_analyzer.window_samples is None
+        assert mic_analyzer.blocks is None
+        assert hub.analyzers["yin"].analysis_thread.daemon
+        hub.unsubscribe(mic_analyzer)
+
+    def test_one_analysis_per_pitch_detector(self):
+        # SETUP
+        hub = SoundCardFreeCaptureHub()
+        analyzer_1, collector_1 = subscribed_analyzer(hub, "yin")
+        analyzer_2, collector_2 = subscribed_analyzer(hub, "autocorrelation")
+        # TEST
+        feed_tone(hub, 220, 8)
+        assert hub.opened_streams == 1
+        assert set(hub.get_statistics()) == {"yin", "autocorrelation"}
+        hub.unsubscribe(analyzer_1)
+        assert hub.opened_streams == 1
+        assert not hub.is_subscribed(analyzer_1)
+        hub.unsubscribe(analyzer_2)
+        assert hub.opened_streams == 0
+        assert "A3" in collector_1.notes and "A3" in collector_2.notes
+
+    def test_default_pitch_detector(self):
+        # SETUP
+        hub = SoundCardFreeCaptureHub()
+        mic_analyzer, collector = subscribed_analyzer(hub, DEFAULT_PITCH_DETECTOR)
+        window_step = hub.analyzers[DEFAULT_PITCH_DETECTOR].get_pitch_detector().window_step
+        nb_blocks = -(-window_step // CaptureHub.BLOCK_SIZE)  # a detection every 12288 samples for hps
+        # TEST - the harmonic product spectrum needs the harmonics of a plucked string
+        feed_tone(hub, 440, 3 * nb_blocks - 1, nb_harmonics=8)
+        assert len(wait_for_notes(collector, 2)) == 2
+        feed_tone(hub, 440, 1, nb_harmonics=8)
+        assert wait_for_notes(collector, 3)[1:] == ["A4", "A4"]
+        hub.unsubscribe(mic_analyzer)
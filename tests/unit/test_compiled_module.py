@@ -0,0 +1,90 @@
+from unittest import TestCase
+
+import numpy as np
+from pyharmonytools.harmony.note import Note
+
+from learning.compiled_module import CompiledModule
+
+
+class TestCompiledModule(TestCase):
+    def setUp(self):
+        self.training_module = CompiledModule.compile({"name": "F scale", "description": "",
+                                                       "play_notes": "F3-G3-A3-Bb3-C4-D4-E4-F4-", "next possible": ""})
+
+    def test_compile(self):
+        # TEST
+        assert len(self.training_module) == 8
+        assert self.training_module.notes[3] == "Bb3"
+        assert self.training_module.midi_notes.tolist() == [53, 55, 57, 58, 60, 62, 64, 65]
+        assert self.training_module.get_sharp_based_notes()[3] == "A#3"
+        assert (self.training_module.lowest_note_id, self.training_module.highest_note_id) == (53, 65)
+        assert np.array_equal(self.training_module.durations, np.ones(8))
+        assert self.training_module.module_content["name"] == "F scale"
+        with self.assertRaises(ValueError):
+            CompiledModule.compile({"play_notes": "C3-E3-G"})
+        with self.assertRaises(ValueError):
+            CompiledModule.compile({"play_notes": ""})
+
+    def test_note_ids(self):
+        for name in Note.CHROMATIC_SCALE_SHARP_BASED + Note.CHROMATIC_SCALE_FLAT_BASED:
+            for octave in range(0, 10):
+                note = f"{name}{octave}"
+                expected_note = Note(note)
+                assert CompiledModule.get_note_id(note) == CompiledModule.get_note_id(str(expected_note))
+                assert CompiledModule.get_note_name(CompiledModule.get_note_id(note)) == \
+                       f"{expected_note.get_sharp_based_note()}{octave}"
+        assert CompiledModule.get_note_id("A4") == 69
+
+    def test_transpose(self):
+        # SETUP
+        expected_notes = []
+        for note in self.training_module.notes:
+            expected_notes.append(Note(note).transpose(-5))
+        # TEST
+        transposed_module = self.training_module.transpose(-5)
+        assert transposed_module.notes == expected_notes
+        assert transposed_module.module_content["play_notes"] == "-".join(expected_notes)
+        assert self.training_module.module_content["play_notes"] == "F3-G3-A3-Bb3-C4-D4-E4-F4-"
+        assert transposed_module.lowest_note_id == 48
+        assert self.training_module.transpose(0) is self.training_module
+        with self.assertRaises(ValueError):
+            self.training_module.transpose(-42)
+        with self.assertRaises(ValueError):
+            self.training_module.transpose(55)
+
+    def test_range(self):
+        # TEST - the lowest & highest notes of the module are F3 & F4
+        assert self.training_module.get_feasible_transpositions(Note("E2"), Note("E4")).tolist() == \
+               list(range(-13, 0))
+        assert self.training_module.get_feasible_transpositions(Note("F3"), Note("F4")).tolist() == [0]
+        assert len(self.training_module.get_feasible_transpositions(Note("F3"), Note("E4"))) == 0
+        assert self.training_module.get_transposition_range(Note("F3"), Note("E4")) == (0, -1)
+        # the octave band of Note.transpose()
+        assert self.training_module.get_feasible_transpositions(Note("C0"), Note("B9")).tolist() == \
+               list(range(-41, 55))
+
+    def test_feasible_transpositions(self):
+        # SETUP - feasible transpositions checked note by note
+        lowest_note, highest_note = Note("A1"), Note("G5")
+        expected_transpositions = []
+        for half_tones in range(-60, 60):
+            try:
+                notes = [Note(Note(note).transpose(half_tones)) for note in self.training_module.notes]
+            except ValueError:
+                continue
+            if all(lowest_note <= note <= highest_note for note in notes):
+                expected_transpositions.append(half_tones)
+        # TEST
+        feasible_transpositions = self.training_module.get_feasible_transpositions(lowest_note, highest_note)
+        assert feasible_transpositions.tolist() == expected_transpositions
+        assert self.training_module.get_feasible_transpositions(lowest_note, highest_note) is feasible_transpositions
+        for half_tones in feasible_transpositions.tolist():
+            assert self.training_module.transpose(half_tones) is self.training_module.transpose(half_tones)
+
+    def test_note_spellings(self):
+        # TEST
+        assert CompiledModule.get_note_id("A#3") == CompiledModule.get_note_id("Bb3") == \
+               self.training_module.midi_notes[3]
+        assert CompiledModule.get_note_id("A#4") != self.training_module.midi_notes[3]
+        with self.assertRaises(ValueError):
+            CompiledModule.get_note_id("-")
@@ -0,0 +1,95 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from learning.compiled_module import CompiledModule
+from learning.exercise_matcher import ExerciseMatcher, StepResult
+
+
+class TestExerciseMatcher(TestCase):
+    def setUp(self):
+        # C3 E3 G3 C4 with a half note for G3
+        self.training_module = CompiledModule(["C3", "E3", "G3", "C4"], [1, 1, 2, 1])
+
+    def test_without_tempo(self):
+        # SETUP
+        exercise_matcher = ExerciseMatcher(self.training_module)
+        # TEST
+        assert exercise_matcher.add_note(0.0, "-") == []
+        assert exercise_matcher.add_note(0.1, "E3", 164.81, 164.81) == []
+        results = exercise_matcher.add_note(5.0, "C3", 130.81, 130.81)
+        assert [(r.step, r.status, r.timing_error) for r in results] == [(0, StepResult.HIT, None)]
+        assert exercise_matcher.add_note(6.0, "E3", 164.81, 164.81)[0].is_hit()
+        assert exercise_matcher.add_note(9.0, "G3", 196.0, 196.0)[0].is_hit()
+        assert not exercise_matcher.is_finished()
+        assert exercise_matcher.add_note(9.5, "C4", 261.63, 261.63)[0].is_hit()
+        assert exercise_matcher.is_finished() and exercise_matcher.get_score() == 100
+        # no IndexError after the last step
+        assert exercise_matcher.add_note(10.0, "C4", 261.63, 261.63) == []
+
+    def test_cents_tolerance(self):
+        # SETUP
+        exercise_matcher = ExerciseMatcher(self.training_module, cents_tolerance=20)
+        # TEST - 130.81Hz * 2**(30/1200) is 30 cents too high
+        assert exercise_matcher.add_note(0.0, "C3", 130.81 * 2 ** (30 / 1200), 130.81) == []
+        result = exercise_matcher.add_note(0.1, "C3", 130.81 * 2 ** (-10 / 1200), 130.81)[0]
+        assert result.is_hit() and round(result.cents) == -10
+
+    def test_with_tempo(self):
+        # SETUP - 120 bpm: the notes are expected at 0, 0.5, 1 & 2s from the first one
+        exercise_matcher = ExerciseMatcher(self.training_module, tempo=120, onset_tolerance=0.1)
+        # TEST
+        result = exercise_matcher.add_event(10.0, 48)[0]
+        assert result.is_hit() and result.timing_error == 0
+        assert exercise_matcher.add_event(10.3, 52) == []  # too early
+        result = exercise_matcher.add_event(10.45, 52)[0]
+        assert result.is_hit() and abs(result.timing_error + 0.05) < 1e-9
+        # G3 never sung: missed once its window is over
+        results = exercise_matcher.add_event(11.5, -1)
+        assert [(r.step, r.status, r.time) for r in results] == [(2, StepResult.MISSED, 11.1)]
+        assert exercise_matcher.add_event(12.05, 60)[0].is_hit()
+        assert exercise_matcher.is_finished() and exercise_matcher.get_score() == 75
+
+    def test_missed_steps(self):
+        # SETUP
+        exercise_matcher = ExerciseMatcher(self.training_module, tempo=120, onset_tolerance=0.1)
+        exercise_matcher.add_event(0.0, 48)
+        # TEST - all the windows are over at once
+        results = exercise_matcher.add_event(5.0, 60)
+        assert [r.status for r in results] == [StepResult.MISSED] * 3
+        assert exercise_matcher.is_finished()
+
+    def test_hold(self):
+        # SETUP - the notes must be held half of their duration
+        exercise_matcher = ExerciseMatcher(self.training_module, tempo=60, min_hold=0.5)
+        # TEST
+        assert exercise_matcher.add_event(0.0, 48) == []
+        assert exercise_matcher.add_event(0.3, 48) == []
+        result = exercise_matcher.add_event(0.5, 48)[0]
+        assert result.is_hit() and result.timing_error == 0
+        assert exercise_matcher.add_event(1.0, 52) == []
+        assert exercise_matcher.add_event(1.2, -1) == []  # interrupted
+        assert exercise_matcher.add_event(1.25, 52) == []
+        assert exercise_matcher.add_event(1.75, 52)[0].is_hit()
+
+    def test_replay(self):
+        # SETUP
+        exercise_matcher = ExerciseMatcher(self.training_module, tempo=120, onset_tolerance=0.1)
+        for (time, note) in [(1.0, "C3"), (1.2, "-"), (1.5, "E3"), (2.5, "G#3"), (3.0, "C4")]:
+            exercise_matcher.add_note(time, note)
+        session_results = [result.to_dict() for result in exercise_matcher.results]
+        # TEST
+        with tempfile.TemporaryDirectory() as folder:
+            file_name = os.path.join(folder, "session.json")
+            exercise_matcher.save_events(file_name)
+            training_module, events = ExerciseMatcher.load_events(file_name)
+        replay_matcher = ExerciseMatcher(training_module, tempo=120, onset_tolerance=0.1)
+        assert [result.to_dict() for result in replay_matcher.replay(events)] == session_results
+        assert [result.status for result in replay_matcher.replay(events, end_time=4.0)] == \
+               [StepResult.HIT, StepResult.HIT, StepResult.MISSED, StepResult.HIT]
+
+    def test_bad_settings(self):
+        with self.assertRaises(ValueError):
+            ExerciseMatcher(self.training_module, tempo=0)
+        with self.assertRaises(ValueError):
+            ExerciseMatcher(self.training_module, min_hold=2)
@@ -0,0 +1,30 @@
+from unittest import TestCase
+
+from instrument.fretboard_items import FretboardItems
+
+
+class TestFretboardItems(TestCase):
+    def setUp(self):
+        # 2 items (oval & text) per fingering, like GuitarTraining._initialize_fingers()
+        self.fretboard_items = FretboardItems()
+        item_id = 1
+        for note in ["E2", "A2", "D3", "G3", "B3", "E4", "A3", "E3"]:
+            for _ in range(2):
+                self.fretboard_items.add(item_id, (note[:-1], note))
+                item_id += 1
+
+    def test_index(self):
+        assert self.fretboard_items.get_items("A") == [3, 4, 13, 14]
+        assert self.fretboard_items.get_items("A3") == [13, 14]
+        assert self.fretboard_items.get_items("C#") == []
+
+    def test_diff(self):
+        # TEST
+        assert self.fretboard_items.set_visible(["E2"], True) == []
+        assert self.fretboard_items.set_all_visible(False) == list(range(1, 17))
+        assert self.fretboard_items.set_all_visible(False) == []
+        assert self.fretboard_items.set_visible(["E"], True) == [1, 2, 11, 12, 15, 16]
+        assert self.fretboard_items.set_visible(["E4"], True) == []
+        assert self.fretboard_items.set_visible(["E4", "A3"], False) == [11, 12]
+        assert self.fretboard_items.set_all_visible(True) == [3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14]
+        assert self.fretboard_items.is_visible(1) and self.fretboard_items.is_visible(16)
@@ -0,0 +1,118 @@
+import threading
+from unittest import TestCase
+
+import numpy as np
+
+from audio.mic_analyzer import MicAnalyzer, MicListener
+
+SAMPLE_FREQ = 48000
+
+
+class NoteCollector(MicListener):
+    def __init__(self):
+        super().__init__()
+        self.notes = []
+        self.threads = set()
+
+    def set_current_note(self, new_note: str, heard_freq: float = 0.0, closest_pitch: float = 0.0):
+        self.notes.append(new_note)
+        self.threads.add(threading.current_thread().name)
+
+
+def tone_blocks(freq: float, nb_blocks: int, block_size: int) -> [np.ndarray]:
+    t = np.arange(nb_blocks * block_size) / SAMPLE_FREQ
+    samples = (0.2 * np.sin(2 * np.pi * freq * t) + 0.1 * np.sin(4 * np.pi * freq * t)).astype(np.float32)
+    return [samples[i * block_size:(i + 1) * block_size].reshape(block_size, 1) for i in range(nb_blocks)]
+
+
+class TestMicAnalyzer(TestCase):
+    def test_callback_only_queues_blocks(self):
+        # SETUP
+        mic_analyzer = MicAnalyzer("yin")
+        collector = NoteCollector()
+        mic_analyzer.add_listener(collector)
+        # TEST
+        for block in tone_blocks(440, MicAnalyzer.QUEUE_SIZE + 5, 512):
+            mic_analyzer.callback(block, 512, None, None)
+        assert collector.notes == []
+        assert mic_analyzer.overruns == 5
+        assert mic_analyzer.blocks.qsize() == MicAnalyzer.QUEUE_SIZE
+
+    def test_analysis_thread(self):
+        # SETUP
+        mic_analyzer = MicAnalyzer("yin")
+        collector = NoteCollector()
+        mic_analyzer.add_listener(collector)
+        mic_analyzer.start_analysis()
+        # TEST
+        for block in tone_blocks(440, 8, 512):
+            mic_analyzer.callback(block, 512, None, None)
+        mic_analyzer.callback(np.zeros((512, 1), dtype=np.float32), 512, None, "input overflow")
+        while not mic_analyzer.blocks.empty():
+            pass
+        mic_analyzer.stop_analysis()
+        assert not mic_analyzer.analysis_thread.is_alive()
+        assert "A4" in collector.notes
+        assert collector.threads == {"_analyze"}
+        assert mic_analyzer.input_overflows == 1
+
+    def test_coalesce(self):
+        # SETUP
+        mic_analyzer = MicAnalyzer("yin", overflow_policy=MicAnalyzer.COALESCE)
+        collector = NoteCollector()
+        mic_analyzer.add_listener(collector)
+        for block in tone_blocks(440, 8, 512):
+            mic_analyzer.callback(block, 512, None, None)
+        mic_analyzer.blocks.put(None)
+        # TEST
+        mic_analyzer._analyze()
+        assert mic_analyzer.coalesced_blocks == 7
+        assert len(collector.notes) == 1
+
+    def test_no_note_after_stop(self):
+        # SETUP
+        mic_analyzer = MicAnalyzer("yin")
+        collector = NoteCollector()
+        mic_analyzer.add_listener(collector)
+        mic_analyzer.start_analysis()
+        for block in tone_blocks(440, 8, 512):
+            mic_analyzer.callback(block, 512, None, None)
+        # TEST
+        mic_analyzer.stop_analysis()
+        nb_notes = len(collector.notes)
+        for block in tone_blocks(440, 4, 512):
+            mic_analyzer.callback(block, 512, None, None)
+        assert len(collector.notes) == nb_notes
+
+    def test_silence_cadence(self):
+        # SETUP
+        mic_analyzer = MicAnalyzer("yin")
+        collector = NoteCollector()
+        mic_analyzer.add_listener(collector)
+        nb_blocks = 4 * mic_analyzer.get_pitch_detector().window_step // 512
+        # TEST
+        for _ in range(nb_blocks):
+            mic_analyzer.analyze_block(np.zeros(512, dtype=np.float32))
+        assert collector.notes == ["-"] * 4
+
+    def test_default_pitch_detector(self):
+        # SETUP
+        mic_analyzer = MicAnalyzer()
+        collector = NoteCollector()
+        mic_analyzer.add_listener(collector)
+        t = np.arange(72 * 512) / SAMPLE_FREQ
+        samples = sum(0.2 / k * np.sin(2 * np.pi * 440 * k * t) for k in range(1, 9)).astype(np.float32)
+        # TEST - a detection every 24 blocks, ie 12288 samples, as 12000 samples are not a multiple of 512
+        assert mic_analyzer.get_pitch_detector().window_step == 12000
+        detection_blocks = []
+        for (i, block) in enumerate(samples.reshape(72, 512)):
+            nb_notes = len(collector.notes)
+            mic_analyzer.analyze_block(block)
+            if len(collector.notes) > nb_notes:
+                detection_blocks.append(i)
+        assert detection_blocks == [23, 47, 71]
+        assert collector.notes == ["-", "A4", "A4"]
+
+    def test_unknown_overflow_policy(self):
+        with self.assertRaises(ValueError):
+            MicAnalyzer(overflow_policy="unknown")
@@ -0,0 +1,86 @@
+from unittest import TestCase
+
+import numpy as np
+
+from audio.mixing_engine import MixingEngine
+from audio.wavetable import ADSREnvelope
+
+
+class TestMixingEngine(TestCase):
+    def test_sample_accurate_onsets(self):
+        for block_size in [64, 256, 1000]:
+            # SETUP
+            engine = MixingEngine(44100, block_size, envelope=ADSREnvelope(attack=0, decay=0, sustain=1, release=0))
+            # TEST
+            engine.schedule_sequence(["A3", "C4", "E4", "A4"], 0.01, 0.1, 0.25)
+            samples = engine.render(1.2)
+            assert len(samples) == -(-round(1.2 * 44100) // block_size) * block_size
+            end = 0
+            for i in range(4):
+                start = round((0.01 + i * 0.25) * 44100)
+                # a sine starts at 0: the 1st audible sample follows the note on
+                assert not samples[end:start + 1].any() and samples[start + 1] > 0
+                end = start + round(0.1 * 44100)
+                assert samples[end - 1] != 0 or samples[end - 2] != 0
+            assert not samples[end:].any()
+
+    def test_chord(self):
+        # SETUP
+        engine = MixingEngine(envelope=ADSREnvelope(attack=0, decay=0, sustain=1, release=0))
+        # TEST
+        engine.schedule_chord(["C3", "E3", "G3"], 0, 0.5)
+        chord = engine.render(0.25)
+        assert sum(not voice.is_free() for voice in engine.voices) == 3
+        chord = np.concatenate([chord, engine.render(0.35)])
+        notes = sum(self._render_note(note)[:len(chord)] for note in ["C3", "E3", "G3"])
+        assert np.abs(chord - notes).max() < 1e-5
+        assert all(voice.is_free() for voice in engine.voices)
+
+    @staticmethod
+    def _render_note(note: str) -> np.ndarray:
+        engine = MixingEngine(envelope=ADSREnvelope(attack=0, decay=0, sustain=1, release=0))
+        engine.schedule_chord([note], 0, 0.5)
+        return engine.render(1)
+
+    def test_voice_stealing(self):
+        # SETUP
+        engine = MixingEngine(nb_voices=2)
+        # TEST
+        engine.schedule_sequence(["C3", "E3", "G3"], 0, 1, 0.1)
+        engine.render(0.5)
+        assert engine.stolen_voices == 1
+        assert sorted(voice.note_id for voice in engine.voices) == [1, 2]
+
+    def test_late_events(self):
+        # SETUP
+        engine = MixingEngine()
+        engine.render(0.1)
+        # TEST
+        engine.schedule_note("A", 3, 0, 0.2)
+        engine.render_block()
+        assert engine.late_events == 1
+        assert not engine.voices[0].is_free()
+
+    def test_cancel_all(self):
+        # SETUP
+        engine = MixingEngine()
+        engine.schedule_sequence(["C3", "E3", "G3"], 0, 1, 1)
+        engine.render(0.5)
+        # TEST
+        engine.cancel_all()
+        samples = engine.render(1)
+        assert not samples[round(engine.envelope.release * 44100) + engine.block_size:].any()
+
+    def test_above_nyquist(self):
+        # SETUP
+        engine = MixingEngine()
+        # TEST
+        assert engine.get_loop("E", 9) is not None  # 21096Hz
+        assert engine.schedule_sequence(["F9", "A9"], 0, 0.1, 0.1) == [None, None]
+        assert not engine.render(0.3).any()
+
+    def test_bad_settings(self):
+        with self.assertRaises(ValueError):
+            MixingEngine(block_size=0)
+        with self.assertRaises(ValueError):
+            MixingEngine().schedule_note("A", 3, 0, 0)
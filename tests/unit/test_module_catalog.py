@@ -0,0 +1,170 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+from unittest import TestCase
+
+from learning.module_catalog import ModuleCatalog
+
+
+class LockCheckingCatalog(ModuleCatalog):
+    """
+    records whether another thread could read the catalog while each module was parsed
+    """
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.unlocked_reads = []
+
+    def _read(self, path: str) -> dict:
+        reader = threading.Thread(target=lambda: self.unlocked_reads.append(self.lock.acquire(timeout=1)
+                                                                           and self.lock.release() is None))
+        reader.start()
+        reader.join()
+        return super()._read(path)
+
+
+class RemovingCatalog(ModuleCatalog):
+    """
+    removes a folder as soon as the first module is parsed, ie during the walk
+    """
+    def __init__(self, modules_path: str, index_file: str, removed_folder: str):
+        super().__init__(modules_path, index_file)
+        self.removed_folder = removed_folder
+
+    def _read(self, path: str) -> dict:
+        if os.path.isdir(self.removed_folder):
+            shutil.rmtree(self.removed_folder)
+        return super()._read(path)
+
+
+class TestModuleCatalog(TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.modules_path = os.path.join(self.folder.name, "learning modules")
+        self.index_file = os.path.join(self.folder.name, "cache", "module_catalog.json")
+        os.makedirs(os.path.join(self.modules_path, "scales"))
+        os.makedirs(os.path.join(self.modules_path, "chords", "jazz"))
+        self.write_module("scales", "C scale", "C3-D3-E3-F3-G3-A3-B3")
+        self.write_module("scales", "G scale", "G3-A3-B3-C4-D4-E4-F#4")
+        self.write_module("chords", "C Chord", "C3-E3-G3")
+        with open(os.path.join(self.modules_path, "chords", "jazz", "broken.json"), "w") as file:
+            file.write("{")
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def write_module(self, folder: str, name: str, play_notes: str) -> str:
+        path = os.path.join(self.modules_path, folder, f"{name}.json")
+        with open(path, "w") as file:
+            json.dump({"name": name, "description": "", "play_notes": play_notes, "next possible": ""}, file)
+        return path
+
+    def test_scan(self):
+        # SETUP
+        module_catalog = ModuleCatalog(self.modules_path, self.index_file)
+        # TEST
+        assert module_catalog.scan() == 4
+        sub_folders, module_paths = module_catalog.list_folder()
+        assert [os.path.basename(folder) for folder in sub_folders] == ["chords", "scales"]
+        assert module_paths == []
+        assert [os.path.basename(path) for path in module_catalog.list_folder(sub_folders[1])[1]] == \
+               ["C scale.json", "G scale.json"]
+        path = module_catalog.list_folder(sub_folders[1])[1][1]
+        assert module_catalog.get_summary(path)["play_notes"] == "G3-A3-B3-C4-D4-E4-F#4"
+        assert module_catalog.get_module(path)["next possible"] == ""
+        broken_path = module_catalog.list_folder(module_catalog.list_folder(sub_folders[0])[0][0])[1][0]
+        assert "error" in module_catalog.get_summary(broken_path)
+        assert module_catalog.get_module(broken_path) is None
+
+    def test_incremental_scan(self):
+        # SETUP
+        module_catalog = ModuleCatalog(self.modules_path, self.index_file)
+        module_catalog.scan()
+        # TEST
+        assert module_catalog.scan() == 0
+        path = self.write_module("scales", "C scale", "C3-D3-E3-F3-G3-A3-B3-C4")
+        self.write_module("chords", "G Chord", "G3-B3-D4")
+        os.remove(os.path.join(self.modules_path, "scales", "G scale.json"))
+        assert module_catalog.scan() == 2
+        assert module_catalog.get_module(path)["play_notes"] == "C3-D3-E3-F3-G3-A3-B3-C4"
+        assert len(module_catalog.entries) == 4
+        # the index saved by the previous run
+        restarted_catalog = ModuleCatalog(self.modules_path, self.index_file)
+        assert restarted_catalog.scan() == 0
+        assert restarted_catalog.entries == module_catalog.entries
+        assert restarted_catalog.get_module(path)["play_notes"] == "C3-D3-E3-F3-G3-A3-B3-C4"
+
+    def test_outdated_index(self):
+        # SETUP
+        ModuleCatalog(self.modules_path, self.index_file).scan()
+        with open(self.index_file, "w") as file:
+            file.write("[")
+        # TEST
+        assert ModuleCatalog(self.modules_path, self.index_file).scan() == 4
+        assert ModuleCatalog(os.path.join(self.modules_path, "scales"), self.index_file).scan() == 2
+        assert ModuleCatalog(self.modules_path, None).scan() == 4
+
+    def test_learning_modules(self):
+        module_catalog = ModuleCatalog(ModuleCatalog.MODULES_PATH, None)
+        module_catalog.scan()
+        assert module_catalog.entries
+        assert all("error" not in entry for entry in module_catalog.entries.values())
+
+    def test_update(self):
+        # SETUP
+        module_catalog = ModuleCatalog(self.modules_path, self.index_file)
+        module_catalog.scan()
+        scales_path = os.path.join(self.modules_path, "scales")
+        # TEST
+        path = self.write_module("scales", "D scale", "D3-E3-F#3-G3-A3-B3-C#4")
+        changes = module_catalog.update([path, os.path.join(scales_path, "C scale.json")])
+        assert changes == {"added": [path], "modified": [], "removed": []}
+        assert module_catalog.get_position(path) == 1
+        os.remove(path)
+        assert module_catalog.update([path])["removed"] == [path]
+        # a folder is rescanned
+        os.makedirs(os.path.join(self.modules_path, "songs"))
+        path = self.write_module("songs", "recorded", "C3")
+        changes = module_catalog.update([path])
+        assert changes["added"] == [os.path.dirname(path), path]
+        assert module_catalog.is_folder(os.path.dirname(path)) and module_catalog.get_position(path) == 0
+        assert module_catalog.get_position(scales_path) == 1
+
+    def test_compiled_modules(self):
+        # SETUP
+        module_catalog = ModuleCatalog(self.modules_path, None)
+        module_catalog.scan()
+        path = os.path.join(self.modules_path, "chords", "C Chord.json")
+        # TEST
+        compiled_module = module_catalog.get_compiled_module(path)
+        assert compiled_module.midi_notes.tolist() == [48, 52, 55]
+        assert module_catalog.get_compiled_module(path) is compiled_module
+        self.write_module("chords", "C Chord", "C3-E3-G3-C4")
+        module_catalog.update([path])
+        assert module_catalog.get_compiled_module(path).midi_notes.tolist() == [48, 52, 55, 60]
+        assert module_catalog.get_compiled_module(os.path.join(self.modules_path, "chords", "jazz",
+                                                               "broken.json")) is None
+
+    def test_scan_out_of_the_lock(self):
+        # SETUP
+        module_catalog = LockCheckingCatalog(self.modules_path, self.index_file)
+        # TEST
+        assert module_catalog.scan() == 4
+        assert module_catalog.unlocked_reads == [True] * 4
+        self.write_module("scales", "D scale", "D3-E3-F#3-G3-A3-B3-C#4")
+        changes = module_catalog.update([os.path.join(self.modules_path, "scales")])
+        assert [os.path.basename(path) for path in changes["added"]] == ["D scale.json"]
+        assert module_catalog.unlocked_reads == [True] * 5
+        path = self.write_module("scales", "E scale", "E3-F#3-G#3-A3-B3-C#4-D#4")
+        changes = module_catalog.update([path])
+        assert changes["added"] == [path]
+        assert module_catalog.unlocked_reads == [True] * 6
+
+    def test_folder_removed_during_scan(self):
+        # SETUP
+        jazz_folder = os.path.join(self.modules_path, "chords", "jazz")
+        module_catalog = RemovingCatalog(self.modules_path, self.index_file, jazz_folder)
+        # TEST - the jazz folder vanishes while the chords folder is walked
+        assert module_catalog.scan() == 3
+        assert module_catalog.list_folder(os.path.join(self.modules_path, "chords"))[0] == []
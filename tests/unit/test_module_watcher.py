@@ -0,0 +1,134 @@
+import json
+import os
+import tempfile
+import threading
+from unittest import TestCase
+
+from learning.module_catalog import ModuleCatalog
+from learning.module_watcher import ModuleListener, ModuleWatcher
+from ui_event_bridge import UIEventBridge
+
+
+class RecordingModuleListener(ModuleListener):
+    def __init__(self):
+        self.notifications = []
+        self.notified = threading.Event()
+
+    def modules_changed(self, added: [str], modified: [str], removed: [str]):
+        self.notifications.append((added, modified, removed))
+        self.notified.set()
+
+
+class EventSource:
+    """
+    stands for the watchdog observer: the events are sent by the test with add_changed_paths()
+    """
+
+    def stop(self):
+        pass
+
+    def join(self):
+        pass
+
+
+class EventDrivenModuleWatcher(ModuleWatcher):
+    def _create_observer(self):
+        return EventSource()
+
+
+class FailingModuleCatalog(ModuleCatalog):
+    """
+    fails on the first update, eg a folder removed during the scan
+    """
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.nb_failures = 0
+
+    def update(self, paths: [str]) -> dict:
+        if not self.nb_failures:
+            self.nb_failures += 1
+            raise FileNotFoundError(paths[0])
+        return super().update(paths)
+
+
+class TestModuleWatcher(TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.modules_path = os.path.join(self.folder.name, "learning modules")
+        os.makedirs(os.path.join(self.modules_path, "scales"))
+        self.write_module("scales", "C scale")
+        self.module_catalog = ModuleCatalog(self.modules_path, None)
+        self.module_catalog.scan()
+        self.listener = RecordingModuleListener()
+        self.module_watcher = None
+
+    def tearDown(self):
+        if self.module_watcher:
+            self.module_watcher.stop()
+        self.folder.cleanup()
+
+    def write_module(self, folder: str, name: str) -> str:
+        os.makedirs(os.path.join(self.modules_path, folder), exist_ok=True)
+        path = os.path.join(self.modules_path, folder, f"{name}.json")
+        with open(path, "w") as file:
+            json.dump({"name": name, "description": "", "play_notes": "C3-E3-G3", "next possible": ""}, file)
+        return path
+
+    def test_polling(self):
+        # SETUP
+        self.module_watcher = ModuleWatcher(self.module_catalog, self.listener, UIEventBridge(), use_watchdog=False)
+        self.module_watcher.POLL_PERIOD = 0.05
+        # TEST
+        assert not self.module_watcher.start()
+        path = self.write_module("songs", "recorded")
+        assert self.listener.notified.wait(5)
+        added, modified, removed = self.listener.notifications[0]
+        assert added == [os.path.dirname(path), path] and modified == [] and removed == []
+        assert self.module_catalog.get_module(path)["name"] == "recorded"
+
+    def test_debounced_events(self):
+        # SETUP
+        self.module_watcher = EventDrivenModuleWatcher(self.module_catalog, self.listener, UIEventBridge())
+        self.module_watcher.DEBOUNCE_DELAY = 0.1
+        assert self.module_watcher.start()
+        # TEST - a bulk import, each file being notified twice (created & modified)
+        paths = [self.write_module("scales", f"scale {i}") for i in range(50)]
+        for path in paths:
+            self.module_watcher.add_changed_paths([path])
+            self.module_watcher.add_changed_paths([path])
+        assert self.listener.notified.wait(5)
+        self.listener.notified.clear()
+        os.remove(paths[0])
+        self.module_watcher.add_changed_paths([paths[0]])
+        assert self.listener.notified.wait(5)
+        assert self.module_watcher.nb_updates == len(self.listener.notifications) == 2
+        assert self.listener.notifications[0] == (sorted(paths), [], [])
+        assert self.listener.notifications[1] == ([], [], [paths[0]])
+        assert self.module_catalog.get_position(paths[1]) == 1
+        assert self.module_catalog.list_folder(os.path.dirname(paths[0]))[1][0].endswith("C scale.json")
+
+    def test_failed_update(self):
+        # SETUP
+        module_catalog = FailingModuleCatalog(self.modules_path, None)
+        module_catalog.scan()
+        self.module_watcher = EventDrivenModuleWatcher(module_catalog, self.listener, UIEventBridge())
+        self.module_watcher.DEBOUNCE_DELAY = 0.05
+        assert self.module_watcher.start()
+        # TEST
+        with self.assertLogs("learning.module_watcher", "ERROR"):
+            self.module_watcher.add_changed_paths([self.write_module("scales", "D scale")])
+            assert not self.listener.notified.wait(0.5)
+        assert module_catalog.nb_failures == 1 and self.module_watcher.watch_thread.is_alive()
+        path = self.write_module("scales", "E scale")
+        self.module_watcher.add_changed_paths([path])
+        assert self.listener.notified.wait(5)
+        assert path in self.listener.notifications[0][0]
+
+    def test_stop(self):
+        # SETUP
+        self.module_watcher = EventDrivenModuleWatcher(self.module_catalog, self.listener, UIEventBridge())
+        self.module_watcher.start()
+        # TEST
+        self.module_watcher.stop()
+        assert not self.module_watcher.watch_thread.is_alive()
+        self.module_watcher = None
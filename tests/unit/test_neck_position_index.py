@@ -0,0 +1,55 @@
+from unittest import TestCase
+
+from pyharmonytools.guitar.guitar_neck.neck import Neck
+from pyharmonytools.harmony.note import Note
+
+from instrument.neck_position_index import NeckPositionIndex
+
+
+class TestNeckPositionIndex(TestCase):
+    def test_standard_tuning(self):
+        # SETUP
+        neck_index = NeckPositionIndex.get_instance()
+        neck = Neck()
+        # TEST
+        assert neck_index.string_names == Neck.TUNING
+        for (string, string_name) in enumerate(Neck.TUNING):
+            for fret in range(0, Neck.FRET_QUANTITY_CLASSIC + 1):
+                note = neck_index.find_note_from_position(string, fret)
+                assert note[:-1] == Note(Neck.find_note_from_position(string_name, fret)).get_sharp_based_note()
+        # pyharmonytools has the octaves of a few frets wrong, eg C5 on the 8th fret of the high e string
+        assert neck_index.find_note_from_position(5, 8) == "C5" and neck.octave["e"][8] == 4
+        assert neck_index.find_note_from_position(0, 8) == "C3" and neck.octave["E"][8] == 3
+        assert str(neck_index.get_lowest_note()) == str(Note("E2"))
+        assert str(neck_index.get_highest_note()) == str(Note("A#5"))
+
+    def test_positions(self):
+        # SETUP
+        neck_index = NeckPositionIndex.get_instance()
+        # TEST
+        assert neck_index.find_positions_from_note("A#", 3) == [(0, 18), (1, 13), (2, 8), (3, 3)]
+        assert neck_index.find_positions_from_note("Bb", 3) == neck_index.find_positions_from_note("A#", 3)
+        assert neck_index.find_positions_from_note("C", 9) == []
+        for (string, fret) in neck_index.find_positions_from_note("E"):
+            assert neck_index.find_note_from_position(string, fret)[:-1] == "E"
+        nb_positions = sum(len(neck_index.find_positions_from_note(note))
+                           for note in Note.CHROMATIC_SCALE_SHARP_BASED)
+        assert nb_positions == 6 * (Neck.FRET_QUANTITY_CLASSIC + 1)
+
+    def test_shared_instances(self):
+        assert NeckPositionIndex.get_instance() is NeckPositionIndex.get_instance(NeckPositionIndex.STANDARD_TUNING)
+        assert NeckPositionIndex.get_instance(nb_frets=24) is not NeckPositionIndex.get_instance()
+
+    def test_alternate_tunings(self):
+        # SETUP
+        drop_d = NeckPositionIndex.get_instance(NeckPositionIndex.TUNINGS["Drop D"])
+        dadgad = NeckPositionIndex.get_instance(NeckPositionIndex.TUNINGS["DADGAD"])
+        # TEST
+        assert drop_d.find_note_from_position(0, 0) == "D2" and drop_d.find_note_from_position(0, 2) == "E2"
+        assert drop_d.string_names == ["D", "A", "d", "G", "B", "E"]
+        assert dadgad.find_positions_from_note("D", 2) == [(0, 0)]
+        assert NeckPositionIndex(["Eb2", "Ab2"], 2).notes == [["D#2", "E2", "F2"], ["G#2", "A2", "A#2"]]
+
+    def test_bad_settings(self):
+        with self.assertRaises(ValueError):
+            NeckPositionIndex([])
@@ -0,0 +1,62 @@
+import time
+from unittest import TestCase
+
+from pyharmonytools.harmony.note import Note
+
+from instrument.note_buttons import NoteButtons
+
+
+class TestNoteButtons(TestCase):
+    MUTE = "#AAAAAA"
+    DISABLED = "#222222"
+    HEARD = "#AA8888"
+
+    def setUp(self):
+        # 10 octaves of buttons, like VoiceTraining.get_ui_frame()
+        self.note_buttons = NoteButtons(self.MUTE, self.DISABLED)
+        for octave in range(0, 10):
+            for note in Note.CHROMATIC_SCALE_SHARP_BASED:
+                self.note_buttons.add(note, octave)
+
+    def test_ordinals(self):
+        assert self.note_buttons.ordinals["C0"] == 0
+        assert self.note_buttons.ordinals["A4"] == 57
+        assert NoteButtons.get_ordinal(Note("Bb3")) == self.note_buttons.ordinals["A#3"]
+
+    def test_range(self):
+        # TEST
+        assert self.note_buttons.set_range(Note("C0"), Note("B9")) == []
+        changed_notes = self.note_buttons.set_range(Note("E2"), Note("E4"))
+        assert len(changed_notes) == 120 - 25
+        assert "D#2" in changed_notes and "F4" in changed_notes and "E2" not in changed_notes
+        assert self.note_buttons.set_range(Note("G2"), Note("F4")) == ["E2", "F2", "F#2", "F4"]
+        assert self.note_buttons.get_color("F2") == self.DISABLED and self.note_buttons.get_color("F4") == self.MUTE
+
+    def test_aspects(self):
+        # TEST
+        assert self.note_buttons.set_aspect("A3", self.HEARD, "A3 (98.5%)")
+        assert not self.note_buttons.set_aspect("A3", self.HEARD, "A3 (98.5%)")
+        assert self.note_buttons.set_aspect("A3", self.HEARD)
+        assert self.note_buttons.get_text("A3") == "A3"
+        # the range change sets the color of all the buttons but keeps their text
+        self.note_buttons.set_aspect("C1", self.HEARD, "C1 (50%)")
+        assert self.note_buttons.set_range(Note("A3"), Note("A3")) == list(self.note_buttons.ordinals)
+        assert self.note_buttons.get_text("C1") == "C1 (50%)"
+        assert self.note_buttons.reset() == [note for note in self.note_buttons.ordinals if note != "A3"]
+        assert self.note_buttons.reset() == []
+
+    def test_calibration_timing(self):
+        # SETUP - the calibration widens the range by one note per sample heard, ie every MicAnalyzer block
+        self.note_buttons.set_range(Note("A3"), Note("A3"))
+        nb_configured = 0
+        start = time.perf_counter()
+        # TEST
+        for half_tones in range(1, 21):
+            lowest = Note(Note.CHROMATIC_SCALE_SHARP_BASED[(9 - half_tones) % 12] + str(3 + (9 - half_tones) // 12))
+            highest = Note(Note.CHROMATIC_SCALE_SHARP_BASED[(9 + half_tones) % 12] + str(3 + (9 + half_tones) // 12))
+            nb_configured += len(self.note_buttons.set_range(lowest, highest))
+        duration = time.perf_counter() - start
+        # only the 2 buttons entering the range are configured instead of the 120 ones
+        assert nb_configured == 2 * 20
+        # far below a 16ms UI frame per range change
+        assert duration / 20 < 0.002
@@ -0,0 +1,58 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+from pyharmonytools.harmony.note import Note
+
+from audio.note_cache import NoteCache
+
+
+class TestNoteCache(TestCase):
+    def test_save_load(self):
+        with tempfile.TemporaryDirectory() as folder:
+            # SETUP
+            note_cache = NoteCache(folder)
+            parameters = {"sample rate": 44100, "duration": 1}
+            signal = np.arange(100, dtype=np.int16)
+            # TEST
+            assert note_cache.load(parameters, "A", 3) is None
+            note_cache.save(parameters, "A", 3, signal)
+            cached_signal = note_cache.load(parameters, "A", 3)
+            assert np.array_equal(cached_signal, signal) and not cached_signal.flags.writeable
+            assert note_cache.load({"sample rate": 48000, "duration": 1}, "A", 3) is None
+            assert note_cache.load(parameters, "A#", 3) is None
+
+    def test_invalidation(self):
+        # SETUP
+        parameters = {"sample rate": 44100}
+        key = NoteCache("cache").get_key(parameters)
+        frequency = Note.notes["A"][3]
+        # TEST
+        assert NoteCache("cache").get_key({"sample rate": 44100}) == key
+        assert NoteCache("cache").get_key({"sample rate": 48000}) != key
+        try:
+            Note.notes["A"][3] = 442
+            assert NoteCache("cache").get_key(parameters) != key
+        finally:
+            Note.notes["A"][3] = frequency
+
+    def test_truncated_file(self):
+        with tempfile.TemporaryDirectory() as folder:
+            # SETUP
+            note_cache = NoteCache(folder)
+            note_cache.save({}, "A", 3, np.arange(100, dtype=np.int16))
+            with open(note_cache.get_file_name({}, "A", 3), "r+b") as file:
+                file.truncate(100)
+            # TEST
+            assert note_cache.load({}, "A", 3) is None
+
+    def test_prune(self):
+        with tempfile.TemporaryDirectory() as folder:
+            # SETUP
+            note_cache = NoteCache(folder)
+            # TEST
+            for sample_rate in range(NoteCache.MAX_SETTINGS + 2):
+                note_cache.save({"sample rate": sample_rate}, "A", 3, np.zeros(10, dtype=np.int16))
+            assert len(os.listdir(note_cache.folder)) == NoteCache.MAX_SETTINGS
+            assert note_cache.load({"sample rate": NoteCache.MAX_SETTINGS + 1}, "A", 3) is not None
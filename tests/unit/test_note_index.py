@@ -0,0 +1,62 @@
+from unittest import TestCase
+
+import numpy as np
+from pyharmonytools.harmony.note import Note
+
+from audio.mic_analyzer import MicAnalyzer
+from audio.note_index import NoteIndex
+
+
+def legacy_find_closest_note(pitch):
+    # MicAnalyzer.find_closest_note before the note index
+    i = int(np.round(np.log2(pitch / MicAnalyzer.CONCERT_PITCH) * 12))
+    closest_note = MicAnalyzer.ALL_NOTES[i % 12] + str(4 + (i + 9) // 12)
+    closest_pitch = MicAnalyzer.CONCERT_PITCH * 2 ** (i / 12)
+    return closest_note, closest_pitch
+
+
+class TestNoteIndex(TestCase):
+    def test_same_notes_as_legacy(self):
+        # SETUP
+        note_index = NoteIndex()
+        freqs = np.random.default_rng(0).uniform(20, 20000, 5000)
+        # TEST
+        note_ids, cents, closest_pitches = note_index.lookup(freqs)
+        names = note_index.get_names(note_ids)
+        for (f, name, pitch, cent) in zip(freqs, names, closest_pitches, cents):
+            expected_name, expected_pitch = legacy_find_closest_note(f)
+            assert name == expected_name
+            assert abs(pitch - expected_pitch) < 1e-9 * expected_pitch
+            assert abs(1200 * np.log2(f / expected_pitch) - cent) < 1e-6
+            assert note_index.find_closest_note(f) == (expected_name, pitch)
+
+    def test_pyharmonytools_octaves(self):
+        # SETUP
+        note_index = NoteIndex(Note.CONCERT_PITCH, concert_octave=3)
+        # TEST
+        for f in [41.2, 110, 261.63, 440, 1046.5, 4186]:
+            name, pitch = note_index.find_closest_note(f)
+            expected_name, expected_pitch = Note.find_closest_note(f)
+            assert name == expected_name
+            assert round(pitch, 6) == round(expected_pitch, 6)
+
+    def test_out_of_table(self):
+        # SETUP
+        note_index = NoteIndex(sample_freq=8000)
+        # TEST
+        note_ids, cents, closest_pitches = note_index.lookup([0, -1, 1, 6000, np.nan])
+        assert list(note_ids) == [NoteIndex.NO_NOTE] * 5
+        assert np.isnan(cents).all() and np.isnan(closest_pitches).all()
+        assert note_index.get_names(note_ids[:1]) == ["-"]
+        assert note_index.find_closest_note(0) == ("-", 0.0)
+        assert note_index.find_closest_note(4000)[0] == "B7"
+
+    def test_shared_and_interned(self):
+        # SETUP
+        note_index = NoteIndex.get_instance(440, 48000)
+        # TEST
+        assert NoteIndex.get_instance(440, 48000) is note_index
+        assert NoteIndex.get_instance(442, 48000) is not note_index
+        assert note_index.find_closest_note(440)[0] is note_index.find_closest_note(441)[0]
+        with self.assertRaises(ValueError):
+            NoteIndex(0)
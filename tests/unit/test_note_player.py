@@ -0,0 +1,103 @@
+import os
+import tempfile
+import time
+from unittest import TestCase
+
+import numpy as np
+from pyharmonytools.harmony.note import Note
+
+from audio.note_cache import NoteCache
+from audio.note_player import NotePlayer
+from audio.wavetable import ADSREnvelope
+
+
+class SoundCardFreeNotePlayer(NotePlayer):
+    """
+    the signals are cached instead of pygame sounds
+    """
+    def __init__(self):
+        super().__init__()
+        self.nb_synthesized = 0
+
+    def _create_sound(self, signal: np.ndarray):
+        self.nb_synthesized += 1
+        return signal
+
+
+class TestNotePlayer(TestCase):
+    def setUp(self):
+        NotePlayer.sounds.clear()
+
+    def tearDown(self):
+        NotePlayer.set_envelope(None)
+        NotePlayer.set_note_cache(None)
+
+    def test_lazy_synthesis(self):
+        # SETUP
+        start = time.perf_counter()
+        note_player = SoundCardFreeNotePlayer()
+        # TEST
+        assert time.perf_counter() - start < 0.01
+        assert not NotePlayer.sounds
+        sound = note_player.get_sound("A", 3)
+        assert np.array_equal(sound, note_player.get_wavetable("A", 3).loop)
+        assert note_player.get_sound("A", 3) is sound
+        assert note_player.get_sound("Bb", 3) is note_player.get_sound("A#", 3)
+        assert note_player.nb_synthesized == 2
+
+    def test_envelope(self):
+        # SETUP
+        note_player = SoundCardFreeNotePlayer()
+        NotePlayer.set_envelope(ADSREnvelope(attack=0.1, decay=0.1, sustain=0.5, release=0.2))
+        # TEST
+        sound = note_player.get_sound("A", 3)
+        assert len(sound) == NotePlayer.samplerate * NotePlayer.NOTE_DURATION
+        assert sound[0] == 0 and abs(int(sound[-1])) <= 1
+        assert np.abs(sound[int(0.3 * NotePlayer.samplerate):int(0.7 * NotePlayer.samplerate)]).max() \
+            in range(NotePlayer.AMPLITUDE // 2 - 2, NotePlayer.AMPLITUDE // 2 + 1)
+        NotePlayer.set_envelope(None)
+        assert not NotePlayer.sounds
+
+    def test_lru(self):
+        # SETUP
+        note_player = SoundCardFreeNotePlayer()
+        notes = [(note, octave) for octave in range(0, 10) for note in Note.CHROMATIC_SCALE_SHARP_BASED]
+        # TEST
+        for (note, octave) in notes:
+            note_player.get_sound(note, octave)
+            note_player.get_sound("C", 0)  # the most used note stays in the cache
+        assert len(NotePlayer.sounds) == NotePlayer.MAX_SOUNDS
+        assert ("C", 0) in NotePlayer.sounds
+        assert ("C#", 0) not in NotePlayer.sounds
+        assert list(NotePlayer.sounds)[-2:] == [("B", 9), ("C", 0)]
+
+    def test_prewarm(self):
+        # SETUP
+        note_player = SoundCardFreeNotePlayer()
+        # TEST
+        note_player.prewarm(Note("E2"), Note("A#5"))
+        note_player.prewarm_thread.join()
+        assert len(NotePlayer.sounds) == 43
+        assert ("E", 2) in NotePlayer.sounds and ("A#", 5) in NotePlayer.sounds
+        assert ("D#", 2) not in NotePlayer.sounds and ("B", 5) not in NotePlayer.sounds
+
+    def test_note_cache(self):
+        with tempfile.TemporaryDirectory() as folder:
+            # SETUP
+            NotePlayer.set_note_cache(NoteCache(folder))
+            NotePlayer.set_envelope(ADSREnvelope())
+            cold_player = SoundCardFreeNotePlayer()
+            signal = cold_player.get_sound("A", 3)
+            NotePlayer.set_envelope(ADSREnvelope())  # a new start
+            NotePlayer.wavetables.clear()
+            warm_player = SoundCardFreeNotePlayer()
+            # TEST
+            cached_signal = warm_player.get_sound("A", 3)
+            assert isinstance(cached_signal, np.memmap) and np.array_equal(cached_signal, signal)
+            assert not NotePlayer.wavetables
+            # another setting is synthesized again
+            NotePlayer.set_envelope(ADSREnvelope(release=0.5))
+            assert not np.array_equal(warm_player.get_sound("A", 3), signal)
+            NotePlayer.set_envelope(None)
+            assert not isinstance(warm_player.get_sound("A", 3), np.memmap)
+            assert len(os.listdir(NotePlayer.note_cache.folder)) == 2
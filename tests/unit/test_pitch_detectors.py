@@ -0,0 +1,72 @@
+import time
+from unittest import TestCase
+
+import numpy as np
+
+from audio.pitch_detectors import PITCH_DETECTORS, create_pitch_detector
+
+SAMPLE_FREQ = 48000
+
+
+def harmonic_tone(freq: float, nb_samples: int, noise_level: float = 0.01) -> np.ndarray:
+    """
+    sawtooth-like tone made of 8 harmonics + white noise
+    """
+    rng = np.random.default_rng(int(freq))
+    t = np.arange(nb_samples) / SAMPLE_FREQ
+    tone = sum(np.sin(2 * np.pi * freq * k * t) / k for k in range(1, 9) if freq * k < SAMPLE_FREQ / 2)
+    return (0.2 * tone + noise_level * rng.standard_normal(nb_samples)).astype(np.float32)
+
+
+class TestPitchDetectors(TestCase):
+    """
+    accuracy & latency harness every pitch detection engine must pass
+    """
+    MIDI_NOTES = range(40, 89, 2)  # E2 -> E6
+
+    def test_accuracy(self):
+        for name in PITCH_DETECTORS:
+            detector = create_pitch_detector(name, SAMPLE_FREQ)
+            for midi_note in self.MIDI_NOTES:
+                # SETUP
+                freq = 440 * 2 ** ((midi_note - 69) / 12)
+                # TEST
+                pitch = detector.detect(harmonic_tone(freq, detector.window_size))
+                assert pitch > 0, (name, freq)
+                cents = 1200 * np.log2(pitch / freq)
+                assert abs(cents) < 50, (name, freq, pitch)
+
+    def test_high_tones(self):
+        # SETUP
+        detector = create_pitch_detector("hps", SAMPLE_FREQ)
+        t = np.arange(detector.window_size) / SAMPLE_FREQ
+        tones = [(freq, harmonic_tone(freq, detector.window_size)) for freq in [2093.0, 2637.0]]  # C7, E7
+        tones += [(freq, (0.2 * np.sin(2 * np.pi * freq * t)).astype(np.float32))
+                  for freq in [1975.5, 2500.0, 3000.0, 4186.0]]
+        # TEST - not one of their lower harmonics
+        for (freq, tone) in tones:
+            pitch = detector.detect(tone)
+            assert abs(1200 * np.log2(pitch / freq)) < 50, (freq, pitch)
+
+    def test_silence(self):
+        for name in PITCH_DETECTORS:
+            detector = create_pitch_detector(name, SAMPLE_FREQ)
+            assert detector.detect(np.zeros(detector.window_size, dtype=np.float32)) == 0.0, name
+
+    def test_latency(self):
+        for name in PITCH_DETECTORS:
+            # SETUP
+            detector = create_pitch_detector(name, SAMPLE_FREQ)
+            samples = harmonic_tone(220, detector.window_size)
+            # TEST
+            start = time.perf_counter()
+            for _ in range(5):
+                detector.detect(samples)
+            processing_time = (time.perf_counter() - start) / 5
+            # real time: a window must be processed before the next block comes
+            assert processing_time < detector.window_step / SAMPLE_FREQ, (name, processing_time)
+            assert detector.get_latency() <= 1.0, name
+
+    def test_unknown_detector(self):
+        with self.assertRaises(ValueError):
+            create_pitch_detector("unknown")
@@ -0,0 +1,26 @@
+from unittest import TestCase
+
+import numpy as np
+
+from audio.ring_buffer import SampleRingBuffer
+
+
+class TestSampleRingBuffer(TestCase):
+    def test_window_matches_concatenated_samples(self):
+        # SETUP
+        ring_buffer = SampleRingBuffer(10)
+        expected = np.zeros(10, dtype=np.float32)
+        # TEST
+        for block_size in [3, 4, 7, 10, 2, 13, 1]:
+            block = np.random.uniform(-1, 1, block_size).astype(np.float32)
+            ring_buffer.write(block)
+            expected = np.concatenate((expected, block))[block_size:]
+            assert np.array_equal(ring_buffer.window(), expected)
+
+    def test_window_is_a_view(self):
+        # SETUP
+        ring_buffer = SampleRingBuffer(8)
+        ring_buffer.write(np.arange(5, dtype=np.float32))
+        # TEST
+        assert ring_buffer.window().base is not None
+        assert ring_buffer.window().flags['C_CONTIGUOUS']
@@ -0,0 +1,105 @@
+import threading
+from unittest import TestCase
+
+from screen_manager import Screen, ScreenManager
+
+
+class WidgetFreeFrame:
+    """
+    records the calls of ScreenManager instead of handling Tk widgets
+    """
+    def __init__(self):
+        self.is_shown = False
+        self.is_destroyed = False
+
+    def grid(self, **kwargs):
+        self.is_shown = True
+
+    def grid_remove(self):
+        self.is_shown = False
+
+    def destroy(self):
+        self.is_destroyed = True
+
+
+class AudioScreen(Screen):
+    """
+    holds a thread as long as it is not released, like the mic of an instrument
+    """
+    def __init__(self):
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.stop_event.wait, name="AudioScreen", daemon=True)
+        self.thread.start()
+        self.nb_suspended = 0
+        self.busy = False
+
+    def get_ui_frame(self, root):
+        return WidgetFreeFrame()
+
+    def suspend(self):
+        self.nb_suspended += 1
+
+    def release(self):
+        self.stop_event.set()
+        self.thread.join()
+
+    def is_busy(self) -> bool:
+        return self.busy
+
+
+class TestScreenManager(TestCase):
+    def test_reuse(self):
+        # SETUP
+        screen_manager = ScreenManager(None, 3)
+        # TEST
+        learning_center = screen_manager.show("LearningCenter", AudioScreen)
+        frame = screen_manager.screens["LearningCenter"][1]
+        assert frame.is_shown
+        note_recorder = screen_manager.show("NoteRecorder", AudioScreen)
+        assert not frame.is_shown and learning_center.nb_suspended == 1
+        assert screen_manager.show("LearningCenter", AudioScreen) is learning_center
+        assert frame.is_shown and note_recorder.nb_suspended == 1
+        assert screen_manager.show("LearningCenter", AudioScreen) is learning_center
+        assert learning_center.nb_suspended == 1
+        assert screen_manager.nb_created == 2
+        screen_manager.release_all()
+
+    def test_eviction(self):
+        # SETUP
+        screen_manager = ScreenManager(None, 2)
+        first_screen = screen_manager.show("1", AudioScreen)
+        first_frame = screen_manager.screens["1"][1]
+        screen_manager.show("2", AudioScreen)
+        # TEST
+        screen_manager.show("3", AudioScreen)
+        assert screen_manager.get_screen("1") is None and list(screen_manager.screens) == ["2", "3"]
+        assert first_frame.is_destroyed and not first_screen.thread.is_alive()
+        # a busy screen is kept until it is idle
+        screen_manager.get_screen("2").busy = True
+        screen_manager.show("4", AudioScreen)
+        assert list(screen_manager.screens) == ["2", "4"]
+        screen_manager.get_screen("4").busy = True
+        screen_manager.show("1", AudioScreen)
+        assert list(screen_manager.screens) == ["2", "4", "1"]
+        screen_manager.get_screen("2").busy = False
+        screen_manager.get_screen("4").busy = False
+        screen_manager.show("3", AudioScreen)
+        assert list(screen_manager.screens) == ["1", "3"]
+        screen_manager.release_all()
+        assert not screen_manager.screens and screen_manager.nb_released == screen_manager.nb_created
+
+    def test_flat_thread_count(self):
+        # SETUP
+        screen_manager = ScreenManager(None, 3)
+        nb_threads = threading.active_count()
+        # TEST
+        for i in range(500):
+            screen_manager.show(f"screen {i % 5}", AudioScreen)
+            assert threading.active_count() <= nb_threads + 3
+        assert len(screen_manager.screens) == 3
+        screen_manager.release_all()
+        assert threading.active_count() == nb_threads
+
+    def test_bad_settings(self):
+        with self.assertRaises(ValueError):
+            ScreenManager(None, 0)
@@ -0,0 +1,85 @@
+import os
+import tempfile
+import wave
+from datetime import timedelta
+from unittest import TestCase
+
+import numpy as np
+from scipy.signal import resample_poly
+
+from file_capabilities.sound_file_transcriber import SoundFileTranscriber, read_wav_file
+
+
+def write_wav(file_name: str, samples: np.ndarray, frame_rate: int, nb_channels: int = 1):
+    with wave.open(file_name, "wb") as wav:
+        wav.setnchannels(nb_channels)
+        wav.setsampwidth(2)
+        wav.setframerate(frame_rate)
+        frames = np.repeat((samples * 2 ** 15).astype(np.int16), nb_channels)
+        wav.writeframes(frames.tobytes())
+
+
+def tone(freq: float, duration: float, frame_rate: int) -> np.ndarray:
+    t = np.arange(int(duration * frame_rate)) / frame_rate
+    return 0.2 * np.sin(2 * np.pi * freq * t) + 0.1 * np.sin(4 * np.pi * freq * t)
+
+
+class TestSoundFileTranscriber(TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def test_transcribe_wav(self):
+        # SETUP
+        file_name = os.path.join(self.folder.name, "song.wav")
+        samples = np.concatenate((tone(440, 1.5, 44100), np.zeros(44100), tone(261.63, 1.5, 44100)))
+        write_wav(file_name, samples, 44100, nb_channels=2)
+        transcriber = SoundFileTranscriber("yin")
+        # TEST
+        song = transcriber.transcribe(file_name)
+        notes = [note for (note, chrono) in song]
+        assert notes[-3:] == ["A4", "-", "C4"] or notes[-4:] == ["A4", "-", "C4", "-"]
+        chronos = dict((note, chrono) for (note, chrono) in reversed(song))
+        assert chronos["A4"] < timedelta(seconds=0.1)
+        assert timedelta(seconds=2.5) <= chronos["C4"] < timedelta(seconds=2.6)
+        assert transcriber.nb_samples == int(4 * 48000)
+
+    def test_bounded_chunks(self):
+        # SETUP
+        file_name = os.path.join(self.folder.name, "long.wav")
+        write_wav(file_name, tone(440, 3, 48000), 48000)
+        # TEST
+        chunks = list(read_wav_file(file_name, 10000, 48000))
+        assert max(len(chunk) for chunk in chunks) == 10000
+        assert sum(len(chunk) for chunk in chunks) == 3 * 48000
+
+    def test_resampled_chunks_as_whole_file(self):
+        # SETUP
+        file_name = os.path.join(self.folder.name, "44100.wav")
+        write_wav(file_name, 0.5 * np.sin(2 * np.pi * 440 * np.arange(44100) / 44100), 44100)
+        with wave.open(file_name, "rb") as wav:
+            samples = np.frombuffer(wav.readframes(44100), dtype=np.int16).astype(np.float32) / 2 ** 15
+        # TEST - no transient at the chunk edges
+        resampled = np.concatenate(list(read_wav_file(file_name, 4096, 48000)))
+        assert np.abs(resampled - resample_poly(samples, 160, 147)).max() < 1e-5
+
+    def test_24_bits(self):
+        # SETUP
+        file_name = os.path.join(self.folder.name, "24 bits.wav")
+        samples = tone(440, 1, 48000)
+        with wave.open(file_name, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(3)
+            wav.setframerate(48000)
+            int_samples = (samples * 2 ** 23).astype('<i4')
+            wav.writeframes(int_samples.view(np.uint8).reshape(-1, 4)[:, :3].tobytes())
+        # TEST
+        read_samples = np.concatenate(list(read_wav_file(file_name, 10000, 48000)))
+        assert np.abs(read_samples - samples).max() < 1e-6
+        assert "A4" in [note for (note, chrono) in SoundFileTranscriber("yin").transcribe(file_name)]
+
+    def test_missing_file(self):
+        with self.assertRaises(ValueError):
+            SoundFileTranscriber().transcribe(os.path.join(self.folder.name, "missing.mp3"))
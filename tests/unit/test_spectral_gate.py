@@ -0,0 +1,56 @@
+from unittest import TestCase
+
+import numpy as np
+import scipy.fftpack
+
+from audio.spectral_gate import SpectralGate
+
+SAMPLE_FREQ = 48000
+WINDOW_SIZE = 48000
+DELTA_FREQ = SAMPLE_FREQ / WINDOW_SIZE
+OCTAVE_BANDS = [50, 100, 200, 400, 800, 1600, 3200, 6400, 12800, 25600]
+WHITE_NOISE_THRESH = 0.2
+
+
+def legacy_spectral_cleaning(magnitude_spec):
+    """
+    spectral cleaning loops formerly inlined in MicAnalyzer.callback
+    """
+    for i in range(int(62 / DELTA_FREQ)):
+        magnitude_spec[i] = 0
+    for j in range(len(OCTAVE_BANDS) - 1):
+        ind_start = int(OCTAVE_BANDS[j] / DELTA_FREQ)
+        ind_end = int(OCTAVE_BANDS[j + 1] / DELTA_FREQ)
+        ind_end = ind_end if len(magnitude_spec) > ind_end else len(magnitude_spec)
+        avg_energy_per_freq = (np.linalg.norm(magnitude_spec[ind_start:ind_end], ord=2) ** 2) / (
+                ind_end - ind_start)
+        avg_energy_per_freq = avg_energy_per_freq ** 0.5
+        for i in range(ind_start, ind_end):
+            magnitude_spec[i] = magnitude_spec[i] if magnitude_spec[i] > WHITE_NOISE_THRESH * avg_energy_per_freq else 0
+    return magnitude_spec
+
+
+def magnitude_spectrum(frequencies: [], noise_level: float, dtype) -> np.ndarray:
+    rng = np.random.default_rng(len(frequencies))
+    t = np.arange(WINDOW_SIZE) / SAMPLE_FREQ
+    signal = noise_level * rng.standard_normal(WINDOW_SIZE)
+    for f in frequencies:
+        signal += np.sin(2 * np.pi * f * t)
+    signal = (signal * np.hanning(WINDOW_SIZE)).astype(dtype)
+    return abs(scipy.fftpack.fft(signal)[:WINDOW_SIZE // 2])
+
+
+class TestSpectralGate(TestCase):
+    def test_bit_identical_to_legacy_loops(self):
+        # SETUP
+        gate = SpectralGate(DELTA_FREQ, WINDOW_SIZE // 2, OCTAVE_BANDS, white_noise_thresh=WHITE_NOISE_THRESH)
+        fixtures = [([], 0.1), ([440], 0.0), ([82.41, 164.81, 246.94], 0.3), ([55, 60], 1.0),
+                    ([1046.5, 3000, 12000], 0.05)]
+        for dtype in [np.float32, np.float64]:
+            for frequencies, noise_level in fixtures:
+                spectrum = magnitude_spectrum(frequencies, noise_level, dtype)
+                # TEST
+                expected = legacy_spectral_cleaning(spectrum.copy())
+                gated = gate.apply(spectrum)
+                assert gated.dtype == expected.dtype
+                assert np.array_equal(gated, expected), (dtype, frequencies)
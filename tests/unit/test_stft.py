@@ -0,0 +1,37 @@
+from unittest import TestCase
+
+import numpy as np
+
+from audio.stft import StreamingSTFT
+
+SAMPLE_FREQ = 48000
+
+
+def tone(freq: float, nb_samples: int) -> np.ndarray:
+    return np.sin(2 * np.pi * freq * np.arange(nb_samples) / SAMPLE_FREQ).astype(np.float32)
+
+
+class TestStreamingSTFT(TestCase):
+    def test_same_spectrum_as_numpy(self):
+        # SETUP
+        samples = tone(440, 2048)
+        stft = StreamingSTFT(2048, 512, SAMPLE_FREQ)
+        # TEST
+        expected = np.abs(np.fft.rfft(samples * np.hanning(2048)))
+        assert np.allclose(stft.magnitude(samples), expected, atol=1e-3)
+
+    def test_zero_padding(self):
+        # SETUP
+        samples = tone(441, 2048)
+        stft = StreamingSTFT(2048, 512, SAMPLE_FREQ, zero_padding=8)
+        # TEST
+        magnitude_spec = stft.magnitude(samples)
+        assert len(magnitude_spec) == stft.nb_bins == 8 * 2048 // 2 + 1
+        assert abs(stft.get_frequencies()[np.argmax(magnitude_spec)] - 441) <= stft.delta_freq / 2
+        assert StreamingSTFT.get_window("hann", 2048) is stft.window
+
+    def test_bad_settings(self):
+        with self.assertRaises(ValueError):
+            StreamingSTFT(2048, 0)
+        with self.assertRaises(ValueError):
+            StreamingSTFT(2048, 512, zero_padding=0)
@@ -0,0 +1,143 @@
+import threading
+from unittest import TestCase
+
+from audio.mic_analyzer import MicListener
+from ui_event_bridge import UIEventBridge, TkMicListener
+
+
+class TkFreeWidget:
+    """
+    the after() callbacks are run by run_after() instead of a Tk main loop
+    """
+    def __init__(self):
+        self.callback = None
+        self.repaints = 0
+
+    def after(self, ms: int, callback):
+        self.callback = callback
+        return "after#1"
+
+    def after_cancel(self, after_id):
+        self.callback = None
+
+    def update_idletasks(self):
+        self.repaints += 1
+
+    def run_after(self):
+        callback = self.callback
+        self.callback = None
+        callback()
+
+
+class NoteListener(MicListener):
+    def __init__(self):
+        super().__init__()
+        self.notes = []
+        self.threads = set()
+
+    def set_current_note(self, new_note: str, heard_freq: float = 0.0, closest_pitch: float = 0.0):
+        self.notes.append((new_note, heard_freq))
+        self.threads.add(threading.current_thread())
+
+
+class TestUIEventBridge(TestCase):
+    def test_direct_delivery(self):
+        # SETUP
+        listener = NoteListener()
+        mic_listener = TkMicListener(listener, UIEventBridge())
+        # TEST
+        mic_listener.set_current_note("A3", 220.0, 220.0)
+        assert listener.notes == [("A3", 220.0)]
+
+    def test_merge(self):
+        # SETUP
+        widget = TkFreeWidget()
+        bridge = UIEventBridge()
+        bridge.start(widget)
+        listener = NoteListener()
+        mic_listener = TkMicListener(listener, bridge)
+        # TEST
+        for (note, freq) in [("A3", 219.0), ("A3", 220.0), ("B3", 247.0), ("A3", 221.0), ("A3", 222.0)]:
+            mic_listener.set_current_note(note, freq, 220.0)
+        assert not listener.notes
+        widget.run_after()
+        assert listener.notes == [("A3", 220.0), ("B3", 247.0), ("A3", 222.0)]
+        assert widget.repaints == 1
+        widget.run_after()  # nothing to repaint
+        assert widget.repaints == 1
+        assert bridge.get_statistics() == {"posted events": 5, "merged events": 2, "dropped events": 0,
+                                           "delivered events": 3, "pending events": 0, "repaints": 1}
+
+    def test_drop_oldest(self):
+        # SETUP
+        widget = TkFreeWidget()
+        bridge = UIEventBridge(max_pending=4)
+        bridge.start(widget)
+        listener = NoteListener()
+        mic_listener = TkMicListener(listener, bridge)
+        # TEST
+        for note in ["C3", "D3", "E3", "F3", "G3", "A3"]:
+            mic_listener.set_current_note(note)
+        widget.run_after()
+        assert [note for (note, _) in listener.notes] == ["E3", "F3", "G3", "A3"]
+        assert bridge.dropped_events == 2
+
+    def test_close(self):
+        # SETUP
+        widget = TkFreeWidget()
+        bridge = UIEventBridge()
+        bridge.start(widget)
+        listener = NoteListener()
+        mic_listener = TkMicListener(listener, bridge)
+        mic_listener.set_current_note("A3")
+        # TEST
+        mic_listener.close()
+        widget.run_after()
+        assert not listener.notes
+        bridge.stop()
+        assert widget.callback is None
+
+    def test_failing_callback(self):
+        # SETUP
+        widget = TkFreeWidget()
+        bridge = UIEventBridge()
+        bridge.start(widget)
+        listener = NoteListener()
+        bridge.post(listener.set_current_note, ("A3",))
+        bridge.post(lambda: 1 / 0)
+        bridge.post(listener.set_current_note, ("B3",))
+        # TEST
+        with self.assertLogs("ui_event_bridge", level="ERROR"):
+            widget.run_after()
+        assert [note for (note, _) in listener.notes] == ["A3", "B3"]
+        assert widget.callback is not None  # the drains go on
+        assert bridge.get_statistics()["delivered events"] == 3
+
+    def test_audio_threads(self):
+        # SETUP
+        widget = TkFreeWidget()
+        bridge = UIEventBridge(max_pending=100)
+        bridge.start(widget)
+        listener = NoteListener()
+        mic_listener = TkMicListener(listener, bridge)
+
+        def post_notes():
+            for i in range(2000):
+                mic_listener.set_current_note(["C3", "C3", "D3"][i % 3])
+
+        threads = [threading.Thread(target=post_notes) for _ in range(4)]
+        # TEST
+        for thread in threads:
+            thread.start()
+        while any(thread.is_alive() for thread in threads):
+            widget.run_after()
+        widget.run_after()
+        statistics = bridge.get_statistics()
+        assert statistics["posted events"] == 8000
+        assert statistics["delivered events"] + statistics["merged events"] + statistics["dropped events"] == 8000
+        assert statistics["delivered events"] == len(listener.notes)
+        assert listener.threads == {threading.current_thread()}
+
+    def test_bad_settings(self):
+        with self.assertRaises(ValueError):
+            UIEventBridge(period_ms=0)
@@ -0,0 +1,34 @@
+from unittest import TestCase
+
+import numpy as np
+
+from audio.wavetable import Wavetable, ADSREnvelope
+
+
+class TestWavetable(TestCase):
+    def test_seamless_loop(self):
+        for freq in [3.75, 27.5, 440, 1234.5, 8000]:
+            # SETUP
+            wavetable = Wavetable(freq, 44100)
+            # TEST
+            assert abs(1200 * np.log2(wavetable.freq / freq)) <= Wavetable.MAX_CENTS_ERROR
+            assert len(wavetable.loop) < 44100 / 3
+            samples = wavetable.tile(3 * len(wavetable.loop)).astype(np.float64)
+            expected = 4096 * np.sin(2 * np.pi * wavetable.freq * np.arange(len(samples)) / 44100)
+            assert np.abs(samples - expected).max() <= 2
+
+    def test_envelope(self):
+        # SETUP
+        envelope = ADSREnvelope(attack=0.1, decay=0.1, sustain=0.5, release=0.2)
+        # TEST
+        gains = envelope.get_gains(1000, 1000)
+        assert gains[0] == 0 and gains[100] == 1 and gains[200] == 0.5 and gains[700] == 0.5
+        assert abs(gains[900] - 0.25) < 0.01 and gains[-1] < 0.01
+        assert envelope.get_gains(1000, 1000) is gains
+        assert len(Wavetable(440).render(0.5, envelope)) == 22050
+
+    def test_bad_settings(self):
+        with self.assertRaises(ValueError):
+            Wavetable(30000, 44100)
+        with self.assertRaises(ValueError):
+            ADSREnvelope(sustain=2)
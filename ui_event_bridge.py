@@ -0,0 +1,158 @@
+import logging
+import threading
+from collections import deque
+
+from audio.mic_analyzer import MicListener
+
+logger = logging.getLogger(__name__)
+
+
+class UIEventBridge:
+    """
+    Process-wide queue of the calls posted by the audio threads & run by the Tk thread
+    The queue is drained by a Tk after() loop every PERIOD_MS: the widgets are updated once per drain,
+    whatever the number of events. A call posted with the same merge key as the last pending one replaces it,
+    the oldest calls are dropped beyond MAX_PENDING.
+    Until start() is called (eg without UI), the calls are run right away by the posting thread.
+    A call raising an exception is logged & does not prevent the other calls nor the next drains.
+    """
+    PERIOD_MS = 16  # ~60 repaints per second at most
+    MAX_PENDING = 256
+    instance = None
+    instance_lock = threading.Lock()
+
+    def __init__(self, period_ms: int = PERIOD_MS, max_pending: int = MAX_PENDING):
+        """
+        :param period_ms: between 2 drains of the queue
+        :param max_pending: calls kept in the queue
+        """
+        if period_ms <= 0 or max_pending <= 0:
+            raise ValueError(f"period ({period_ms}) and max pending events ({max_pending}) must be > 0")
+        self.period_ms = period_ms
+        self.max_pending = max_pending
+        self.lock = threading.Lock()
+        self.events = deque()  # (callback, args, merge key)
+        self.widget = None
+        self.after_id = None
+        self.posted_events = 0
+        self.merged_events = 0
+        self.dropped_events = 0
+        self.delivered_events = 0
+        self.repaints = 0
+
+    @staticmethod
+    def get_instance():
+        """
+        :return: the UI event bridge of the process
+        """
+        with UIEventBridge.instance_lock:
+            if not UIEventBridge.instance:
+                UIEventBridge.instance = UIEventBridge()
+            return UIEventBridge.instance
+
+    def start(self, widget):
+        """
+        the posted calls are run by the Tk thread of widget from now on - to be called by the Tk thread
+        :param widget: eg the root window
+        :return:
+        """
+        self.widget = widget
+        if not self.after_id:
+            self.after_id = self.widget.after(self.period_ms, self._drain)
+
+    def stop(self):
+        """
+        the pending calls are run & the next ones will be run right away by the posting thread
+        :return:
+        """
+        if self.after_id:
+            self.widget.after_cancel(self.after_id)
+            self.after_id = None
+        self.drain()
+        self.widget = None
+
+    def post(self, callback, args: tuple = (), merge_key=None):
+        """
+        thread safe
+        :param callback: called by the Tk thread with args
+        :param args:
+        :param merge_key: None if the call must not be merged with the previous pending one of the same callback
+        :return:
+        """
+        with self.lock:
+            self.posted_events += 1
+            if not self.after_id:
+                is_direct = True
+            else:
+                is_direct = False
+                if merge_key is not None and self.events and self.events[-1][0] == callback \
+                        and self.events[-1][2] == merge_key:
+                    self.events[-1] = (callback, args, merge_key)
+                    self.merged_events += 1
+                else:
+                    self.events.append((callback, args, merge_key))
+                    if len(self.events) > self.max_pending:
+                        self.events.popleft()
+                        self.dropped_events += 1
+        if is_direct:
+            with self.lock:
+                self.delivered_events += 1
+            callback(*args)
+
+    def drain(self) -> int:
+        """
+        runs the pending calls - to be called by the Tk thread
+        :return: the number of calls run
+        """
+        with self.lock:
+            events = self.events
+            self.events = deque()
+        for (callback, args, _) in events:
+            try:
+                callback(*args)
+            except Exception:
+                logger.exception(f"UI event {getattr(callback, '__qualname__', callback)}{args} failed")
+        with self.lock:
+            self.delivered_events += len(events)
+        return len(events)
+
+    def get_statistics(self) -> dict:
+        with self.lock:
+            return {"posted events": self.posted_events, "merged events": self.merged_events,
+                    "dropped events": self.dropped_events, "delivered events": self.delivered_events,
+                    "pending events": len(self.events), "repaints": self.repaints}
+
+    def _drain(self):
+        try:
+            if self.drain():
+                self.repaints += 1
+                self.widget.update_idletasks()  # one repaint for all the calls of the drain
+        finally:
+            self.after_id = self.widget.after(self.period_ms, self._drain)
+
+
+class TkMicListener(MicListener):
+    """
+    Relays the notes of a MicAnalyzer to a listener updating widgets, through the UIEventBridge
+    A note repeated by consecutive analyses before the next drain is merged with the previous one.
+    """
+
+    def __init__(self, listener: MicListener, ui_event_bridge: UIEventBridge = None):
+        super().__init__()
+        self.listener = listener
+        self.ui_event_bridge = ui_event_bridge or UIEventBridge.get_instance()
+        self.is_closed = False
+
+    def set_current_note(self, new_note: str, heard_freq: float = 0.0, closest_pitch: float = 0.0):
+        self.ui_event_bridge.post(self._deliver, (new_note, heard_freq, closest_pitch), merge_key=new_note)
+
+    def close(self):
+        """
+        the notes still pending are not delivered to the listener
+        :return:
+        """
+        self.is_closed = True
+
+    def _deliver(self, new_note: str, heard_freq: float, closest_pitch: float):
+        if not self.is_closed:
+            self.listener.set_current_note(new_note, heard_freq, closest_pitch)
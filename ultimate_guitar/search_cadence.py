@@ -8,8 +8,10 @@ from pyharmonytools.harmony.circle_of_5th import CircleOf5th
 from pyharmonytools.song.ultimate_guitar_search import UltimateGuitarSearch
 from pyharmonytools.song.ultimate_guitar_song import UltimateGuitarSong
 
+from screen_manager import Screen
 
-class SearchSongFromCadence(tkinter.Tk):
+
+class SearchSongFromCadence(tkinter.Tk, Screen):
     def __init__(self):
         self.list_of_songs = None
         self.song = None
@@ -53,6 +55,9 @@ class SearchSongFromCadence(tkinter.Tk):
         self.song.pack()
         return self.frame
 
+    def is_busy(self) -> bool:
+        return bool(self.download_thread) and self.download_thread.is_alive()
+
     def do_search_songs(self):
         self.download_thread = threading.Thread(target=self._download_songs, name="_download_songs")
         self.download_thread.start()
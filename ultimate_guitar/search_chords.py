@@ -6,8 +6,10 @@ from tkinter.ttk import Treeview, Progressbar
 from pyharmonytools.song.ultimate_guitar_search import UltimateGuitarSearch
 from pyharmonytools.song.ultimate_guitar_song import UltimateGuitarSong
 
+from screen_manager import Screen
 
-class SearchSongFromChords(tkinter.Tk):
+
+class SearchSongFromChords(tkinter.Tk, Screen):
     def __init__(self):
         self.song_limit_entry = None
         self.song_limit_label = None
@@ -57,6 +59,9 @@ class SearchSongFromChords(tkinter.Tk):
         self.song.pack()
         return self.frame
 
+    def is_busy(self) -> bool:
+        return bool(self.download_thread) and self.download_thread.is_alive()
+
     def do_search_songs(self):
         self.download_thread = threading.Thread(target=self._download_songs, name="_download_songs")
         self.download_thread.start()